@@ -108,6 +108,33 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# Report cache is invalidated on write, so every web and report_worker process must share the same cache
+# backend. Database cache is used by default (create its table with `python manage.py createcachetable`),
+# it can be replaced with other shared backend (e.g. django.core.cache.backends.redis.RedisCache)
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': config('CACHE_LOCATION', default='si_mbe_cache'),
+    }
+}
+
+# Number of worker process used to render receipt pages of batch receipt in parallel, the worker pool is
+# started on the first batch of at least RECEIPT_POOL_THRESHOLD receipt and kept for the life of the process.
+# Smaller batch is rendered in the request process, see `python manage.py benchmark receipt`
+RECEIPT_WORKERS = config('RECEIPT_WORKERS', default=4, cast=int)
+RECEIPT_POOL_THRESHOLD = config('RECEIPT_POOL_THRESHOLD', default=8, cast=int)
+
+# Stock alert stream is long poll, it check new alert every interval (second) and is closed after alert is sent
+# or after timeout (second) so the WSGI worker and its database connection is released, keep the timeout below
+# the server worker timeout (gunicorn default is 30 second). Browser EventSource reconnect and continue from
+# the last received alert
+STOCK_ALERT_POLL_INTERVAL = config('STOCK_ALERT_POLL_INTERVAL', default=2, cast=float)
+STOCK_ALERT_STREAM_TIMEOUT = config('STOCK_ALERT_STREAM_TIMEOUT', default=25, cast=float)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -176,6 +203,17 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
     ),
+    # orjson renderer and parser is used by default, view can still set renderer_classes / parser_classes
+    # to use JSONRenderer / JSONParser
+    'DEFAULT_RENDERER_CLASSES': [
+        'si_mbe.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'si_mbe.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     # TEST_RUNNER = "django_timed_tests.TimedTestRunner"
 }
 
@@ -1,8 +1,10 @@
 from django.contrib import admin
-from si_mbe.models import (Brand, Category, Customer, Logs, Mechanic, Profile,
+from si_mbe.models import (Brand, Category, Customer, Daily_sparepart_summary,
+                           Daily_summary, Logs, Mechanic, Profile, Report_job,
                            Restock, Restock_detail, Sales, Sales_detail,
                            Salesman, Service, Service_action,
-                           Service_sparepart, Sparepart, Supplier)
+                           Service_sparepart, Sparepart, Stock_alert,
+                           Stock_movement, Stock_snapshot, Supplier)
 
 
 # Register your models here.
@@ -19,7 +21,8 @@ class ProfileAdmin(admin.ModelAdmin):
 
 
 class RestockAdmin(admin.ModelAdmin):
-    readonly_fields = ['restock_id']
+    # Stored total is recalculated from restock detail, use restock_total command to fix it
+    readonly_fields = ['restock_id', 'total_cost', 'total_quantity', 'remaining_payment']
 
 
 class RestockDetailAdmin(admin.ModelAdmin):
@@ -27,11 +30,12 @@ class RestockDetailAdmin(admin.ModelAdmin):
 
 
 class SalesAdmin(admin.ModelAdmin):
-    readonly_fields = ['sales_id']
+    # Stored total is recalculated from sales detail, use transaction_total command to fix it
+    readonly_fields = ['sales_id', 'total_price', 'total_quantity']
 
 
 class SalesDetailAdmin(admin.ModelAdmin):
-    readonly_fields = ['sales_detail_id']
+    readonly_fields = ['sales_detail_id', 'individual_price']
 
 
 class SparepartAdmin(admin.ModelAdmin):
@@ -59,7 +63,8 @@ class SalesmanAdmin(admin.ModelAdmin):
 
 
 class ServiceAdmin(admin.ModelAdmin):
-    readonly_fields = ['service_id']
+    # Stored total is recalculated from service action and sparepart, use transaction_total command to fix it
+    readonly_fields = ['service_id', 'sparepart_total', 'action_total', 'total_quantity']
 
 
 class ServiceActionAdmin(admin.ModelAdmin):
@@ -67,7 +72,31 @@ class ServiceActionAdmin(admin.ModelAdmin):
 
 
 class ServiceSparepartAdmin(admin.ModelAdmin):
-    readonly_fields = ['service_sparepart_id']
+    readonly_fields = ['service_sparepart_id', 'individual_price']
+
+
+class DailySummaryAdmin(admin.ModelAdmin):
+    readonly_fields = ['daily_summary_id']
+
+
+class DailySparepartSummaryAdmin(admin.ModelAdmin):
+    readonly_fields = ['daily_sparepart_summary_id']
+
+
+class ReportJobAdmin(admin.ModelAdmin):
+    readonly_fields = ['report_job_id']
+
+
+class StockMovementAdmin(admin.ModelAdmin):
+    readonly_fields = ['stock_movement_id']
+
+
+class StockSnapshotAdmin(admin.ModelAdmin):
+    readonly_fields = ['stock_snapshot_id']
+
+
+class StockAlertAdmin(admin.ModelAdmin):
+    readonly_fields = ['stock_alert_id']
 
 
 admin.site.register(Brand, BrandAdmin)
@@ -86,3 +115,9 @@ admin.site.register(Salesman, SalesmanAdmin)
 admin.site.register(Service, ServiceAdmin)
 admin.site.register(Service_action, ServiceActionAdmin)
 admin.site.register(Service_sparepart, ServiceSparepartAdmin)
+admin.site.register(Daily_summary, DailySummaryAdmin)
+admin.site.register(Daily_sparepart_summary, DailySparepartSummaryAdmin)
+admin.site.register(Report_job, ReportJobAdmin)
+admin.site.register(Stock_movement, StockMovementAdmin)
+admin.site.register(Stock_snapshot, StockSnapshotAdmin)
+admin.site.register(Stock_alert, StockAlertAdmin)
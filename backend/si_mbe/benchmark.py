@@ -0,0 +1,461 @@
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+from io import BytesIO
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from si_mbe.models import (Brand, Category, Customer, Daily_sparepart_summary,
+                           Restock, Restock_detail, Sales, Sales_detail,
+                           Service, Service_action, Service_sparepart,
+                           Sparepart)
+from si_mbe.receipts import get_sales_receipt
+from si_mbe.reorder import get_reorder_suggestion
+from si_mbe.renderers import FastJSONParser, FastJSONRenderer
+from si_mbe.serializers import (RestockManagementSerializers,
+                                SalesManagementSerializers,
+                                ServiceManagementSerializers)
+from si_mbe.utility import (close_receipt_pool, get_restock_report,
+                            get_sales_report, get_service_report,
+                            get_sparepart_ranking, rebuild_daily_summary,
+                            rebuild_restock_total, rebuild_transaction_total,
+                            render_receipt_batch)
+from si_mbe.views import (RestockList, SalesList, SalesReceipt, ServiceList,
+                          SparepartDataList)
+
+# number of days used to spread seeded transaction history backward from today
+HISTORY_DAYS = 730
+
+
+def measure(function: any, repeat: int = 5) -> tuple:
+    '''
+    Function to run function several times, then return tuple of
+    (median duration in ms, number of query executed in one run)
+    '''
+    durations = []
+    for i in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            function()
+            durations.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(durations), len(queries)
+
+
+def measure_memory(function: any) -> float:
+    '''
+    Function to run function once, then return peak memory allocated while it runs in KiB
+    '''
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def seed_master_data(sparepart_count: int = 20) -> dict:
+    '''
+    Function to create brand, category, sparepart, and customer data needed by seeded transaction
+    '''
+    brand = Brand.objects.create(name='Benchmark')
+    category = Category.objects.create(name='Benchmark')
+    spareparts = Sparepart.objects.bulk_create([
+        Sparepart(
+            name=f'Benchmark Part {i}',
+            partnumber=f'BENCH-{i}',
+            quantity=1000,
+            motor_type='Benchmark',
+            sparepart_type='Benchmark',
+            price=10000 + (i * 500),
+            workshop_price=9000 + (i * 500),
+            install_price=11000 + (i * 500),
+            brand_id=brand,
+            category_id=category
+        ) for i in range(sparepart_count)
+    ])
+    customers = Customer.objects.bulk_create([
+        Customer(name='Benchmark Customer', contact='0812000000'),
+        Customer(name='Benchmark Workshop', contact='0812000001', is_workshop=True),
+    ])
+
+    return {'spareparts': spareparts, 'customers': customers}
+
+
+def seed_transactions(master_data: dict, count: int, detail_count: int = 3) -> None:
+    '''
+    Function to bulk create sales, restock, and service transaction with their detail,
+    each transaction created_at is spread randomly over HISTORY_DAYS before now
+    '''
+    now = timezone.now()
+    spareparts = master_data['spareparts']
+    customers = master_data['customers']
+
+    created_at_list = [now - timedelta(minutes=random.randint(0, HISTORY_DAYS * 24 * 60)) for i in range(count)]
+
+    sales_list = Sales.objects.bulk_create([
+        Sales(customer_id=random.choice(customers), deposit=10000, discount=500) for i in range(count)
+    ])
+    restock_list = Restock.objects.bulk_create([Restock(deposit=10000) for i in range(count)])
+    service_list = Service.objects.bulk_create([
+        Service(police_number='B 1234 BM', motor_type='Benchmark', customer_id=random.choice(customers),
+                deposit=10000, discount=500) for i in range(count)
+    ])
+
+    # bulk_create always use now for auto_now_add field, so history created_at is set afterward
+    for transaction_list in (sales_list, restock_list, service_list):
+        for transaction, created_at in zip(transaction_list, created_at_list):
+            transaction.created_at = created_at
+        type(transaction_list[0]).objects.bulk_update(transaction_list, ['created_at'], batch_size=1000)
+
+    sales_details = []
+    restock_details = []
+    service_spareparts = []
+    service_actions = []
+    for sales, restock, service in zip(sales_list, restock_list, service_list):
+        for sparepart in random.sample(spareparts, detail_count):
+            sales_details.append(Sales_detail(sales_id=sales, sparepart_id=sparepart, quantity=2))
+            restock_details.append(Restock_detail(restock_id=restock, sparepart_id=sparepart, quantity=5,
+                                                  individual_price=sparepart.price))
+            service_spareparts.append(Service_sparepart(service_id=service, sparepart_id=sparepart, quantity=1))
+        service_actions.append(Service_action(service_id=service, name='Benchmark Action', cost=25000))
+
+    Sales_detail.objects.bulk_create(sales_details, batch_size=1000)
+    Restock_detail.objects.bulk_create(restock_details, batch_size=1000)
+    Service_sparepart.objects.bulk_create(service_spareparts, batch_size=1000)
+    Service_action.objects.bulk_create(service_actions, batch_size=1000)
+
+    # Detail is inserted directly, so its price, transaction total, and daily summary is stored afterward
+    rebuild_transaction_total()
+    rebuild_restock_total()
+    rebuild_daily_summary()
+
+
+def benchmark_report(sizes: list, repeat: int) -> tuple:
+    '''
+    Benchmark of monthly sales, restock, and service report while transaction history grows.
+
+    Return tuple of (headers, rows) to be printed as table
+    '''
+    master_data = seed_master_data()
+    today = timezone.localdate()
+
+    rows = []
+    seeded = 0
+    for size in sorted(sizes):
+        seed_transactions(master_data, count=size - seeded)
+        seeded = size
+
+        for report_type, function in (
+            ('sales', get_sales_report),
+            ('restock', get_restock_report),
+            ('service', get_service_report),
+        ):
+            duration, query_count = measure(
+                lambda: function(year=today.year, month=today.month),
+                repeat=repeat
+            )
+            rows.append([report_type, size, duration, query_count])
+
+    return ['Report', 'History (transaction)', 'Duration (ms)', 'Query'], rows
+
+
+def benchmark_ranking(sizes: list, repeat: int) -> tuple:
+    '''
+    Benchmark of most sold and most used sparepart ranking while sales and service detail grows.
+
+    Return tuple of (headers, rows) to be printed as table
+    '''
+    master_data = seed_master_data(sparepart_count=200)
+
+    rows = []
+    seeded = 0
+    for size in sorted(sizes):
+        seed_transactions(master_data, count=size - seeded)
+        seeded = size
+
+        for ranking_type, quantity_field, field_name in (
+            ('most_sold', 'quantity_sold', 'total_sold'),
+            ('most_used', 'quantity_used', 'total_used'),
+        ):
+            duration, query_count = measure(
+                lambda: list(get_sparepart_ranking(quantity_field=quantity_field, field_name=field_name)),
+                repeat=repeat
+            )
+            rows.append([ranking_type, size * 3, duration, query_count])
+
+    return ['Ranking', 'History (detail row)', 'Duration (ms)', 'Query'], rows
+
+
+def get_create_data(transaction_type: str, master_data: dict, line: int) -> dict:
+    '''
+    Function to create validated data of a new transaction with the given number of detail line, each line
+    use different sparepart. New dict is returned on every call since create pop its nested detail list
+    '''
+    spareparts = master_data['spareparts']
+    customer = master_data['customers'][1]
+    if transaction_type == 'sales':
+        return {
+            'customer_id': customer,
+            'deposit': 10000,
+            'discount': 0,
+            'sales_detail_set': [
+                {'sparepart_id': spareparts[i], 'quantity': 1} for i in range(line)
+            ],
+        }
+    if transaction_type == 'restock':
+        return {
+            'deposit': 10000,
+            'restock_detail_set': [
+                {'sparepart_id': spareparts[i], 'quantity': 5, 'individual_price': 9000}
+                for i in range(line)
+            ],
+        }
+    return {
+        'police_number': 'B 1234 BM',
+        'motor_type': 'Benchmark',
+        'customer_id': customer,
+        'deposit': 10000,
+        'discount': 0,
+        'service_action_set': [{'name': 'Benchmark Action', 'cost': 25000} for i in range(line)],
+        'service_sparepart_set': [
+            {'sparepart_id': spareparts[i], 'quantity': 1} for i in range(line)
+        ],
+    }
+
+
+# management serializer and nested detail (validated data key, detail model, parent field) of each transaction
+CREATE_PATHS = {
+    'sales': (SalesManagementSerializers, Sales, [('sales_detail_set', Sales_detail, 'sales_id')]),
+    'restock': (RestockManagementSerializers, Restock, [('restock_detail_set', Restock_detail, 'restock_id')]),
+    'service': (ServiceManagementSerializers, Service, [
+        ('service_action_set', Service_action, 'service_id'),
+        ('service_sparepart_set', Service_sparepart, 'service_id'),
+    ]),
+}
+
+
+def create_per_row(model: any, nested: list, validated_data: dict) -> any:
+    '''
+    Function to create transaction with one insert per detail line, used as comparison of
+    management serializer create before detail is inserted in bulk
+    '''
+    nested_data = [(validated_data.pop(key), detail_model, field) for key, detail_model, field in nested]
+    instance = model.objects.create(**validated_data)
+    for details, detail_model, field in nested_data:
+        for detail in details:
+            detail_model.objects.create(**{field: instance}, **detail)
+
+    return instance
+
+
+def benchmark_create(sizes: list, repeat: int) -> tuple:
+    '''
+    Benchmark of creating sales, restock, and service through management serializer (bulk insert of detail)
+    against one insert per detail line, sizes is number of detail line of the transaction (e.g. 10 100 500).
+
+    Return tuple of (headers, rows) to be printed as table
+    '''
+    master_data = seed_master_data(sparepart_count=max(sizes))
+
+    rows = []
+    for line in sorted(sizes):
+        for transaction_type, (serializer_class, model, nested) in CREATE_PATHS.items():
+            per_row_duration, per_row_query = measure(
+                lambda: create_per_row(model, nested, get_create_data(transaction_type, master_data, line)),
+                repeat=repeat
+            )
+            bulk_duration, bulk_query = measure(
+                lambda: serializer_class().create(get_create_data(transaction_type, master_data, line)),
+                repeat=repeat
+            )
+            rows.append([transaction_type, line, per_row_duration, per_row_query, bulk_duration, bulk_query])
+
+    return ['Transaction', 'Line', 'Per row (ms)', 'Per row query', 'Bulk (ms)', 'Bulk query'], rows
+
+
+# number of transaction in one page of transaction list
+LIST_PAGE_SIZE = 100
+
+# list view of each transaction, its serializer is compared against its values read path
+LIST_VIEWS = {
+    'sales': SalesList,
+    'restock': RestockList,
+    'service': ServiceList,
+}
+
+
+def benchmark_list(sizes: list, repeat: int) -> tuple:
+    '''
+    Benchmark of building one page of sales, restock, and service list through list serializer against
+    values read path used by the list view, while transaction history grows.
+
+    Return tuple of (headers, rows) to be printed as table
+    '''
+    master_data = seed_master_data()
+
+    rows = []
+    seeded = 0
+    for size in sorted(sizes):
+        seed_transactions(master_data, count=size - seeded)
+        seeded = size
+
+        for list_type, view in LIST_VIEWS.items():
+            paths = (
+                lambda: view.serializer_class(list(view.queryset.all()[:LIST_PAGE_SIZE]), many=True).data,
+                lambda: view.list_rows(list(view.list_values(view.queryset.all())[:LIST_PAGE_SIZE])),
+            )
+            row = [list_type, size]
+            for function in paths:
+                duration, query_count = measure(function, repeat=repeat)
+                row += [LIST_PAGE_SIZE / duration * 1000, measure_memory(function), query_count]
+            rows.append(row)
+
+    return [
+        'List', 'History (transaction)', 'Serializer (row/s)', 'Serializer peak (KiB)', 'Serializer query',
+        'Values (row/s)', 'Values peak (KiB)', 'Values query',
+    ], rows
+
+
+def get_render_payloads(row_count: int) -> dict:
+    '''
+    Function to get response data of sales list and sparepart list with the given number of row
+    '''
+    return {
+        'sales': SalesList.list_rows(list(SalesList.list_values(SalesList.queryset.all())[:row_count])),
+        'sparepart': SparepartDataList.serializer_class(
+            SparepartDataList.queryset.all()[:row_count], many=True
+        ).data,
+    }
+
+
+def benchmark_render(sizes: list, repeat: int) -> tuple:
+    '''
+    Benchmark of rendering and parsing sales list and sparepart list response through JSONRenderer /
+    JSONParser against orjson renderer / parser, sizes is number of row in the response.
+
+    Return tuple of (headers, rows) to be printed as table
+    '''
+    master_data = seed_master_data(sparepart_count=max(sizes))
+    seed_transactions(master_data, count=max(sizes))
+
+    rows = []
+    for size in sorted(sizes):
+        for payload_type, data in get_render_payloads(row_count=size).items():
+            content = JSONRenderer().render(data)
+            row = [payload_type, len(data), len(content) / 1024]
+            for renderer, parser in ((JSONRenderer(), JSONParser()), (FastJSONRenderer(), FastJSONParser())):
+                row.append(measure(lambda: renderer.render(data), repeat=repeat)[0])
+                row.append(measure(lambda: parser.parse(BytesIO(content)), repeat=repeat)[0])
+            rows.append(row)
+
+    return [
+        'Payload', 'Row', 'Size (KiB)', 'JSONRenderer (ms)', 'JSONParser (ms)', 'orjson render (ms)',
+        'orjson parse (ms)',
+    ], rows
+
+
+def benchmark_receipt(sizes: list, repeat: int) -> tuple:
+    '''
+    Benchmark of rendering receipt batch in the request process against the receipt worker pool,
+    sizes is number of receipt in a batch (ReceiptBatch allow at most 100). Pool start is the first batch
+    rendered by a new pool, including time to start every worker.
+
+    Return tuple of (headers, rows) to be printed as table
+    '''
+    master_data = seed_master_data()
+    seed_transactions(master_data, count=max(sizes))
+    receipts = [
+        (get_sales_receipt(sales), 'Penjualan')
+        for sales in SalesReceipt.queryset.order_by('sales_id')[:max(sizes)]
+    ]
+
+    rows = []
+    for size in sorted(sizes):
+        batch = receipts[:size]
+        with override_settings(RECEIPT_POOL_THRESHOLD=size + 1):
+            serial = measure(lambda: render_receipt_batch(batch), repeat=repeat)[0]
+
+        with override_settings(RECEIPT_POOL_THRESHOLD=0):
+            close_receipt_pool()
+            pool_start = measure(lambda: render_receipt_batch(batch), repeat=1)[0]
+            pool = measure(lambda: render_receipt_batch(batch), repeat=repeat)[0]
+            close_receipt_pool()
+
+        rows.append([size, serial, pool, pool_start])
+
+    return ['Batch (receipt)', 'Request process (ms)', 'Worker pool (ms)', 'Pool start (ms)'], rows
+
+
+# fraction of days in history that a seeded sparepart is sold or used
+CONSUMPTION_DENSITY = 0.1
+
+
+def seed_consumption(spareparts: list) -> None:
+    '''
+    Function to bulk create daily sparepart summary of each sparepart on random days over HISTORY_DAYS before today
+    '''
+    today = timezone.localdate()
+    day_count = int(HISTORY_DAYS * CONSUMPTION_DENSITY)
+
+    Daily_sparepart_summary.objects.bulk_create([
+        Daily_sparepart_summary(
+            date=today - timedelta(days=day),
+            sparepart_id=sparepart,
+            quantity_sold=random.randint(0, 5),
+            quantity_used=random.randint(0, 2)
+        )
+        for sparepart in spareparts
+        for day in random.sample(range(HISTORY_DAYS), day_count)
+    ], batch_size=5000)
+
+
+def benchmark_reorder(sizes: list, repeat: int) -> tuple:
+    '''
+    Benchmark of reorder suggestion while number of sparepart grows, each sparepart has HISTORY_DAYS (2 years)
+    of daily summary, sizes is number of sparepart (e.g. 1000 10000). Suggestion of 10000 sparepart should stay
+    well under a second.
+
+    Return tuple of (headers, rows) to be printed as table
+    '''
+    rows = []
+    seeded = 0
+    for size in sorted(sizes):
+        spareparts = seed_master_data(sparepart_count=size - seeded)['spareparts']
+        seed_consumption(spareparts)
+        seeded = size
+
+        for days in (90, HISTORY_DAYS):
+            duration, query_count = measure(lambda: get_reorder_suggestion(days=days), repeat=repeat)
+            rows.append([size, days, duration, query_count])
+
+    return ['Sparepart', 'Days', 'Duration (ms)', 'Query'], rows
+
+
+# available benchmark, key is used as benchmark name in benchmark command
+BENCHMARKS = {
+    'report': benchmark_report,
+    'ranking': benchmark_ranking,
+    'create': benchmark_create,
+    'list': benchmark_list,
+    'render': benchmark_render,
+    'receipt': benchmark_receipt,
+    'reorder': benchmark_reorder,
+}
+
+# default sizes of each benchmark when --sizes is not given, meaning of size is described by each benchmark
+BENCHMARK_SIZES = {
+    'report': [1000, 5000, 20000],
+    'ranking': [1000, 5000, 20000],
+    'create': [10, 100, 500],
+    'list': [1000, 5000, 20000],
+    'render': [100, 1000, 10000],
+    'receipt': [8, 50, 100],
+    'reorder': [1000, 10000],
+}
@@ -0,0 +1,165 @@
+import hashlib
+import uuid
+from datetime import datetime
+
+from django.core.cache import cache
+from django.utils import timezone
+from si_mbe.models import Daily_summary
+
+# Report of closed month is invalidated when a transaction in that month is written, timeout limit how long
+# outdated report is served when the invalidation is missed (e.g. transaction changed directly in database)
+REPORT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_report_generation_key(transaction_type: str, year: int, month: int) -> str:
+    '''
+    Function to create cache key of the generation of a report month
+    '''
+    return f'report:generation:{transaction_type}:{year}:{month}'
+
+
+def get_report_generation(transaction_type: str, year: int, month: int) -> str:
+    '''
+    Function to get current generation of a report month, generation is a random token that is replaced on every
+    invalidation, so missing generation (e.g. culled from cache) never lead back to report of an older generation
+    '''
+    key = get_report_generation_key(transaction_type=transaction_type, year=year, month=month)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        generation = cache.get(key)
+
+    return generation
+
+
+def get_report_cache_key(kind: str, transaction_type: str, year: int, month: int, generation: str) -> str:
+    '''
+    Function to create cache key of a report generation, kind is either data (report dict)
+    or pdf (rendered pdf bytes)
+    '''
+    return f'report:{kind}:{transaction_type}:{year}:{month}:{generation}'
+
+
+def is_report_cacheable(year: int, month: int) -> bool:
+    '''
+    Function to check whether report of the month is cacheable, only month that already closed
+    (before current month in Asia/Jakarta) is cached since current month still receive new transaction
+    '''
+    today = timezone.localdate()
+    return (year, month) < (today.year, today.month)
+
+
+def count_report_cache(transaction_type: str, result: str) -> None:
+    '''
+    Function to increase hit or miss counter of a report type, database cache increase it by reading then
+    writing the value, so concurrent request may lose count
+    '''
+    key = f'report:{result}:{transaction_type}'
+    cache.add(key, 0, timeout=None)
+    cache.incr(key)
+
+
+def get_cached_value(kind: str, transaction_type: str, year: int, month: int, compute: any) -> any:
+    '''
+    Function to get report value from cache, when value is not cached yet compute() is called
+    and its result is stored in cache for closed month
+    '''
+    if not is_report_cacheable(year=year, month=month):
+        return compute()
+
+    generation = get_report_generation(transaction_type=transaction_type, year=year, month=month)
+    key = get_report_cache_key(kind=kind, transaction_type=transaction_type, year=year, month=month,
+                               generation=generation)
+    value = cache.get(key)
+    if value is not None:
+        count_report_cache(transaction_type=transaction_type, result='hit')
+        return value
+
+    count_report_cache(transaction_type=transaction_type, result='miss')
+    value = compute()
+
+    # Month invalidated while computing may be computed from outdated summary, so it's not stored
+    if get_report_generation(transaction_type=transaction_type, year=year, month=month) == generation:
+        cache.set(key, value, timeout=REPORT_CACHE_TIMEOUT)
+
+    return value
+
+
+def get_cached_report(transaction_type: str, year: int, month: int, compute: any) -> dict:
+    '''
+    Function to get report dict of transaction_type (Daily_summary.Types) in a month from cache,
+    compute is function without argument that return report dict
+    '''
+    return get_cached_value(kind='data', transaction_type=transaction_type, year=year, month=month, compute=compute)
+
+
+def get_cached_report_pdf(transaction_type: str, year: int, month: int, render: any) -> bytes:
+    '''
+    Function to get rendered report pdf bytes of transaction_type (Daily_summary.Types) in a month from cache,
+    render is function without argument that return pdf bytes
+    '''
+    return get_cached_value(kind='pdf', transaction_type=transaction_type, year=year, month=month, compute=render)
+
+
+def invalidate_report_cache(transaction_type: str, days: set) -> None:
+    '''
+    Function to replace generation of transaction_type report for every month of the given days, cached report
+    dict and pdf of the older generation is no longer read and left to expire
+    '''
+    cache.set_many({
+        get_report_generation_key(transaction_type=transaction_type, year=year, month=month): uuid.uuid4().hex
+        for year, month in {(day.year, day.month) for day in days}
+    }, timeout=None)
+
+
+def get_report_cache_stats() -> dict:
+    '''
+    Function to get hit and miss counter of each report type, the counter is approximate since
+    concurrent hit / miss may be counted once.
+
+    Return dict in format of {sales: {hit, miss}, restock: {hit, miss}, service: {hit, miss}}
+    '''
+    stats = {}
+    for transaction_type, label in Daily_summary.Types.choices:
+        stats[str(label).lower()] = {
+            'hit': cache.get(f'report:hit:{transaction_type}', 0),
+            'miss': cache.get(f'report:miss:{transaction_type}', 0),
+        }
+
+    return stats
+
+
+# Receipt is cached per transaction version, outdated version is left to expire
+RECEIPT_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def get_receipt_cache_key(transaction_type: str, transaction_id: int, last_modified: datetime) -> str:
+    '''
+    Function to create cache key of a receipt, last_modified is part of the key so changed
+    transaction never use receipt rendered before the change
+    '''
+    return f'receipt:{transaction_type}:{transaction_id}:{last_modified.timestamp()}'
+
+
+def get_receipt_etag(transaction_type: str, transaction_id: int, last_modified: datetime) -> str:
+    '''
+    Function to create quoted ETag of a receipt version
+    '''
+    key = get_receipt_cache_key(transaction_type=transaction_type, transaction_id=transaction_id,
+                                last_modified=last_modified)
+    return f'"{hashlib.md5(key.encode()).hexdigest()}"'
+
+
+def get_cached_receipt(transaction_type: str, transaction_id: int, last_modified: datetime, render: any) -> bytes:
+    '''
+    Function to get rendered receipt pdf bytes of a transaction version from cache,
+    render is function without argument that return pdf bytes
+    '''
+    key = get_receipt_cache_key(transaction_type=transaction_type, transaction_id=transaction_id,
+                                last_modified=last_modified)
+    pdf = cache.get(key)
+    if pdf is None:
+        pdf = render()
+        cache.set(key, pdf, timeout=RECEIPT_CACHE_TIMEOUT)
+
+    return pdf
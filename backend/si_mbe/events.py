@@ -0,0 +1,149 @@
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer
+from si_mbe.models import Stock_alert
+from si_mbe.serializers import StockAlertSerializers
+
+# Maximum number of stock alert read in one check
+STOCK_ALERT_BATCH = 100
+
+# Alert that is committed later than this after it is created may be missed by the stream,
+# missing alert id older than this is treated as rolled back
+STOCK_ALERT_SETTLE = timedelta(minutes=1)
+
+
+class EventStreamRenderer(BaseRenderer):
+    '''
+    Renderer accepting text/event-stream request, the stream itself is written by streaming response
+    so this only render error response (e.g. not login) as json
+    '''
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode(self.charset) if data is not None else b''
+
+
+def get_stock_alerts(last_id: int, received: set) -> list:
+    '''
+    Function to get stock alert after last_id that is not in received (set of id), in order of id,
+    at most STOCK_ALERT_BATCH alert
+    '''
+    return list(
+        Stock_alert.objects.select_related('sparepart_id').filter(
+            stock_alert_id__gt=last_id
+        ).exclude(
+            stock_alert_id__in=received
+        ).order_by('stock_alert_id')[:STOCK_ALERT_BATCH]
+    )
+
+
+def get_settled_stock_alert_id(last_id: int, until_id: int) -> int:
+    '''
+    Function to get the latest id until until_id of stock alert that is created more than STOCK_ALERT_SETTLE ago,
+    missing id before it belong to rolled back transaction. Return last_id when there is no such alert
+    '''
+    settled_id = Stock_alert.objects.filter(
+        stock_alert_id__gt=last_id,
+        stock_alert_id__lte=until_id,
+        created_at__lte=timezone.now() - STOCK_ALERT_SETTLE
+    ).aggregate(settled_id=Max('stock_alert_id'))['settled_id']
+
+    return settled_id or last_id
+
+
+def get_last_stock_alert_id() -> int:
+    '''
+    Function to get id of the latest stock alert, 0 if there is no stock alert yet
+    '''
+    last_alert = Stock_alert.objects.only('stock_alert_id').order_by('-stock_alert_id').first()
+
+    return last_alert.stock_alert_id if last_alert is not None else 0
+
+
+def parse_stock_alert_cursor(cursor: str) -> tuple:
+    '''
+    Function to parse stock alert stream cursor in format of "last_id" or "last_id:id,id", every alert until
+    last_id and every alert in the id list is already received.
+
+    Return tuple of (last_id, set of received id after last_id), None when the cursor is invalid
+    '''
+    last_id, _, received = cursor.partition(':')
+    received = received.split(',') if received else []
+    if not last_id.isdigit() or not all(pk.isdigit() for pk in received):
+        return None
+
+    return int(last_id), {int(pk) for pk in received if int(pk) > int(last_id)}
+
+
+def format_stock_alert_cursor(last_id: int, received: set) -> tuple:
+    '''
+    Function to merge received id that follow last_id without gap into last_id.
+
+    Return tuple of (last_id, received, cursor), cursor is used as event id of the stream
+    '''
+    while last_id + 1 in received:
+        last_id += 1
+    received = {pk for pk in received if pk > last_id}
+
+    cursor = str(last_id)
+    if received:
+        cursor += ':' + ','.join(str(pk) for pk in sorted(received))
+
+    return last_id, received, cursor
+
+
+def format_stock_alert_event(alert: Stock_alert, cursor: str) -> str:
+    '''
+    Function to format stock alert as server-sent event, cursor is used as event id
+    so reconnected client send it back as Last-Event-ID
+    '''
+    data = json.dumps(StockAlertSerializers(alert).data)
+
+    return f'id: {cursor}\nevent: stock_alert\ndata: {data}\n\n'
+
+
+def stream_stock_alert(last_id: int, received: set = frozenset()) -> any:
+    '''
+    Generator of server-sent event of every stock alert after last_id that is not received yet, as long poll.
+    New alert is checked every STOCK_ALERT_POLL_INTERVAL second, the stream is closed after alert is sent
+    or after STOCK_ALERT_STREAM_TIMEOUT second so the worker is released, then client reconnect using the
+    cursor of the last event.
+
+    Alert id is taken on insert but become visible on commit, so smaller id can appear after bigger id is sent.
+    Missing id is kept in the cursor and checked again until it is older than STOCK_ALERT_SETTLE
+    '''
+    end = time.monotonic() + settings.STOCK_ALERT_STREAM_TIMEOUT
+    last_id, received, cursor = format_stock_alert_cursor(last_id=last_id, received=set(received))
+    yield f'retry: {int(settings.STOCK_ALERT_POLL_INTERVAL * 1000)}\n\n'
+
+    while True:
+        alerts = get_stock_alerts(last_id=last_id, received=received)
+        for alert in alerts:
+            last_id, received, cursor = format_stock_alert_cursor(
+                last_id=last_id,
+                received=received | {alert.stock_alert_id}
+            )
+            yield format_stock_alert_event(alert, cursor=cursor)
+
+        # Skipping missing id that is never committed, event without data only update client last event id
+        if received:
+            settled_id = get_settled_stock_alert_id(last_id=last_id, until_id=max(received))
+            if settled_id > last_id:
+                last_id, received, cursor = format_stock_alert_cursor(last_id=settled_id, received=received)
+                yield f'id: {cursor}\n\n'
+
+        if len(alerts) == STOCK_ALERT_BATCH:
+            continue
+        if alerts or time.monotonic() >= end:
+            return
+
+        # Comment line keep the connection open through proxy while there is no new alert
+        yield ': keep-alive\n\n'
+        time.sleep(settings.STOCK_ALERT_POLL_INTERVAL)
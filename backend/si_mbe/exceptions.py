@@ -51,3 +51,7 @@ class MechanicNotFound(NotFound):
 
 class SalesmanNotFound(NotFound):
     default_detail = {'message': 'Data salesman tidak ditemukan'}
+
+
+class ReportJobNotFound(NotFound):
+    default_detail = {'message': 'Data laporan tidak ditemukan'}
@@ -0,0 +1,132 @@
+import csv
+from datetime import date, datetime
+
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from si_mbe.models import Restock, Sales, Service, Sparepart
+from si_mbe.utility import get_day_range
+
+# Number of row fetched at once from database server-side cursor
+EXPORT_CHUNK = 2000
+
+
+class Echo:
+    '''
+    File-like object returning written value instead of storing it, so csv writer produce one line at a time
+    '''
+    def write(self, value: str) -> str:
+        return value
+
+
+def format_value(value: any) -> any:
+    '''
+    Function to format datetime as local time like in the api, other value is written as it is
+    '''
+    if isinstance(value, datetime):
+        return timezone.localtime(value).strftime('%d-%m-%Y %H:%M:%S')
+
+    return value
+
+
+def stream_csv(header: list, rows: any) -> any:
+    '''
+    Generator of csv line of header then every row
+    '''
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([format_value(value) for value in row])
+
+
+def csv_response(filename: str, header: list, queryset: any) -> StreamingHttpResponse:
+    '''
+    Function to stream values_list queryset as csv attachment, rows are read in chunk through
+    server-side cursor so memory doesn't grow with table size
+    '''
+    response = StreamingHttpResponse(
+        stream_csv(header=header, rows=queryset.iterator(chunk_size=EXPORT_CHUNK)),
+        content_type='text/csv'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+
+    return response
+
+
+def filter_created_at(queryset: any, start_date: date = None, end_date: date = None) -> any:
+    '''
+    Function to filter transaction created between start_date and end_date (Asia/Jakarta), both included
+    '''
+    if start_date is not None:
+        queryset = queryset.filter(created_at__gte=get_day_range(day=start_date)[0])
+    if end_date is not None:
+        queryset = queryset.filter(created_at__lt=get_day_range(day=end_date)[1])
+
+    return queryset
+
+
+def export_sparepart() -> StreamingHttpResponse:
+    '''
+    Function to stream whole sparepart catalogue with its brand and category name as csv
+    '''
+    header = [
+        'sparepart_id', 'name', 'partnumber', 'quantity', 'limit', 'storage_code', 'motor_type',
+        'sparepart_type', 'brand', 'category', 'price', 'workshop_price', 'install_price',
+    ]
+    queryset = Sparepart.objects.order_by('sparepart_id').values_list(
+        'sparepart_id', 'name', 'partnumber', 'quantity', 'limit', 'storage_code', 'motor_type',
+        'sparepart_type', 'brand_id__name', 'category_id__name', 'price', 'workshop_price', 'install_price',
+    )
+
+    return csv_response(filename='sparepart', header=header, queryset=queryset)
+
+
+def export_sales(start_date: date = None, end_date: date = None) -> StreamingHttpResponse:
+    '''
+    Function to stream sales as csv, one row per sales with its stored total
+    '''
+    header = ['sales_id', 'created_at', 'customer', 'is_workshop', 'total', 'discount', 'deposit', 'is_paid_off']
+    queryset = filter_created_at(Sales.objects, start_date=start_date, end_date=end_date).order_by(
+        'sales_id'
+    ).values_list(
+        'sales_id', 'created_at', 'customer_id__name', 'customer_id__is_workshop', 'total_price', 'discount',
+        'deposit', 'is_paid_off',
+    )
+
+    return csv_response(filename='sales', header=header, queryset=queryset)
+
+
+def export_restock(start_date: date = None, end_date: date = None) -> StreamingHttpResponse:
+    '''
+    Function to stream restock as csv, one row per restock with its stored total
+    '''
+    header = [
+        'restock_id', 'created_at', 'no_faktur', 'supplier', 'salesman', 'due_date', 'total', 'deposit',
+        'is_paid_off',
+    ]
+    queryset = filter_created_at(Restock.objects, start_date=start_date, end_date=end_date).order_by(
+        'restock_id'
+    ).values_list(
+        'restock_id', 'created_at', 'no_faktur', 'salesman_id__supplier_id__name', 'salesman_id__name',
+        'due_date', 'total_cost', 'deposit', 'is_paid_off',
+    )
+
+    return csv_response(filename='restock', header=header, queryset=queryset)
+
+
+def export_service(start_date: date = None, end_date: date = None) -> StreamingHttpResponse:
+    '''
+    Function to stream service as csv, one row per service with its stored total
+    '''
+    header = [
+        'service_id', 'created_at', 'customer', 'mechanic', 'police_number', 'motor_type', 'total', 'discount',
+        'deposit', 'is_paid_off',
+    ]
+    queryset = filter_created_at(Service.objects, start_date=start_date, end_date=end_date).annotate(
+        total=F('sparepart_total') + F('action_total')
+    ).order_by('service_id').values_list(
+        'service_id', 'created_at', 'customer_id__name', 'mechanic_id__name', 'police_number', 'motor_type',
+        'total', 'discount', 'deposit', 'is_paid_off',
+    )
+
+    return csv_response(filename='service', header=header, queryset=queryset)
@@ -0,0 +1,177 @@
+import csv
+import io
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+from openpyxl import load_workbook
+from si_mbe.models import Brand, Category, Sparepart, Stock_movement
+from si_mbe.serializers import SparepartImportSerializers
+from si_mbe.utility import lock_rows, record_stock_alert
+
+# Number of row validated and written together in one transaction
+IMPORT_BATCH = 500
+
+# Sparepart field that is written by import
+IMPORT_FIELDS = [
+    'name',
+    'quantity',
+    'limit',
+    'storage_code',
+    'motor_type',
+    'sparepart_type',
+    'price',
+    'workshop_price',
+    'install_price',
+    'brand_id',
+    'category_id',
+]
+
+
+class UnsupportedFileError(ValueError):
+    pass
+
+
+def clean_cell(value: any) -> str:
+    '''
+    Function to turn csv or xlsx cell into string, whole number of xlsx is read as float so it's written
+    without decimal point, empty cell become None
+    '''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if value is None or str(value).strip() == '':
+        return None
+
+    return str(value).strip()
+
+
+def read_rows(rows: any) -> any:
+    '''
+    Generator of dict of every row after header row, header is case insensitive and empty cell is left out
+    so it's counted as not given
+    '''
+    header = [str(column or '').strip().lower() for column in next(rows, [])]
+    for row in rows:
+        yield {column: value for column, value in zip(header, map(clean_cell, row)) if column and value is not None}
+
+
+def read_sparepart_file(file: any, filename: str) -> any:
+    '''
+    Generator of sparepart row of csv or xlsx file, file is read row by row instead of loaded at once
+    '''
+    if filename.lower().endswith('.csv'):
+        yield from read_rows(csv.reader(io.TextIOWrapper(file, encoding='utf-8-sig', newline='')))
+    elif filename.lower().endswith('.xlsx'):
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        try:
+            yield from read_rows(workbook.active.iter_rows(values_only=True))
+        finally:
+            workbook.close()
+    else:
+        raise UnsupportedFileError(filename)
+
+
+def get_name_map(model: any, names: set) -> dict:
+    '''
+    Function to get id of brand or category by its name in one query, name that doesn't exist yet is created
+
+    Return dict of {name: id}
+    '''
+    name_map = dict(model.objects.filter(name__in=names).order_by('-pk').values_list('name', 'pk'))
+    missing = [model(name=name) for name in names - name_map.keys()]
+    for instance in model.objects.bulk_create(missing):
+        name_map[instance.name] = instance.pk
+
+    return name_map
+
+
+def upsert_sparepart_batch(rows: list) -> tuple:
+    '''
+    A function to write validated rows, sparepart with the same partnumber is updated and the rest is created.
+    Must be called inside transaction.atomic, existing sparepart is locked so its quantity can't be changed
+    by other transaction between read and write.
+
+    Quantity change is written to stock movement and stock alert. Return tuple of (number of created,
+    number of updated) sparepart
+    '''
+    brands = get_name_map(Brand, {row['brand'] for row in rows if 'brand' in row})
+    categories = get_name_map(Category, {row['category'] for row in rows if 'category' in row})
+
+    # Sparepart with duplicate partnumber in database, the oldest one is updated
+    locked = lock_rows(Sparepart.objects.filter(partnumber__in=[row['partnumber'] for row in rows]))
+    existing = {sparepart.partnumber: sparepart for sparepart in Sparepart.objects.filter(
+        pk__in=locked).order_by('-pk')}
+
+    created, updated = [], []
+    old_stock = {}
+    now = timezone.now()
+    for row in rows:
+        if 'brand' in row:
+            row['brand_id_id'] = brands[row.pop('brand')]
+        if 'category' in row:
+            row['category_id_id'] = categories[row.pop('category')]
+
+        sparepart = existing.get(row['partnumber'])
+        if sparepart is None:
+            created.append(Sparepart(**row))
+            continue
+
+        old_stock[sparepart.sparepart_id] = (sparepart.quantity, sparepart.limit)
+        for field, value in row.items():
+            setattr(sparepart, field, value)
+
+        sparepart.updated_at = now
+        updated.append(sparepart)
+
+    Sparepart.objects.bulk_update(updated, fields=IMPORT_FIELDS + ['updated_at'])
+    created = Sparepart.objects.bulk_create(created)
+
+    # Changed quantity is written as adjustment like sparepart added or edited by admin, new sparepart
+    # is counted from zero
+    changes = {
+        sparepart: sparepart.quantity - old_stock.get(sparepart.sparepart_id, (0, 0))[0]
+        for sparepart in created + updated
+    }
+    Stock_movement.objects.bulk_create([
+        Stock_movement(
+            sparepart_id=sparepart,
+            quantity=change,
+            movement_type=Stock_movement.Types.ADJUSTMENT,
+            created_at=now
+        ) for sparepart, change in changes.items() if change != 0
+    ])
+    record_stock_alert(
+        old_stock=old_stock,
+        new_stock={sparepart.sparepart_id: (sparepart.quantity, sparepart.limit) for sparepart in created + updated}
+    )
+
+    return len(created), len(updated)
+
+
+def import_spareparts(rows: any) -> dict:
+    '''
+    Function to import sparepart rows in batch of IMPORT_BATCH, invalid row is skipped and reported
+    with its row number (header is row 1). When partnumber is written more than once the last row is used.
+
+    Return dict of number of created and updated sparepart and list of row errors
+    '''
+    result = {'created': 0, 'updated': 0, 'errors': []}
+    rows = enumerate(rows, start=2)
+    while True:
+        batch = list(islice(rows, IMPORT_BATCH))
+        if not batch:
+            return result
+
+        valid_rows = {}
+        for row_number, row in batch:
+            serializer = SparepartImportSerializers(data=row)
+            if serializer.is_valid():
+                valid_rows[serializer.validated_data['partnumber']] = dict(serializer.validated_data)
+            else:
+                result['errors'].append({'row': row_number, 'errors': serializer.errors})
+
+        if valid_rows:
+            with transaction.atomic():
+                created, updated = upsert_sparepart_batch(rows=list(valid_rows.values()))
+            result['created'] += created
+            result['updated'] += updated
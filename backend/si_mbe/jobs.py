@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from si_mbe.models import Report_job
+from si_mbe.utility import REPORT_TITLES, get_report_pdf
+
+# running job older than this is considered abandoned by crashed worker and is claimed again
+REPORT_JOB_TIMEOUT = timedelta(minutes=10)
+
+
+def claim_report_job() -> Report_job:
+    '''
+    Function to take the oldest pending report job and mark it as running, locked row is skipped
+    so several worker can run at the same time without taking the same job.
+
+    Return None when there is no job to run
+    '''
+    with transaction.atomic():
+        job = Report_job.objects.select_for_update(skip_locked=True).filter(
+            Q(status=Report_job.Status.PENDING) |
+            Q(status=Report_job.Status.RUNNING, started_at__lt=timezone.now() - REPORT_JOB_TIMEOUT)
+        ).order_by('created_at').first()
+
+        if job is not None:
+            job.status = Report_job.Status.RUNNING
+            job.started_at = timezone.now()
+            job.save(update_fields=['status', 'started_at'])
+
+    return job
+
+
+def run_report_job(job: Report_job) -> None:
+    '''
+    Function to render report pdf of the job, then store the pdf or the error message in the job
+    '''
+    try:
+        job.file = get_report_pdf(
+            transaction_type=job.report_type,
+            report_type=REPORT_TITLES[job.report_type],
+            year=job.year,
+            month=job.month
+        )
+        job.status = Report_job.Status.DONE
+    except Exception as error:
+        job.error = str(error)
+        job.status = Report_job.Status.FAILED
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['file', 'error', 'status', 'finished_at'])
+
+
+def run_pending_report_jobs() -> int:
+    '''
+    Function to run report job one by one until there is no job left.
+
+    Return number of job that has been run
+    '''
+    count = 0
+    job = claim_report_job()
+    while job is not None:
+        run_report_job(job)
+        count += 1
+        job = claim_report_job()
+
+    return count
@@ -0,0 +1,169 @@
+from django.db.models import F
+from django.utils import timezone
+from si_mbe.models import Restock_detail, Sales_detail, Service_action, Service_sparepart
+
+# Datetime format of created_at in transaction list, the same as list serializer
+DATETIME_FORMAT = '%d-%m-%Y %H:%M:%S'
+
+
+def format_datetime(value: any) -> str:
+    '''
+    Function to format datetime as local time like DateTimeField of the list serializer
+    '''
+    return timezone.localtime(value).strftime(DATETIME_FORMAT)
+
+
+def format_decimal(value: any) -> str:
+    '''
+    Function to format decimal as string like DecimalField of the list serializer
+    '''
+    return f'{value:f}'
+
+
+def drop_empty_relation(row: dict, fields: tuple) -> dict:
+    '''
+    Function to leave out name of empty relation, list serializer doesn't write ReadOnlyField which
+    source can't be reached
+    '''
+    for field in fields:
+        if row[field] is None:
+            del row[field]
+
+    return row
+
+
+def sales_values(queryset: any) -> any:
+    '''
+    Function to turn filtered sales queryset into values queryset read by sales list
+    '''
+    return queryset.prefetch_related(None).values(
+        'sales_id', 'created_at', 'discount', 'total_price', 'is_paid_off', 'deposit',
+        customer=F('customer_id__name')
+    )
+
+
+def get_sales_rows(sales_list: list) -> list:
+    '''
+    Function to build sales list response from values of sales in the page, sales detail of the page is
+    read in one query and put into its sales in a single pass
+    '''
+    rows = {}
+    for sales in sales_list:
+        rows[sales['sales_id']] = drop_empty_relation({
+            'sales_id': sales['sales_id'],
+            'created_at': format_datetime(sales['created_at']),
+            'customer': sales['customer'],
+            'discount': format_decimal(sales['discount']),
+            'total_price_sales': int(sales['total_price']),
+            'is_paid_off': sales['is_paid_off'],
+            'deposit': format_decimal(sales['deposit']),
+            'content': [],
+        }, fields=('customer',))
+
+    details = Sales_detail.objects.filter(sales_id__in=rows).order_by('sales_detail_id').values_list(
+        'sales_id', 'sales_detail_id', 'sparepart_id__name', 'quantity', 'individual_price'
+    )
+    for sales_id, sales_detail_id, sparepart, quantity, individual_price in details:
+        rows[sales_id]['content'].append(drop_empty_relation({
+            'sales_detail_id': sales_detail_id,
+            'sparepart': sparepart,
+            'quantity': quantity,
+            'sub_total': int(quantity * individual_price),
+        }, fields=('sparepart',)))
+
+    return list(rows.values())
+
+
+def restock_values(queryset: any) -> any:
+    '''
+    Function to turn filtered restock queryset into values queryset read by restock list
+    '''
+    return queryset.prefetch_related(None).values(
+        'restock_id', 'no_faktur', 'created_at', 'total_cost', 'is_paid_off',
+        supplier=F('salesman_id__supplier_id__name')
+    )
+
+
+def get_restock_rows(restock_list: list) -> list:
+    '''
+    Function to build restock list response from values of restock in the page, restock detail of the page is
+    read in one query and put into its restock in a single pass
+    '''
+    rows = {}
+    for restock in restock_list:
+        rows[restock['restock_id']] = drop_empty_relation({
+            'restock_id': restock['restock_id'],
+            'no_faktur': restock['no_faktur'],
+            'created_at': format_datetime(restock['created_at']),
+            'supplier': restock['supplier'],
+            'total_restock_cost': int(restock['total_cost']),
+            'is_paid_off': restock['is_paid_off'],
+            'content': [],
+        }, fields=('supplier',))
+
+    details = Restock_detail.objects.filter(restock_id__in=rows).order_by('restock_detail_id').values_list(
+        'restock_id', 'restock_detail_id', 'sparepart_id__name', 'individual_price', 'quantity'
+    )
+    for restock_id, restock_detail_id, sparepart, individual_price, quantity in details:
+        rows[restock_id]['content'].append(drop_empty_relation({
+            'restock_detail_id': restock_detail_id,
+            'sparepart': sparepart,
+            'individual_price': format_decimal(individual_price),
+            'quantity': quantity,
+            'total_price': int(quantity * individual_price),
+        }, fields=('sparepart',)))
+
+    return list(rows.values())
+
+
+def service_values(queryset: any) -> any:
+    '''
+    Function to turn filtered service queryset into values queryset read by service list
+    '''
+    return queryset.prefetch_related(None).values(
+        'service_id', 'created_at', 'sparepart_total', 'action_total', 'discount', 'is_paid_off',
+        customer=F('customer_id__name'),
+        mechanic=F('mechanic_id__name')
+    )
+
+
+def get_service_rows(service_list: list) -> list:
+    '''
+    Function to build service list response from values of service in the page, service action and service
+    sparepart of the page is read in one query each and put into its service in a single pass
+    '''
+    rows = {}
+    for service in service_list:
+        rows[service['service_id']] = drop_empty_relation({
+            'service_id': service['service_id'],
+            'created_at': format_datetime(service['created_at']),
+            'customer': service['customer'],
+            'mechanic': service['mechanic'],
+            'total_service_price': int(service['sparepart_total'] + service['action_total'] - service['discount']),
+            'is_paid_off': service['is_paid_off'],
+            'service_actions': [],
+            'service_spareparts': [],
+        }, fields=('customer', 'mechanic'))
+
+    actions = Service_action.objects.filter(service_id__in=rows).order_by('service_action_id').values_list(
+        'service_id', 'service_action_id', 'name', 'cost'
+    )
+    for service_id, service_action_id, name, cost in actions:
+        rows[service_id]['service_actions'].append({
+            'service_action_id': service_action_id,
+            'service_name': name,
+            'cost': format_decimal(cost),
+        })
+
+    spareparts = Service_sparepart.objects.filter(service_id__in=rows).order_by('service_sparepart_id').values_list(
+        'service_id', 'service_sparepart_id', 'sparepart_id__name', 'quantity', 'individual_price'
+    )
+    for service_id, service_sparepart_id, sparepart, quantity, individual_price in spareparts:
+        rows[service_id]['service_spareparts'].append(drop_empty_relation({
+            'service_sparepart_id': service_sparepart_id,
+            'sparepart': sparepart,
+            'quantity': quantity,
+            'sub_total': int(quantity * individual_price),
+        }, fields=('sparepart',)))
+
+    return list(rows.values())
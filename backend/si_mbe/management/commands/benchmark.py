@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from si_mbe.benchmark import BENCHMARKS, BENCHMARK_SIZES
+from tabulate import tabulate
+
+
+class Command(BaseCommand):
+    help = 'Run benchmark against seeded data, every seeded data is rolled back after benchmark finished'
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=BENCHMARKS.keys(), help='Benchmark name to run')
+        parser.add_argument(
+            '--sizes',
+            nargs='+',
+            type=int,
+            help='Seeded data size for each benchmark step, default sizes is different for each benchmark',
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Number of run for each measurement')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            sizes = options['sizes'] or BENCHMARK_SIZES[options['name']]
+            headers, rows = BENCHMARKS[options['name']](sizes=sizes, repeat=options['repeat'])
+
+            # Rolling back every seeded data, so benchmark never leave data in database
+            transaction.set_rollback(True)
+
+        self.stdout.write(tabulate(rows, headers=headers, tablefmt='github', floatfmt='.1f'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from si_mbe.utility import rebuild_daily_summary, verify_daily_summary
+
+
+class Command(BaseCommand):
+    help = 'Rebuild daily summary and daily sparepart summary from transaction history, or verify them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Only compare stored summary against transaction data without changing it',
+        )
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            mismatches = verify_daily_summary()
+            for mismatch in mismatches:
+                self.stdout.write(mismatch)
+
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} daily summary is different from transaction data')
+
+            self.stdout.write(self.style.SUCCESS('Daily summary is up to date'))
+            return
+
+        with transaction.atomic():
+            rebuild_daily_summary()
+
+        self.stdout.write(self.style.SUCCESS('Daily summary is rebuilt'))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from si_mbe.jobs import run_pending_report_jobs
+
+
+class Command(BaseCommand):
+    help = 'Run report job worker that render report pdf requested by owner in background'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run every pending report job then stop, instead of waiting for new job',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2,
+            help='Number of second to wait before checking new report job',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = run_pending_report_jobs()
+            if count:
+                self.stdout.write(f'{count} report job is finished')
+
+            if options['once']:
+                break
+
+            time.sleep(options['interval'])
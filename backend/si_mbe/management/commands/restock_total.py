@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from si_mbe.utility import (rebuild_daily_summary, rebuild_restock_total,
+                            verify_restock_total)
+
+
+class Command(BaseCommand):
+    help = ('Recalculate stored total cost, total quantity and remaining payment of restock, then rebuild '
+            'daily summary, or verify them')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Only compare stored restock total against restock detail without changing it',
+        )
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            mismatches = verify_restock_total()
+            for mismatch in mismatches:
+                self.stdout.write(mismatch)
+
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} restock total is different from restock detail')
+
+            self.stdout.write(self.style.SUCCESS('Restock total is up to date'))
+            return
+
+        with transaction.atomic():
+            count = rebuild_restock_total()
+            # Report read daily summary, so it's rebuilt from the recalculated total
+            rebuild_daily_summary()
+
+        self.stdout.write(self.style.SUCCESS(f'{count} restock total is recalculated'))
@@ -0,0 +1,44 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from si_mbe.imports import (UnsupportedFileError, import_spareparts,
+                            read_sparepart_file)
+from si_mbe.models import Logs
+
+
+class Command(BaseCommand):
+    help = 'Import sparepart catalogue from csv or xlsx file, sparepart with the same partnumber is updated'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path of csv or xlsx file, first row is column name')
+        parser.add_argument(
+            '--user',
+            help='Username written in log as the user importing sparepart, no log is written if not given',
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user'] is not None:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f'User {options["user"]} is not found')
+
+        try:
+            with open(options['path'], 'rb') as file:
+                result = import_spareparts(rows=read_sparepart_file(file=file, filename=options['path']))
+        except UnsupportedFileError:
+            raise CommandError('File format is not supported, use csv or xlsx')
+
+        if user is not None and (result['created'] or result['updated']):
+            Logs.objects.create(
+                user_id=user,
+                operation=Logs.Operations.CREATE if result['created'] else Logs.Operations.EDIT,
+                table='Sparepart'
+            )
+
+        for error in result['errors']:
+            self.stdout.write(f'Row {error["row"]}: {error["errors"]}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{result["created"]} sparepart is created, {result["updated"]} sparepart is updated, '
+            f'{len(result["errors"])} row is skipped'
+        ))
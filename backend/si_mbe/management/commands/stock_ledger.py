@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from si_mbe.utility import (get_day_range, rebuild_stock_movement,
+                            take_stock_snapshot, verify_stock_movement)
+
+# Snapshot is taken only after this time passed since the end of the day, so transaction started before
+# midnight is already committed. Schedule the daily snapshot after it, e.g. cron `0 1 * * *`
+STOCK_SNAPSHOT_LAG = timedelta(minutes=30)
+
+
+class Command(BaseCommand):
+    help = 'Take daily stock snapshot from stock movement, rebuild stock movement, or verify it'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            type=date.fromisoformat,
+            help='Date of stock snapshot in YYYY-MM-DD, default is yesterday. The day must have ended '
+                 f'at least {STOCK_SNAPSHOT_LAG} ago',
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Rebuild stock movement from transaction history and remove every stock snapshot',
+        )
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Only compare sparepart quantity against stock movement without changing it',
+        )
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            mismatches = verify_stock_movement()
+            for mismatch in mismatches:
+                self.stdout.write(mismatch)
+
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} sparepart quantity is different from stock movement')
+
+            self.stdout.write(self.style.SUCCESS('Stock movement is up to date'))
+            return
+
+        if options['rebuild']:
+            with transaction.atomic():
+                rebuild_stock_movement()
+
+            self.stdout.write(self.style.SUCCESS('Stock movement is rebuilt'))
+            return
+
+        day = options['date'] or timezone.localdate() - timedelta(days=1)
+        if timezone.now() < get_day_range(day=day)[1] + STOCK_SNAPSHOT_LAG:
+            raise CommandError(f'Stock snapshot of {day} can only be taken {STOCK_SNAPSHOT_LAG} after the day ended')
+
+        with transaction.atomic():
+            count = take_stock_snapshot(day=day)
+
+        self.stdout.write(self.style.SUCCESS(f'{count} stock snapshot is taken for {day}'))
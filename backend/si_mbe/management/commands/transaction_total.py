@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from si_mbe.utility import (rebuild_daily_summary, rebuild_transaction_total,
+                            verify_transaction_total)
+
+
+class Command(BaseCommand):
+    help = ('Capture missing detail price and recalculate stored total of sales and service, then rebuild '
+            'daily summary, or verify them')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Only compare stored sales and service total against their detail without changing it',
+        )
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            mismatches = verify_transaction_total()
+            for mismatch in mismatches:
+                self.stdout.write(mismatch)
+
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} sales / service total is different from its detail')
+
+            self.stdout.write(self.style.SUCCESS('Sales and service total is up to date'))
+            return
+
+        with transaction.atomic():
+            count = rebuild_transaction_total()
+            # Report read daily summary, so it's rebuilt from the recalculated total
+            rebuild_daily_summary()
+
+        self.stdout.write(self.style.SUCCESS(f'{count} sales and service total is recalculated'))
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.3 on 2026-10-16 20:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('si_mbe', '0032_transaction_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sales_detail',
+            index=models.Index(fields=['sparepart_id', 'created_at'], name='sales_detail_part_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service_sparepart',
+            index=models.Index(fields=['sparepart_id', 'created_at'], name='service_part_date_idx'),
+        ),
+    ]
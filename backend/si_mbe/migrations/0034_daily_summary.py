@@ -0,0 +1,53 @@
+# Generated by Django 4.1.3 on 2026-10-16 20:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('si_mbe', '0033_sparepart_detail_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Daily_sparepart_summary',
+            fields=[
+                ('daily_sparepart_summary_id', models.BigAutoField(primary_key=True, serialize=False, unique=True)),
+                ('date', models.DateField()),
+                ('quantity_sold', models.PositiveIntegerField(default=0)),
+                ('quantity_used', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'daily_sparepart_summary',
+            },
+        ),
+        migrations.CreateModel(
+            name='Daily_summary',
+            fields=[
+                ('daily_summary_id', models.AutoField(primary_key=True, serialize=False, unique=True)),
+                ('date', models.DateField()),
+                ('transaction_type', models.CharField(choices=[('S', 'Sales'), ('R', 'Restock'), ('V', 'Service')], max_length=1)),
+                ('transaction_total', models.DecimalField(decimal_places=0, default=0, max_digits=15)),
+                ('deposit_total', models.DecimalField(decimal_places=0, default=0, max_digits=15)),
+                ('transaction_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'daily_summary',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='daily_summary',
+            constraint=models.UniqueConstraint(fields=('date', 'transaction_type'), name='unique_daily_summary'),
+        ),
+        migrations.AddField(
+            model_name='daily_sparepart_summary',
+            name='sparepart_id',
+            field=models.ForeignKey(db_column='sparepart_id', on_delete=django.db.models.deletion.CASCADE, to='si_mbe.sparepart'),
+        ),
+        migrations.AddConstraint(
+            model_name='daily_sparepart_summary',
+            constraint=models.UniqueConstraint(fields=('date', 'sparepart_id'), name='unique_daily_sparepart_summary'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.1.3 on 2026-10-16 20:55
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('si_mbe', '0034_daily_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Report_job',
+            fields=[
+                ('report_job_id', models.AutoField(primary_key=True, serialize=False, unique=True)),
+                ('report_type', models.CharField(choices=[('S', 'Sales'), ('R', 'Restock'), ('V', 'Service')], max_length=1)),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('status', models.CharField(choices=[('P', 'Pending'), ('R', 'Running'), ('D', 'Done'), ('F', 'Failed')], default='P', max_length=1)),
+                ('file', models.BinaryField(null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user_id', models.ForeignKey(db_column='user_id', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'report_job',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='report_job',
+            index=models.Index(fields=['status', 'created_at'], name='report_job_status_idx'),
+        ),
+    ]
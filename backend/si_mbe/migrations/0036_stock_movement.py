@@ -0,0 +1,85 @@
+# Generated by Django 4.1.3 on 2026-10-16 21:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def backfill_stock_movement(apps, schema_editor):
+    # Stock movement of existing transaction is rebuilt from its detail, and the rest of
+    # sparepart quantity is written as adjustment when sparepart is created
+    Sparepart = apps.get_model('si_mbe', 'Sparepart')
+    Stock_movement = apps.get_model('si_mbe', 'Stock_movement')
+
+    movements = []
+    total = {}
+    for model_name, movement_type, sign, reference in (
+        ('Sales_detail', 'S', -1, 'sales_id'),
+        ('Restock_detail', 'R', 1, 'restock_id'),
+        ('Service_sparepart', 'V', -1, 'service_id'),
+    ):
+        detail_model = apps.get_model('si_mbe', model_name)
+        for sparepart_id, quantity, reference_id, created_at in detail_model.objects.filter(
+            sparepart_id__isnull=False
+        ).values_list('sparepart_id', 'quantity', reference, 'created_at').iterator():
+            movements.append(Stock_movement(sparepart_id_id=sparepart_id, quantity=sign * quantity,
+                                            movement_type=movement_type, reference_id=reference_id,
+                                            created_at=created_at))
+            total[sparepart_id] = total.get(sparepart_id, 0) + sign * quantity
+
+    for sparepart_id, quantity, created_at in Sparepart.objects.values_list('sparepart_id', 'quantity', 'created_at'):
+        if quantity != total.get(sparepart_id, 0):
+            movements.append(Stock_movement(sparepart_id_id=sparepart_id,
+                                            quantity=quantity - total.get(sparepart_id, 0),
+                                            movement_type='A', created_at=created_at))
+
+    Stock_movement.objects.bulk_create(movements, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('si_mbe', '0035_report_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Stock_snapshot',
+            fields=[
+                ('stock_snapshot_id', models.BigAutoField(primary_key=True, serialize=False, unique=True)),
+                ('date', models.DateField()),
+                ('quantity', models.IntegerField()),
+                ('sparepart_id', models.ForeignKey(db_column='sparepart_id', on_delete=django.db.models.deletion.CASCADE, to='si_mbe.sparepart')),
+            ],
+            options={
+                'db_table': 'stock_snapshot',
+            },
+        ),
+        migrations.CreateModel(
+            name='Stock_movement',
+            fields=[
+                ('stock_movement_id', models.BigAutoField(primary_key=True, serialize=False, unique=True)),
+                ('movement_type', models.CharField(choices=[('S', 'Sales'), ('R', 'Restock'), ('V', 'Service'), ('A', 'Adjustment')], max_length=1)),
+                ('quantity', models.IntegerField()),
+                ('reference_id', models.BigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('sparepart_id', models.ForeignKey(db_column='sparepart_id', on_delete=django.db.models.deletion.CASCADE, to='si_mbe.sparepart')),
+            ],
+            options={
+                'db_table': 'stock_movement',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='stock_snapshot',
+            constraint=models.UniqueConstraint(fields=('date', 'sparepart_id'), name='unique_stock_snapshot'),
+        ),
+        migrations.AddIndex(
+            model_name='stock_movement',
+            index=models.Index(fields=['sparepart_id', 'created_at'], name='stock_movement_part_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stock_movement',
+            index=models.Index(fields=['created_at'], name='stock_movement_date_idx'),
+        ),
+        migrations.RunPython(backfill_stock_movement, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.1.3 on 2026-10-16 21:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('si_mbe', '0036_stock_movement'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Stock_alert',
+            fields=[
+                ('stock_alert_id', models.BigAutoField(primary_key=True, serialize=False, unique=True)),
+                ('quantity', models.IntegerField()),
+                ('limit', models.PositiveSmallIntegerField()),
+                ('is_low', models.BooleanField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('sparepart_id', models.ForeignKey(db_column='sparepart_id', on_delete=django.db.models.deletion.CASCADE, to='si_mbe.sparepart')),
+            ],
+            options={
+                'db_table': 'stock_alert',
+            },
+        ),
+    ]
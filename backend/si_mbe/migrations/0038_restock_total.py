@@ -0,0 +1,55 @@
+# Generated by Django 4.1.3 on 2026-10-16 22:40
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+
+def backfill_restock_total(apps, schema_editor):
+    # Total of existing restock is calculated from its detail in single update
+    Restock = apps.get_model('si_mbe', 'Restock')
+    Restock_detail = apps.get_model('si_mbe', 'Restock_detail')
+    money_field = models.DecimalField(max_digits=15, decimal_places=0)
+
+    details = Restock_detail.objects.filter(restock_id=OuterRef('restock_id')).values('restock_id')
+    total_cost = Coalesce(
+        Subquery(details.annotate(total=Sum(F('quantity') * F('individual_price'))).values('total')),
+        Value(0),
+        output_field=money_field
+    )
+    Restock.objects.update(
+        total_cost=total_cost,
+        total_quantity=Coalesce(Subquery(details.annotate(total=Sum('quantity')).values('total')), Value(0)),
+    )
+    Restock.objects.update(remaining_payment=Greatest(F('total_cost') - F('deposit'), Value(0),
+                                                      output_field=money_field))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('si_mbe', '0037_stock_alert'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restock',
+            name='remaining_payment',
+            field=models.DecimalField(decimal_places=0, default=0, max_digits=15),
+        ),
+        migrations.AddField(
+            model_name='restock',
+            name='total_cost',
+            field=models.DecimalField(decimal_places=0, default=0, max_digits=15),
+        ),
+        migrations.AddField(
+            model_name='restock',
+            name='total_quantity',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='restock',
+            index=models.Index(fields=['is_paid_off', 'due_date'], name='restock_due_index'),
+        ),
+        migrations.RunPython(backfill_restock_total, migrations.RunPython.noop),
+    ]
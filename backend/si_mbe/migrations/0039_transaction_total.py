@@ -0,0 +1,92 @@
+# Generated by Django 4.1.3 on 2026-10-16 23:15
+
+from django.db import migrations, models
+from django.db.models import (Case, Exists, F, OuterRef, Subquery, Sum, Value,
+                              When)
+from django.db.models.functions import Coalesce
+
+
+def backfill_transaction_total(apps, schema_editor):
+    # Existing detail use current sparepart price, then total of sales and service is calculated from it
+    Sales = apps.get_model('si_mbe', 'Sales')
+    Sales_detail = apps.get_model('si_mbe', 'Sales_detail')
+    Service = apps.get_model('si_mbe', 'Service')
+    Service_action = apps.get_model('si_mbe', 'Service_action')
+    Service_sparepart = apps.get_model('si_mbe', 'Service_sparepart')
+    Sparepart = apps.get_model('si_mbe', 'Sparepart')
+    money_field = models.DecimalField(max_digits=15, decimal_places=0)
+
+    sparepart = Sparepart.objects.filter(sparepart_id=OuterRef('sparepart_id'))
+    Sales_detail.objects.update(individual_price=Case(
+        When(
+            Exists(Sales.objects.filter(sales_id=OuterRef('sales_id'), customer_id__is_workshop=True)),
+            then=Subquery(sparepart.values('workshop_price')[:1])
+        ),
+        default=Subquery(sparepart.values('price')[:1]),
+        output_field=money_field
+    ))
+    Service_sparepart.objects.update(individual_price=Subquery(sparepart.values('install_price')[:1]))
+
+    def detail_sum(queryset, reference, total, output_field=money_field):
+        total = queryset.filter(**{reference: OuterRef(reference)}).values(reference).annotate(
+            total=total).values('total')
+        return Coalesce(Subquery(total), Value(0), output_field=output_field)
+
+    Sales.objects.update(
+        total_price=detail_sum(Sales_detail.objects, 'sales_id', Sum(F('quantity') * F('individual_price'))),
+        total_quantity=detail_sum(Sales_detail.objects, 'sales_id', Sum('quantity'),
+                                  output_field=models.IntegerField()),
+    )
+    Service.objects.update(
+        sparepart_total=detail_sum(Service_sparepart.objects, 'service_id',
+                                   Sum(F('quantity') * F('individual_price'))),
+        action_total=detail_sum(Service_action.objects, 'service_id', Sum('cost')),
+        total_quantity=detail_sum(Service_sparepart.objects, 'service_id', Sum('quantity'),
+                                  output_field=models.IntegerField()),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('si_mbe', '0038_restock_total'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sales',
+            name='total_price',
+            field=models.DecimalField(decimal_places=0, default=0, max_digits=15),
+        ),
+        migrations.AddField(
+            model_name='sales',
+            name='total_quantity',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='sales_detail',
+            name='individual_price',
+            field=models.DecimalField(decimal_places=0, max_digits=15, null=True),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='action_total',
+            field=models.DecimalField(decimal_places=0, default=0, max_digits=15),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='sparepart_total',
+            field=models.DecimalField(decimal_places=0, default=0, max_digits=15),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='total_quantity',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='service_sparepart',
+            name='individual_price',
+            field=models.DecimalField(decimal_places=0, max_digits=15, null=True),
+        ),
+        migrations.RunPython(backfill_transaction_total, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.1.3 on 2026-10-17 09:12
+
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def backfill_discount_total(apps, schema_editor):
+    # Existing daily summary is filled with discount of sales and service created on its day
+    Daily_summary = apps.get_model('si_mbe', 'Daily_summary')
+    for transaction_type, model_name in (('S', 'Sales'), ('V', 'Service')):
+        model = apps.get_model('si_mbe', model_name)
+        daily_rows = model.objects.annotate(
+            day=TruncDate('created_at', tzinfo=timezone.get_current_timezone())
+        ).values('day').annotate(discount=Sum('discount')).order_by()
+
+        for row in daily_rows:
+            Daily_summary.objects.filter(date=row['day'], transaction_type=transaction_type).update(
+                discount_total=row['discount'] or 0
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('si_mbe', '0039_transaction_total'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='daily_summary',
+            name='discount_total',
+            field=models.DecimalField(decimal_places=0, default=0, max_digits=15),
+        ),
+        migrations.RunPython(backfill_discount_total, migrations.RunPython.noop),
+    ]
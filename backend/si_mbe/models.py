@@ -1,5 +1,6 @@
 from django.contrib.auth.models import User
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
@@ -77,6 +78,7 @@ class Customer(models.Model):
     contact = models.CharField(max_length=15)
     address = models.CharField(max_length=50, default='')
     is_workshop = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self) -> str:
         return f'{self.name} - {self.contact} | Bengkel={self.is_workshop}'
@@ -88,7 +90,7 @@ class Customer(models.Model):
 # abstract base table for transactions
 class Base_transaction(models.Model):
     is_paid_off = models.BooleanField(default=False)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
     pass
 
@@ -105,6 +107,10 @@ class Sales(Base_transaction):
     deposit = models.DecimalField(max_digits=15, decimal_places=0, default=0)
     discount = models.DecimalField(max_digits=15, decimal_places=0, default=0)
 
+    # Total of sales detail (before discount), written every time sales detail is changed
+    total_price = models.DecimalField(max_digits=15, decimal_places=0, default=0)
+    total_quantity = models.PositiveIntegerField(default=0)
+
     user_id = models.ForeignKey(
         User,
         on_delete=models.PROTECT,
@@ -132,6 +138,8 @@ class Sales_detail(models.Model):
         unique=True
     )
     quantity = models.PositiveSmallIntegerField()
+    # Sparepart price when it's sold, so sales total doesn't change when sparepart price is changed
+    individual_price = models.DecimalField(max_digits=15, decimal_places=0, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     sales_id = models.ForeignKey(
@@ -158,6 +166,12 @@ class Sales_detail(models.Model):
                 name='unique_sales_detail',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['sparepart_id', 'created_at'],
+                name='sales_detail_part_date_idx',
+            )
+        ]
 
 
 # restock table to store surface level information of restock
@@ -170,6 +184,11 @@ class Restock(Base_transaction):
     due_date = models.DateField(null=True)
     deposit = models.DecimalField(max_digits=15, decimal_places=0, default=0)
 
+    # Total of restock detail, written every time restock detail is changed
+    total_cost = models.DecimalField(max_digits=15, decimal_places=0, default=0)
+    total_quantity = models.PositiveIntegerField(default=0)
+    remaining_payment = models.DecimalField(max_digits=15, decimal_places=0, default=0)
+
     user_id = models.ForeignKey(
         User,
         on_delete=models.PROTECT,
@@ -188,6 +207,9 @@ class Restock(Base_transaction):
 
     class Meta:
         db_table = 'restock'
+        indexes = [
+            models.Index(fields=['is_paid_off', 'due_date'], name='restock_due_index'),
+        ]
 
 
 # restock_detail table store the detail of restock per sparepart
@@ -366,6 +388,11 @@ class Service(Base_transaction):
     deposit = models.DecimalField(max_digits=15, decimal_places=0, default=0)
     discount = models.DecimalField(max_digits=15, decimal_places=0, default=0)
 
+    # Total of service sparepart and service action (before discount), written every time they're changed
+    sparepart_total = models.DecimalField(max_digits=15, decimal_places=0, default=0)
+    action_total = models.DecimalField(max_digits=15, decimal_places=0, default=0)
+    total_quantity = models.PositiveIntegerField(default=0)
+
     user_id = models.ForeignKey(
         User,
         on_delete=models.PROTECT,
@@ -424,6 +451,8 @@ class Service_sparepart(models.Model):
         unique=True,
     )
     quantity = models.PositiveSmallIntegerField()
+    # Sparepart install price when it's used, so service total doesn't change when sparepart price is changed
+    individual_price = models.DecimalField(max_digits=15, decimal_places=0, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     service_id = models.ForeignKey(
@@ -451,3 +480,212 @@ class Service_sparepart(models.Model):
                 name='unique_service_sparepart',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['sparepart_id', 'created_at'],
+                name='service_part_date_idx',
+            )
+        ]
+
+
+# daily_summary table store pre-aggregated transaction information per day for each transaction type
+# (total, deposit, discount, and count), kept up to date on every sales, restock, and service changes
+class Daily_summary(models.Model):
+    daily_summary_id = models.AutoField(
+        primary_key=True,
+        unique=True,
+    )
+    date = models.DateField()
+
+    class Types(models.TextChoices):
+        SALES = 'S', _('Sales')
+        RESTOCK = 'R', _('Restock')
+        SERVICE = 'V', _('Service')
+
+    transaction_type = models.CharField(
+        max_length=1,
+        choices=Types.choices,
+    )
+    transaction_total = models.DecimalField(max_digits=15, decimal_places=0, default=0)
+    deposit_total = models.DecimalField(max_digits=15, decimal_places=0, default=0)
+    discount_total = models.DecimalField(max_digits=15, decimal_places=0, default=0)
+    transaction_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f'{self.date} {self.get_transaction_type_display()} | Rp {self.transaction_total} | '\
+               f'count={self.transaction_count}'
+
+    class Meta:
+        db_table = 'daily_summary'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'transaction_type'],
+                name='unique_daily_summary',
+            )
+        ]
+
+
+# daily_sparepart_summary table store pre-aggregated quantity of sparepart sold and used in service per day
+class Daily_sparepart_summary(models.Model):
+    daily_sparepart_summary_id = models.BigAutoField(
+        primary_key=True,
+        unique=True,
+    )
+    date = models.DateField()
+    quantity_sold = models.PositiveIntegerField(default=0)
+    quantity_used = models.PositiveIntegerField(default=0)
+
+    sparepart_id = models.ForeignKey(
+        Sparepart,
+        on_delete=models.CASCADE,
+        db_column='sparepart_id'
+    )
+
+    def __str__(self) -> str:
+        return f'{self.date} {self.sparepart_id.name} | sold={self.quantity_sold} | used={self.quantity_used}'
+
+    class Meta:
+        db_table = 'daily_sparepart_summary'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'sparepart_id'],
+                name='unique_daily_sparepart_summary',
+            )
+        ]
+
+
+# report_job table store report pdf that is requested by owner and rendered by report worker in background
+class Report_job(models.Model):
+    report_job_id = models.AutoField(
+        primary_key=True,
+        unique=True,
+    )
+    report_type = models.CharField(
+        max_length=1,
+        choices=Daily_summary.Types.choices,
+    )
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+
+    class Status(models.TextChoices):
+        PENDING = 'P', _('Pending')
+        RUNNING = 'R', _('Running')
+        DONE = 'D', _('Done')
+        FAILED = 'F', _('Failed')
+
+    status = models.CharField(
+        max_length=1,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    file = models.BinaryField(null=True, editable=False)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    user_id = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        db_column='user_id'
+    )
+
+    def __str__(self) -> str:
+        return f'{self.report_job_id} | {self.get_report_type_display()} {self.year}-{self.month} | '\
+               f'{self.get_status_display()}'
+
+    class Meta:
+        db_table = 'report_job'
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='report_job_status_idx'),
+        ]
+
+
+# stock_movement table is append only ledger of every sparepart quantity change
+class Stock_movement(models.Model):
+    stock_movement_id = models.BigAutoField(
+        primary_key=True,
+        unique=True,
+    )
+
+    class Types(models.TextChoices):
+        SALES = 'S', _('Sales')
+        RESTOCK = 'R', _('Restock')
+        SERVICE = 'V', _('Service')
+        ADJUSTMENT = 'A', _('Adjustment')
+
+    movement_type = models.CharField(
+        max_length=1,
+        choices=Types.choices,
+    )
+    quantity = models.IntegerField()
+    reference_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    sparepart_id = models.ForeignKey(
+        Sparepart,
+        on_delete=models.CASCADE,
+        db_column='sparepart_id'
+    )
+
+    def __str__(self) -> str:
+        return f'{self.created_at} {self.sparepart_id.name} | {self.get_movement_type_display()} {self.quantity}'
+
+    class Meta:
+        db_table = 'stock_movement'
+        indexes = [
+            models.Index(fields=['sparepart_id', 'created_at'], name='stock_movement_part_date_idx'),
+            models.Index(fields=['created_at'], name='stock_movement_date_idx'),
+        ]
+
+
+# stock_snapshot table store sparepart quantity at the end of a day, used as starting point of stock at date
+class Stock_snapshot(models.Model):
+    stock_snapshot_id = models.BigAutoField(
+        primary_key=True,
+        unique=True,
+    )
+    date = models.DateField()
+    quantity = models.IntegerField()
+
+    sparepart_id = models.ForeignKey(
+        Sparepart,
+        on_delete=models.CASCADE,
+        db_column='sparepart_id'
+    )
+
+    def __str__(self) -> str:
+        return f'{self.date} {self.sparepart_id.name} | quantity={self.quantity}'
+
+    class Meta:
+        db_table = 'stock_snapshot'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'sparepart_id'],
+                name='unique_stock_snapshot',
+            )
+        ]
+
+
+# stock_alert table store every time sparepart quantity cross its limit, read in order of id by stock alert stream
+class Stock_alert(models.Model):
+    stock_alert_id = models.BigAutoField(
+        primary_key=True,
+        unique=True,
+    )
+    quantity = models.IntegerField()
+    limit = models.PositiveSmallIntegerField()
+    is_low = models.BooleanField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    sparepart_id = models.ForeignKey(
+        Sparepart,
+        on_delete=models.CASCADE,
+        db_column='sparepart_id'
+    )
+
+    def __str__(self) -> str:
+        return f'{self.created_at} {self.sparepart_id.name} | quantity={self.quantity} limit={self.limit}'
+
+    class Meta:
+        db_table = 'stock_alert'
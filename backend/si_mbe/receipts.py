@@ -0,0 +1,99 @@
+from si_mbe.listings import drop_empty_relation, format_datetime, format_decimal
+
+
+def get_sales_receipt(sales: any) -> dict:
+    '''
+    Function to build sales receipt data in one pass over prefetched sales detail (with its sparepart), total is
+    added up from the same detail that is printed. The data is returned by sales receipt serializer and rendered
+    as receipt pdf by render_receipt
+    '''
+    content = []
+    total_quantity = 0
+    total_price = 0
+    for detail in sales.sales_detail_set.all():
+        sub_total = int(detail.quantity * detail.individual_price)
+        content.append(drop_empty_relation({
+            'sales_detail_id': detail.sales_detail_id,
+            'sparepart': detail.sparepart_id.name if detail.sparepart_id else None,
+            'quantity': detail.quantity,
+            'individual_price': int(detail.individual_price),
+            'sub_total': sub_total,
+        }, fields=('sparepart',)))
+        total_quantity += detail.quantity
+        total_price += sub_total
+
+    deposit = int(sales.deposit)
+    customer = sales.customer_id
+
+    return drop_empty_relation({
+        'sales_id': sales.sales_id,
+        'created_at': format_datetime(sales.created_at),
+        'customer_name': customer.name if customer else None,
+        'customer_contact': customer.contact if customer else None,
+        'deposit': format_decimal(sales.deposit),
+        'discount': format_decimal(sales.discount),
+        'total_quantity': total_quantity,
+        'total_price': total_price,
+        'final_total_price': total_price - int(sales.discount),
+        # Change and remaining payment can't be displayed as negative
+        'change': max(deposit - total_price, 0),
+        'remaining_payment': max(total_price - deposit, 0),
+        'is_paid_off': sales.is_paid_off,
+        'content': content,
+    }, fields=('customer_name', 'customer_contact'))
+
+
+def get_service_receipt(service: any) -> dict:
+    '''
+    Function to build service receipt data in one pass over prefetched service sparepart (with its sparepart)
+    and service action, total is added up from the same detail that is printed. The data is returned by service
+    receipt serializer and rendered as receipt pdf by render_receipt
+    '''
+    service_spareparts = []
+    total_quantity = 0
+    sub_total_part = 0
+    for detail in service.service_sparepart_set.all():
+        sub_total = int(detail.quantity * detail.individual_price)
+        service_spareparts.append(drop_empty_relation({
+            'service_sparepart_id': detail.service_sparepart_id,
+            'sparepart': detail.sparepart_id.name if detail.sparepart_id else None,
+            'quantity': detail.quantity,
+            'individual_price': detail.individual_price,
+            'sub_total': sub_total,
+        }, fields=('sparepart',)))
+        total_quantity += detail.quantity
+        sub_total_part += sub_total
+
+    service_actions = []
+    sub_total_action = 0
+    for action in service.service_action_set.all():
+        service_actions.append({
+            'service_action_id': action.service_action_id,
+            'name': action.name,
+            'cost': format_decimal(action.cost),
+        })
+        sub_total_action += int(action.cost)
+
+    total_price = sub_total_part + sub_total_action
+    final_total_price = total_price - int(service.discount)
+    deposit = int(service.deposit)
+
+    return drop_empty_relation({
+        'service_id': service.service_id,
+        'created_at': format_datetime(service.created_at),
+        'customer_name': service.customer_id.name if service.customer_id else None,
+        'motor_type': service.motor_type,
+        'police_number': service.police_number,
+        'total_quantity': total_quantity,
+        'sub_total_part': sub_total_part,
+        'sub_total_action': sub_total_action,
+        'total_price': total_price,
+        'discount': format_decimal(service.discount),
+        'final_total_price': final_total_price,
+        'deposit': format_decimal(service.deposit),
+        # Change and remaining payment can't be displayed as negative
+        'change': max(deposit - final_total_price, 0),
+        'remaining_payment': max(final_total_price - deposit, 0),
+        'service_actions': service_actions,
+        'service_spareparts': service_spareparts,
+    }, fields=('customer_name',))
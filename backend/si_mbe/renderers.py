@@ -0,0 +1,46 @@
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# orjson write datetime with microsecond, so datetime is passed to the standard encoder to keep the same
+# format as JSONRenderer. Decimal and other type that orjson doesn't know is also written by it
+FAST_JSON_OPTION = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+default_encoder = JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+    '''
+    JSON renderer using orjson, response is the same as JSONRenderer. Pretty printed response (e.g. browsable
+    api) is rendered by JSONRenderer since orjson only indent with 2 space
+    '''
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type=accepted_media_type, renderer_context=renderer_context)
+
+        # Line and paragraph separator is escaped like JSONRenderer so it's still valid javascript
+        return orjson.dumps(data, default=default_encoder.default, option=FAST_JSON_OPTION).replace(
+            b'\xe2\x80\xa8', b'\\u2028'
+        ).replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class FastJSONParser(JSONParser):
+    '''
+    JSON parser using orjson, request with other encoding than utf-8 is parsed by JSONParser
+    '''
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type=media_type, parser_context=parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -0,0 +1,140 @@
+from datetime import date, timedelta
+
+import numpy as np
+from django.db.models import OuterRef, Subquery
+from si_mbe.models import Daily_sparepart_summary, Restock_detail, Salesman, Sparepart
+
+# Number of day used to compute peak velocity, the highest average of consecutive days
+PEAK_WINDOW = 7
+
+
+def get_daily_consumption(sparepart_ids: np.ndarray, start: date, days: int) -> np.ndarray:
+    '''
+    Function to get quantity sold and used in service per sparepart per day from daily sparepart summary,
+    starting from start date for the number of days.
+
+    Return array of shape (len(sparepart_ids), days), row follow order of sorted sparepart_ids. Summary of
+    sparepart that isn't in sparepart_ids (e.g. created after they are read) is not read, so every row id
+    has its own row
+    '''
+    consumption = np.zeros((len(sparepart_ids), days), dtype=np.int32)
+    rows = list(
+        Daily_sparepart_summary.objects.filter(
+            sparepart_id__in=sparepart_ids.tolist(),
+            date__gte=start,
+            date__lt=start + timedelta(days=days)
+        ).values_list('sparepart_id', 'date', 'quantity_sold', 'quantity_used')
+    )
+    if not rows:
+        return consumption
+
+    row_ids, row_dates, sold, used = zip(*rows)
+    row_index = np.searchsorted(sparepart_ids, np.array(row_ids))
+    day_index = (np.array(row_dates, dtype='datetime64[D]') - np.datetime64(start, 'D')).astype(np.int64)
+
+    # Summary is unique per date and sparepart, so every cell is written at most once
+    consumption[row_index, day_index] = np.array(sold, dtype=np.int32) + np.array(used, dtype=np.int32)
+
+    return consumption
+
+
+def get_peak_velocity(consumption: np.ndarray) -> np.ndarray:
+    '''
+    Function to get the highest average daily consumption of PEAK_WINDOW consecutive days per sparepart
+    '''
+    window = min(PEAK_WINDOW, consumption.shape[1])
+    total = np.cumsum(consumption, axis=1, dtype=np.int64)
+    window_total = total[:, window - 1:].copy()
+    window_total[:, 1:] -= total[:, :-window]
+
+    return window_total.max(axis=1) / window
+
+
+def get_last_salesman(sparepart_ids: list) -> dict:
+    '''
+    Function to get salesman of the latest restock of every sparepart in one query
+
+    Return dict of {sparepart_id: salesman_id}, sparepart that is never restocked have None salesman_id
+    '''
+    last_restock = Restock_detail.objects.filter(
+        sparepart_id=OuterRef('pk')
+    ).order_by('-restock_id__created_at', '-restock_detail_id').values('restock_id__salesman_id')[:1]
+
+    return dict(
+        Sparepart.objects.filter(pk__in=sparepart_ids).annotate(
+            salesman_id=Subquery(last_restock)
+        ).values_list('sparepart_id', 'salesman_id')
+    )
+
+
+def get_reorder_suggestion(days: int = 90, cover: int = 30, today: date = None) -> list:
+    '''
+    Function to get recommended reorder quantity of every sparepart from its consumption in the last days,
+    computed for all sparepart at once as array instead of per sparepart.
+
+    Average velocity is total consumption divided by days, peak velocity is the highest PEAK_WINDOW days
+    average, days of cover is how many days current quantity last at average velocity (None when the
+    sparepart isn't consumed). Sparepart is suggested when its quantity is below limit plus cover days
+    of average consumption, the difference is its reorder quantity.
+
+    Return list of suggestion grouped by salesman of the latest restock of the sparepart
+    '''
+    today = today or date.today()
+    spareparts = list(
+        Sparepart.objects.order_by('sparepart_id').values_list(
+            'sparepart_id', 'name', 'partnumber', 'quantity', 'limit'
+        )
+    )
+    if not spareparts:
+        return []
+
+    sparepart_ids, names, partnumbers, quantity, limit = zip(*spareparts)
+    sparepart_ids = np.array(sparepart_ids)
+    quantity = np.array(quantity, dtype=np.int64)
+    limit = np.array(limit, dtype=np.int64)
+
+    consumption = get_daily_consumption(
+        sparepart_ids=sparepart_ids,
+        start=today - timedelta(days=days - 1),
+        days=days
+    )
+    average_velocity = consumption.sum(axis=1, dtype=np.int64) / days
+    peak_velocity = get_peak_velocity(consumption)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days_of_cover = np.where(average_velocity > 0, np.maximum(quantity, 0) / average_velocity, np.nan)
+    reorder_quantity = np.maximum(np.ceil(average_velocity * cover).astype(np.int64) + limit - quantity, 0)
+
+    # Only building result of suggested sparepart, least covered first
+    suggested = np.flatnonzero(reorder_quantity > 0)
+    suggested = suggested[np.lexsort((sparepart_ids[suggested], np.nan_to_num(days_of_cover[suggested], nan=np.inf)))]
+    last_salesman = get_last_salesman(sparepart_ids=sparepart_ids[suggested].tolist())
+    salesmen = Salesman.objects.select_related('supplier_id').in_bulk(
+        {salesman_id for salesman_id in last_salesman.values() if salesman_id is not None}
+    )
+
+    groups = {}
+    for i in suggested.tolist():
+        sparepart_id = int(sparepart_ids[i])
+        salesman = salesmen.get(last_salesman.get(sparepart_id))
+        group = groups.setdefault(salesman, {
+            'salesman_id': salesman.salesman_id if salesman else None,
+            'salesman': salesman.name if salesman else None,
+            'supplier_id': salesman.supplier_id.supplier_id if salesman else None,
+            'supplier': salesman.supplier_id.name if salesman else None,
+            'spareparts': [],
+        })
+        group['spareparts'].append({
+            'sparepart_id': sparepart_id,
+            'name': names[i],
+            'partnumber': partnumbers[i],
+            'quantity': int(quantity[i]),
+            'limit': int(limit[i]),
+            'average_velocity': round(float(average_velocity[i]), 2),
+            'peak_velocity': round(float(peak_velocity[i]), 2),
+            'days_of_cover': None if np.isnan(days_of_cover[i]) else round(float(days_of_cover[i]), 1),
+            'reorder_quantity': int(reorder_quantity[i]),
+        })
+
+    # Sparepart that is never restocked is put last
+    return sorted(groups.values(), key=lambda group: (group['salesman'] is None, group['salesman'] or ''))
@@ -1,10 +1,14 @@
-from datetime import date
 from django.contrib.auth.models import User
 from rest_framework import serializers
 from si_mbe.models import (Brand, Category, Customer, Logs, Profile, Restock,
                            Restock_detail, Sales, Sales_detail, Service,
                            Service_action, Service_sparepart, Sparepart,
-                           Supplier, Mechanic, Salesman)
+                           Supplier, Mechanic, Salesman, Report_job, Stock_alert,
+                           Stock_movement)
+from si_mbe.receipts import get_sales_receipt, get_service_receipt
+from si_mbe.utility import (capture_detail_price, get_restock_total,
+                            get_sales_price, get_sales_total,
+                            get_service_total, update_nested_detail)
 from si_mbe.validators import CustomerValidationError, CustomerConflictError
 
 
@@ -75,6 +79,29 @@ class SparepartSerializers(serializers.ModelSerializer):
         ]
 
 
+class SparepartImportSerializers(serializers.ModelSerializer):
+    brand = serializers.CharField(max_length=20, required=False)
+    category = serializers.CharField(max_length=20, required=False)
+
+    class Meta:
+        model = Sparepart
+        fields = [
+            'name',
+            'partnumber',
+            'quantity',
+            'limit',
+            'storage_code',
+            'category',
+            'motor_type',
+            'sparepart_type',
+            'brand',
+            'price',
+            'workshop_price',
+            'install_price',
+        ]
+        extra_kwargs = {'partnumber': {'required': True}}
+
+
 class SalesDetailSerializers(serializers.ModelSerializer):
     sparepart = serializers.ReadOnlyField(source='sparepart_id.name')
     sub_total = serializers.SerializerMethodField()
@@ -84,19 +111,14 @@ class SalesDetailSerializers(serializers.ModelSerializer):
         fields = ['sales_detail_id', 'sparepart', 'quantity', 'sub_total']
 
     def get_sub_total(self, obj):
-        # Check if workshop is true
-        if obj.sales_id.customer_id.is_workshop:
-            # calculate with workshop price
-            return int(obj.quantity * obj.sparepart_id.workshop_price)
-
-        # calculate with normal price
-        return int(obj.quantity * obj.sparepart_id.price)
+        # calculate with price when sparepart is sold
+        return int(obj.quantity * obj.individual_price)
 
 
 class SalesSerializers(serializers.ModelSerializer):
     created_at = serializers.DateTimeField(format='%d-%m-%Y %H:%M:%S')
     customer = serializers.ReadOnlyField(source='customer_id.name')
-    total_price_sales = serializers.SerializerMethodField()
+    total_price_sales = serializers.IntegerField(source='total_price', read_only=True)
     content = SalesDetailSerializers(many=True, source='sales_detail_set')
 
     class Meta:
@@ -112,16 +134,6 @@ class SalesSerializers(serializers.ModelSerializer):
             'content'
         ]
 
-    def get_total_price_sales(self, obj):
-        # Getting all sales_detail data related to the sales
-        sales_serializer = SalesDetailSerializers(obj.sales_detail_set, many=True)
-        total_price = 0
-
-        # calculating total price by looping throught sales_detail list
-        for sales in sales_serializer.data:
-            total_price += sales['sub_total']
-        return total_price
-
 
 class SalesDetailManagementSerializers(serializers.ModelSerializer):
     sales_detail_id = serializers.IntegerField(required=False)
@@ -132,14 +144,8 @@ class SalesDetailManagementSerializers(serializers.ModelSerializer):
         fields = ['sales_detail_id', 'sparepart_id', 'quantity', 'sub_total']
 
     def get_sub_total(self, obj):
-        # Check if workshop is true
-        try:
-            if obj.sales_id.customer_id.is_workshop:
-                # calculate with workshop price
-                return int(obj.quantity * obj.sparepart_id.workshop_price)
-        except Exception:
-            # calculate with normal price
-            return int(obj.quantity * obj.sparepart_id.price)
+        # calculate with price when sparepart is sold
+        return int(obj.quantity * obj.individual_price)
 
 
 class SalesManagementSerializers(serializers.ModelSerializer):
@@ -147,7 +153,7 @@ class SalesManagementSerializers(serializers.ModelSerializer):
     customer_contact = serializers.CharField(max_length=15, write_only=True, required=False)
     customer_address = serializers.CharField(max_length=50, write_only=True, required=False)
     is_workshop = serializers.BooleanField(write_only=True, required=False)
-    total_quantity_sales = serializers.SerializerMethodField()
+    total_quantity_sales = serializers.IntegerField(source='total_quantity', read_only=True)
     total_price_sales = serializers.SerializerMethodField()
     change = serializers.SerializerMethodField()
     remaining_payment = serializers.SerializerMethodField()
@@ -173,25 +179,9 @@ class SalesManagementSerializers(serializers.ModelSerializer):
             'content'
         ]
 
-    def get_total_quantity_sales(self, obj):
-        # Getting all sales_detail data related to the sales
-        sales_serializer = SalesDetailManagementSerializers(obj.sales_detail_set, many=True)
-
-        # calculating total quantity by looping throught sales_detail list
-        quantity = 0
-        for sales in sales_serializer.data:
-            quantity += sales['quantity']
-        return quantity
-
     def get_total_price_sales(self, obj):
-        # Getting all sales_detail data related to the sales
-        sales_serializer = SalesDetailManagementSerializers(obj.sales_detail_set, many=True)
-
-        # calculating total price by looping throught sales_detail list
-        total_price = 0
-        for sales in sales_serializer.data:
-            total_price += sales['sub_total']
-        return total_price - int(obj.discount)
+        # Stored total price of sales detail after discount
+        return int(obj.total_price - obj.discount)
 
     def get_change(self, obj):
         # Getting total_price using class method
@@ -271,16 +261,18 @@ class SalesManagementSerializers(serializers.ModelSerializer):
         # get the nested objects list
         details = validated_data.pop('sales_detail_set')
 
-        # Calculate total_sales_price
-        total_sales_price = 0 - validated_data['discount']
-        for detail in details:
-            if is_workshop or customer_id.is_workshop:
-                total_sales_price += int(detail['sparepart_id'].workshop_price) * detail['quantity']
-            else:
-                total_sales_price += int(detail['sparepart_id'].price) * detail['quantity']
+        # Capture current sparepart price of every detail, then calculate total that is stored in sales
+        is_workshop = validated_data['customer_id'].is_workshop
+        capture_detail_price(
+            validated_details=details,
+            old_details=[],
+            id_field='sales_detail_id',
+            get_price=lambda sparepart: get_sales_price(sparepart=sparepart, is_workshop=is_workshop)
+        )
+        validated_data.update(get_sales_total(details=details))
 
         # Set is_paid_off based on deposit and total_sales_price
-        if validated_data['deposit'] < total_sales_price:
+        if validated_data['deposit'] < validated_data['total_price'] - validated_data['discount']:
             validated_data['is_paid_off'] = False
         else:
             validated_data['is_paid_off'] = True
@@ -288,15 +280,11 @@ class SalesManagementSerializers(serializers.ModelSerializer):
         # Creating new sales object using all validated data
         sales = Sales.objects.create(**validated_data)
 
-        # Creating all sales_detail object related to the sales
-        # by looping throught sales detail list of dict
-        for details in details:
-            # Remove sales_detail_id because in create operations we didn't need it
-            try:
-                details.pop('sales_detail_id')
-            except Exception:
-                pass
-            Sales_detail.objects.create(sales_id=sales, **details)
+        # Creating all sales_detail object related to the sales in single insert,
+        # sales_detail_id is removed because in create operations we didn't need it
+        for detail in details:
+            detail.pop('sales_detail_id', None)
+        Sales_detail.objects.bulk_create([Sales_detail(sales_id=sales, **detail) for detail in details])
         return sales
 
     def update(self, instance, validated_data):
@@ -312,52 +300,37 @@ class SalesManagementSerializers(serializers.ModelSerializer):
         except Exception:
             pass
 
+        # Existing detail keep its captured price, unless customer workshop status is changed
+        is_workshop = validated_data['customer_id'].is_workshop
+        if getattr(instance.customer_id, 'is_workshop', None) == is_workshop:
+            old_details = instance.sales_detail_set.all()
+        else:
+            old_details = []
+        capture_detail_price(
+            validated_details=validated_details,
+            old_details=old_details,
+            id_field='sales_detail_id',
+            get_price=lambda sparepart: get_sales_price(sparepart=sparepart, is_workshop=is_workshop)
+        )
+
         # Assigning input (validated_data) to object (instance)
         instance.customer_id = validated_data.get('customer_id', instance.customer_id)
         instance.is_paid_off = validated_data.get('is_paid_off', instance.is_paid_off)
         instance.deposit = validated_data.get('deposit', instance.deposit)
         instance.discount = validated_data.get('discount', instance.discount)
 
-        # Calculate total_sales_price
-        total_sales_price = 0 - validated_data['discount']
-        for detail in validated_details:
-            if validated_data['customer_id'].is_workshop:
-                total_sales_price += int(detail['sparepart_id'].workshop_price) * detail['quantity']
-            else:
-                total_sales_price += int(detail['sparepart_id'].price) * detail['quantity']
+        # Recalculate total price and total quantity that are stored in sales
+        for field, value in get_sales_total(details=validated_details).items():
+            setattr(instance, field, value)
 
         # Set is_paid_off based on deposit and total_sales_price
-        if instance.deposit < total_sales_price:
+        if instance.deposit < instance.total_price - instance.discount:
             instance.is_paid_off = False
         else:
             instance.is_paid_off = True
 
-        # get all nested objects related with this instance and make a dict(id, object)
-        details_dict = dict((i.sales_detail_id, i) for i in instance.sales_detail_set.all())
-
-        # Updating all sales_detail object related to the sales
-        # by looping throught sales detail list of dict
-        for validated_detail in validated_details:
-            # Check if exists sales_detail_id
-            if 'sales_detail_id' in validated_detail:
-                # remove from the dict and update
-                detail = details_dict.pop(validated_detail['sales_detail_id'])
-
-                # remove sales_detail_id from validated data as we don't require it.
-                validated_detail.pop('sales_detail_id')
-
-                # loop through the rest of keys in validated data to assign it to its respective field
-                for key in validated_detail.keys():
-                    setattr(detail, key, validated_detail[key])
-
-                detail.save()
-            else:
-                Sales_detail.objects.create(sales_id=instance, **validated_detail)
-
-        # delete remaining elements because they're not present in update call
-        if len(details_dict) > 0:
-            for detail in details_dict.values():
-                detail.delete()
+        # Creating, updating, and deleting sales_detail object related to the sales
+        update_nested_detail(instance=instance, related_name='sales_detail_set', validated_details=validated_details)
 
         instance.save()
 
@@ -380,7 +353,7 @@ class RestockSerializers(serializers.ModelSerializer):
     supplier = serializers.ReadOnlyField(source='salesman_id.supplier_id.name')
     created_at = serializers.DateTimeField(format='%d-%m-%Y %H:%M:%S')
     content = RestockDetailSerializers(many=True, source='restock_detail_set')
-    total_restock_cost = serializers.SerializerMethodField()
+    total_restock_cost = serializers.IntegerField(source='total_cost', read_only=True)
 
     class Meta:
         model = Restock
@@ -394,16 +367,6 @@ class RestockSerializers(serializers.ModelSerializer):
             'content'
         ]
 
-    def get_total_restock_cost(self, obj):
-        # Getting all restock_detail data related to the restock
-        restock_detail = RestockDetailSerializers(obj.restock_detail_set, many=True)
-
-        # calculating total price by looping throught restock_detail list
-        total = 0
-        for restock in restock_detail.data:
-            total += int(restock['individual_price']) * restock['quantity']
-        return total
-
 
 class RestockDetailManagementSerializers(serializers.ModelSerializer):
     restock_detail_id = serializers.IntegerField(required=False)
@@ -420,10 +383,10 @@ class RestockDetailManagementSerializers(serializers.ModelSerializer):
 class RestockManagementSerializers(serializers.ModelSerializer):
     due_date = serializers.DateField(format="%d-%m-%Y")
     supplier = serializers.ReadOnlyField(source='salesman_id.supplier_id.name')
-    total_sparepart_quantity = serializers.SerializerMethodField()
-    total_restock_cost = serializers.SerializerMethodField()
-    remaining_payment = serializers.SerializerMethodField()
-    is_paid_off = serializers.SerializerMethodField()
+    total_sparepart_quantity = serializers.IntegerField(source='total_quantity', read_only=True)
+    total_restock_cost = serializers.IntegerField(source='total_cost', read_only=True)
+    remaining_payment = serializers.IntegerField(read_only=True)
+    is_paid_off = serializers.BooleanField(read_only=True)
     content = RestockDetailManagementSerializers(many=True, source='restock_detail_set')
 
     class Meta:
@@ -442,59 +405,15 @@ class RestockManagementSerializers(serializers.ModelSerializer):
             'content'
         ]
 
-    def get_total_sparepart_quantity(self, obj):
-        # Getting restock_detail data related to the restock
-        restock_detail = RestockDetailManagementSerializers(obj.restock_detail_set, many=True)
-
-        # Calculating amount_of_sparepart by looping trought restock_detail
-        total_sparepart_quantity = 0
-        for detail in restock_detail.data:
-            total_sparepart_quantity += detail['quantity']
-        return total_sparepart_quantity
-
-    def get_total_restock_cost(self, obj):
-        # Getting restock_detail data related to the restock
-        restock_detail = RestockDetailManagementSerializers(obj.restock_detail_set, many=True)
-
-        # Calculating total_restock_cost by looping trought restock_detail
-        total_restock_cost = 0
-        for restock in restock_detail.data:
-            total_restock_cost += restock['sub_total']
-        return total_restock_cost
-
-    def get_remaining_payment(self, obj):
-        # Getting total_cost data
-        total_restock_cost = self.get_total_restock_cost(obj)
-
-        # Calculating remaining_payment subtracting total_cost with deposit
-        remaining_payment = total_restock_cost - int(obj.deposit)
-
-        # Check if remaining payment is greater then 0, if yes return that amount
-        # else return 0, because remaining payment can't be display as negative
-        if remaining_payment < 0:
-            return 0
-        return remaining_payment
-
-    def get_is_paid_off(self, obj):
-        # Getting total_cost data
-        total_restock_cost = self.get_total_restock_cost(obj)
-
-        # Check if deposit is less than total_cost if yes then it's still not paid_off yet
-        if int(obj.deposit) < total_restock_cost:
-            return False
-        return True
-
     def create(self, validated_data):
         # get the nested objects list
         details = validated_data.pop('restock_detail_set')
 
-        # Calculate total_restock_cost
-        total_restock_cost = 0
-        for detail in details:
-            total_restock_cost += int(detail['individual_price']) * detail['quantity']
+        # Calculate total_restock_cost, total quantity and remaining payment that are stored in restock
+        validated_data.update(get_restock_total(details=details, deposit=validated_data['deposit']))
 
         # Set is_paid_off based on deposit and total_restock_cost
-        if validated_data['deposit'] < total_restock_cost:
+        if validated_data['deposit'] < validated_data['total_cost']:
             validated_data['is_paid_off'] = False
         else:
             validated_data['is_paid_off'] = True
@@ -502,15 +421,11 @@ class RestockManagementSerializers(serializers.ModelSerializer):
         # Create restock instance using all validated data
         restock = Restock.objects.create(**validated_data)
 
-        # Creating all restock_detail object related to the restock
-        # by looping throught restock detail list of dict
-        for details in details:
-            # Remove restock_detail_id because in create operations we didn't need it
-            try:
-                details.pop('restock_detail_id')
-            except Exception:
-                pass
-            Restock_detail.objects.create(restock_id=restock, **details)
+        # Creating all restock_detail object related to the restock in single insert,
+        # restock_detail_id is removed because in create operations we didn't need it
+        for detail in details:
+            detail.pop('restock_detail_id', None)
+        Restock_detail.objects.bulk_create([Restock_detail(restock_id=restock, **detail) for detail in details])
         return restock
 
     def update(self, instance, validated_data):
@@ -522,41 +437,19 @@ class RestockManagementSerializers(serializers.ModelSerializer):
         instance.due_date = validated_data.get('customer_contact', instance.due_date)
         instance.deposit = validated_data.get('deposit', instance.deposit)
 
-        # Recalculate total_restock_cost
-        total_restock_cost = 0
-        for detail in validated_details:
-            total_restock_cost += int(detail['individual_price']) * detail['quantity']
+        # Recalculate total_restock_cost, total quantity and remaining payment that are stored in restock
+        for field, value in get_restock_total(details=validated_details, deposit=instance.deposit).items():
+            setattr(instance, field, value)
 
         # Set is_paid_off based on deposit and total_restock_cost
-        if instance.deposit < total_restock_cost:
+        if instance.deposit < instance.total_cost:
             instance.is_paid_off = False
         else:
             instance.is_paid_off = True
 
-        # get all nested objects related with this instance and make a dict(id, object)
-        details_dict = dict((i.restock_detail_id, i) for i in instance.restock_detail_set.all())
-
-        for validated_detail in validated_details:
-            # if exists restock_detail_id
-            if 'restock_detail_id' in validated_detail:
-                # remove from the dict and update
-                detail = details_dict.pop(validated_detail['restock_detail_id'])
-
-                # remove restock_detail_id from validated data as we don't require it.
-                validated_detail.pop('restock_detail_id')
-
-                # loop through the rest of keys in validated data to assign it to its respective field
-                for key in validated_detail.keys():
-                    setattr(detail, key, validated_detail[key])
-
-                detail.save()
-            else:
-                Restock_detail.objects.create(restock_id=instance, **validated_detail)
-
-        # delete remaining elements because they're not present in update call
-        if len(details_dict) > 0:
-            for detail in details_dict.values():
-                detail.delete()
+        # Creating, updating, and deleting restock_detail object related to the restock
+        update_nested_detail(instance=instance, related_name='restock_detail_set',
+                             validated_details=validated_details)
 
         instance.save()
 
@@ -582,96 +475,6 @@ class SupplierManagementSerializers(serializers.ModelSerializer):
         ]
 
 
-class SalesReportSerializers(serializers.ModelSerializer):
-    admin = serializers.ReadOnlyField(source='user_id.profile.name')
-    created_at = serializers.DateTimeField(format='%d-%m-%Y')
-    updated_at = serializers.DateTimeField(format='%d-%m-%Y')
-    customer = serializers.ReadOnlyField(source='customer_id.name')
-    contact = serializers.ReadOnlyField(source='customer_id.contact')
-    total_price_sales = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Sales
-        fields = [
-            'sales_id',
-            'admin',
-            'created_at',
-            'updated_at',
-            'customer',
-            'contact',
-            'total_price_sales',
-            'is_paid_off',
-            'deposit',
-        ]
-
-    def get_total_price_sales(self, obj):
-        sales_serializer = SalesDetailSerializers(obj.sales_detail_set, many=True)
-        total_price = 0
-        for sales in sales_serializer.data:
-            total_price += sales['sub_total']
-        return total_price - int(obj.discount)
-
-
-class RestockReportSerializers(serializers.ModelSerializer):
-    created_at = serializers.DateTimeField(format='%d-%m-%Y')
-    total_restock_cost = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Restock
-        fields = [
-            'restock_id',
-            'created_at',
-            'total_restock_cost',
-            'deposit',
-        ]
-
-    def get_total_restock_cost(self, obj):
-        restock_serializers = RestockDetailSerializers(obj.restock_detail_set, many=True)
-        total = 0
-        for restock in restock_serializers.data:
-            total += int(restock['individual_price']) * restock['quantity']
-        return total
-
-
-class RestockReportDetailSerializers(serializers.ModelSerializer):
-    admin = serializers.ReadOnlyField(source='user_id.profile.name')
-    created_at = serializers.DateTimeField(format='%d-%m-%Y %H:%M:%S')
-    updated_at = serializers.DateTimeField(format='%d-%m-%Y %H:%M:%S')
-    due_date = serializers.DateField(format="%d-%m-%Y")
-    supplier = serializers.ReadOnlyField(source='salesman_id.supplier_id.name')
-    supplier_contact = serializers.ReadOnlyField(source='salesman_id.supplier_id.contact')
-    salesman = serializers.ReadOnlyField(source='salesman_id.name')
-    salesman_contact = serializers.ReadOnlyField(source='salesman_id.contact')
-    content = RestockDetailSerializers(many=True, source='restock_detail_set')
-    total_restock_cost = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Restock
-        fields = [
-            'restock_id',
-            'admin',
-            'created_at',
-            'updated_at',
-            'no_faktur',
-            'total_restock_cost',
-            'is_paid_off',
-            'deposit',
-            'due_date',
-            'supplier',
-            'supplier_contact',
-            'salesman',
-            'salesman_contact',
-            'content',
-        ]
-
-    def get_total_restock_cost(self, obj):
-        restock_serializers = RestockDetailSerializers(obj.restock_detail_set, many=True)
-        total = 0
-        for restock in restock_serializers.data:
-            total += int(restock['individual_price']) * restock['quantity']
-        return total
-
-
 class ProfileSerializers(serializers.ModelSerializer):
     email = serializers.ReadOnlyField(source='user_id.email')
     role = serializers.CharField(source='get_role_display')
@@ -785,31 +588,6 @@ class AdminUpdateSerializers(serializers.ModelSerializer):
         return instance
 
 
-class ServiceReportSerializers(serializers.ModelSerializer):
-    created_at = serializers.DateTimeField(format='%d-%m-%Y')
-    total_service_price = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Service
-        fields = [
-            'service_id',
-            'created_at',
-            'total_service_price',
-            'deposit',
-            'discount'
-        ]
-
-    def get_total_service_price(self, obj):
-        sparepart_serializer = ServiceSparepartSerializers(obj.service_sparepart_set, many=True)
-        action_serializer = ServiceActionSerializers(obj.service_action_set, many=True)
-        total_price = 0
-        for sparepart in sparepart_serializer.data:
-            total_price += sparepart['sub_total']
-        for action in action_serializer.data:
-            total_price += int(action['cost'])
-        return total_price - int(obj.discount)
-
-
 class ServiceActionSerializers(serializers.ModelSerializer):
     service_name = serializers.ReadOnlyField(source='name')
 
@@ -827,7 +605,7 @@ class ServiceSparepartSerializers(serializers.ModelSerializer):
         fields = ['service_sparepart_id', 'sparepart', 'quantity', 'sub_total']
 
     def get_sub_total(self, obj):
-        return int(obj.quantity * obj.sparepart_id.install_price)
+        return int(obj.quantity * obj.individual_price)
 
 
 class ServiceSerializers(serializers.ModelSerializer):
@@ -852,14 +630,7 @@ class ServiceSerializers(serializers.ModelSerializer):
         ]
 
     def get_total_service_price(self, obj):
-        sparepart_serializer = ServiceSparepartSerializers(obj.service_sparepart_set, many=True)
-        action_serializer = ServiceActionSerializers(obj.service_action_set, many=True)
-        total_price = 0
-        for sparepart in sparepart_serializer.data:
-            total_price += sparepart['sub_total']
-        for action in action_serializer.data:
-            total_price += int(action['cost'])
-        return total_price - int(obj.discount)
+        return int(obj.sparepart_total + obj.action_total - obj.discount)
 
 
 class ServiceActionManagementSerializers(serializers.ModelSerializer):
@@ -873,7 +644,7 @@ class ServiceActionManagementSerializers(serializers.ModelSerializer):
 
 class ServiceSparepartManagementSerializers(serializers.ModelSerializer):
     service_sparepart_id = serializers.IntegerField(required=False)
-    price = serializers.ReadOnlyField(source='sparepart_id.install_price')
+    price = serializers.ReadOnlyField(source='individual_price')
     sub_total = serializers.SerializerMethodField()
 
     class Meta:
@@ -881,8 +652,8 @@ class ServiceSparepartManagementSerializers(serializers.ModelSerializer):
         fields = ['service_sparepart_id', 'sparepart_id', 'quantity', 'price', 'sub_total']
 
     def get_sub_total(self, obj):
-        # calculate sub total with install price of sparepart
-        return int(obj.quantity * obj.sparepart_id.install_price)
+        # calculate sub total with install price when sparepart is used
+        return int(obj.quantity * obj.individual_price)
 
 
 class ServiceManagementSerializers(serializers.ModelSerializer):
@@ -890,9 +661,9 @@ class ServiceManagementSerializers(serializers.ModelSerializer):
     customer_contact = serializers.CharField(max_length=15, write_only=True, required=False)
     customer_address = serializers.CharField(max_length=50, write_only=True, required=False)
     is_workshop = serializers.BooleanField(write_only=True, required=False)
-    spareparts_amount = serializers.SerializerMethodField()
-    sub_total_actions = serializers.SerializerMethodField()
-    sub_total_spareparts = serializers.SerializerMethodField()
+    spareparts_amount = serializers.IntegerField(source='total_quantity', read_only=True)
+    sub_total_actions = serializers.IntegerField(source='action_total', read_only=True)
+    sub_total_spareparts = serializers.IntegerField(source='sparepart_total', read_only=True)
     total_service_price = serializers.SerializerMethodField()
     change = serializers.SerializerMethodField()
     remaining_payment = serializers.SerializerMethodField()
@@ -924,41 +695,9 @@ class ServiceManagementSerializers(serializers.ModelSerializer):
             'service_spareparts'
         ]
 
-    def get_spareparts_amount(self, obj):
-        # Getting all service_sparepart data related to the service
-        service_spareparts = ServiceSparepartManagementSerializers(obj.service_sparepart_set, many=True)
-
-        # calculating total quantity by looping throught service_sparepart list
-        sparepart_amounts = 0
-        for sparepart in service_spareparts.data:
-            sparepart_amounts += sparepart['quantity']
-        return sparepart_amounts
-
-    def get_sub_total_actions(self, obj):
-        # Getting all service_action data related to the service
-        service_action = ServiceActionManagementSerializers(obj.service_action_set, many=True)
-
-        # calculating sub_total by looping throught service_action list
-        sub_total = 0
-        for action in service_action.data:
-            sub_total += int(action['cost'])
-        return sub_total
-
-    def get_sub_total_spareparts(self, obj):
-        # Getting all service_sparepart data related to the service
-        service_spareparts = ServiceSparepartManagementSerializers(obj.service_sparepart_set, many=True)
-
-        # calculating sub_total by looping throught service_sparepart list
-        sub_total = 0
-        for sparepart in service_spareparts.data:
-            sub_total += sparepart['sub_total']
-        return sub_total
-
     def get_total_service_price(self, obj):
-        # Getting sub total action and sparepart using class method
-        sub_total_action = self.get_sub_total_actions(obj)
-        sub_total_sparepart = self.get_sub_total_spareparts(obj)
-        return sub_total_action + sub_total_sparepart
+        # Stored sub total of service action and service sparepart
+        return int(obj.action_total + obj.sparepart_total)
 
     def get_change(self, obj):
         # Getting total service price using class method
@@ -1040,13 +779,17 @@ class ServiceManagementSerializers(serializers.ModelSerializer):
         # get the service spareparts nested objects list
         sparepart_details = validated_data.pop('service_sparepart_set')
 
-        # Calculate total_service_price
-        total_service_price = 0
-        for detail in sparepart_details:
-            total_service_price += int(detail['sparepart_id'].install_price) * detail['quantity']
+        # Capture current install price of every sparepart, then calculate total that is stored in service
+        capture_detail_price(
+            validated_details=sparepart_details,
+            old_details=[],
+            id_field='service_sparepart_id',
+            get_price=lambda sparepart: sparepart.install_price
+        )
+        validated_data.update(get_service_total(sparepart_details=sparepart_details, action_details=action_details))
 
         # Set is_paid_off based on deposit and total_service_price
-        if validated_data['deposit'] < total_service_price:
+        if validated_data['deposit'] < validated_data['sparepart_total'] + validated_data['action_total']:
             validated_data['is_paid_off'] = False
         else:
             validated_data['is_paid_off'] = True
@@ -1054,21 +797,17 @@ class ServiceManagementSerializers(serializers.ModelSerializer):
         # create service data / instance
         service = Service.objects.create(**validated_data)
 
-        # create service action data / instance
+        # create service action data / instance in single insert
         for detail in action_details:
-            try:
-                detail.pop('service_action_id')
-            except Exception:
-                pass
-            Service_action.objects.create(service_id=service, **detail)
+            detail.pop('service_action_id', None)
+        Service_action.objects.bulk_create([Service_action(service_id=service, **detail) for detail in action_details])
 
-        # create service sparepart data / instance
+        # create service sparepart data / instance in single insert
         for detail in sparepart_details:
-            try:
-                detail.pop('service_sparepart_id')
-            except Exception:
-                pass
-            Service_sparepart.objects.create(service_id=service, **detail)
+            detail.pop('service_sparepart_id', None)
+        Service_sparepart.objects.bulk_create([
+            Service_sparepart(service_id=service, **detail) for detail in sparepart_details
+        ])
 
         return service
 
@@ -1097,70 +836,27 @@ class ServiceManagementSerializers(serializers.ModelSerializer):
         instance.deposit = validated_data.get('deposit', instance.deposit)
         instance.discount = validated_data.get('discount', instance.discount)
 
-        # Calculate total_service_price
-        total_service_price = 0
-        for sparepart in sparepart_details:
-            total_service_price += int(sparepart['sparepart_id'].install_price) * sparepart['quantity']
-        for action in action_details:
-            total_service_price += int(action['cost'])
+        # Existing service sparepart keep its captured price, then recalculate total that is stored in service
+        capture_detail_price(
+            validated_details=sparepart_details,
+            old_details=instance.service_sparepart_set.all(),
+            id_field='service_sparepart_id',
+            get_price=lambda sparepart: sparepart.install_price
+        )
+        for field, value in get_service_total(sparepart_details=sparepart_details,
+                                              action_details=action_details).items():
+            setattr(instance, field, value)
 
         # Set is_paid_off based on deposit and total_service_price
-        if instance.deposit < total_service_price:
+        if instance.deposit < instance.sparepart_total + instance.action_total:
             instance.is_paid_off = False
         else:
             instance.is_paid_off = True
 
-        # get all service action nested objects related with this instance
-        # and make a dict(id, object)
-        action_dict = dict((i.service_action_id, i) for i in instance.service_action_set.all())
-
-        # Updating service actions of particular service
-        for validated_detail in action_details:
-            if 'service_action_id' in validated_detail:
-                # if exists service_action_id remove from the dict and update
-                detail = action_dict.pop(validated_detail['service_action_id'])
-
-                # remove service_action_id from validated data as we don't require it.
-                validated_detail.pop('service_action_id')
-
-                # loop through the rest of keys in validated data to assign it to its respective field
-                for key in validated_detail.keys():
-                    setattr(detail, key, validated_detail[key])
-
-                detail.save()
-            else:
-                Service_action.objects.create(service_id=instance, **validated_detail)
-
-        # delete remaining service action elements because they're not present in update call
-        if len(action_dict) > 0:
-            for detail in action_dict.values():
-                detail.delete()
-
-        # get all service sparepart nested objects related with this instance
-        # and make a dict(id, object)
-        sparepart_dict = dict((i.service_sparepart_id, i) for i in instance.service_sparepart_set.all())
-
-        # Updating service spareparts of particular service
-        for validated_detail in sparepart_details:
-            if 'service_sparepart_id' in validated_detail:
-                # if exists service_sparepart_id remove from the dict and update
-                detail = sparepart_dict.pop(validated_detail['service_sparepart_id'])
-
-                # remove service_sparepart_id from validated data as we don't require it.
-                validated_detail.pop('service_sparepart_id')
-
-                # loop through the rest of keys in validated data to assign it to its respective field
-                for key in validated_detail.keys():
-                    setattr(detail, key, validated_detail[key])
-
-                detail.save()
-            else:
-                Service_sparepart.objects.create(service_id=instance, **validated_detail)
-
-        # delete remaining service sparepart elements because they're not present in update call
-        if len(sparepart_dict) > 0:
-            for detail in sparepart_dict.values():
-                detail.delete()
+        # Creating, updating, and deleting service actions and service spareparts of particular service
+        update_nested_detail(instance=instance, related_name='service_action_set', validated_details=action_details)
+        update_nested_detail(instance=instance, related_name='service_sparepart_set',
+                             validated_details=sparepart_details)
 
         instance.save()
 
@@ -1180,9 +876,10 @@ class CategorySerializers(serializers.ModelSerializer):
 
 
 class CustomerSerializers(serializers.ModelSerializer):
-    number_of_service = serializers.SerializerMethodField()
-    total_payment = serializers.SerializerMethodField()
-    remaining_payment = serializers.SerializerMethodField()
+    # Current year service count and payment are annotated by customer_balance_expressions
+    number_of_service = serializers.IntegerField(read_only=True)
+    total_payment = serializers.IntegerField(read_only=True)
+    remaining_payment = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Customer
@@ -1197,55 +894,6 @@ class CustomerSerializers(serializers.ModelSerializer):
             'remaining_payment'
         ]
 
-    def get_number_of_service(self, obj):
-        # Getting service data related to the customer
-        services = ServiceSerializers(obj.service_set, many=True)
-
-        # Calculating number of service related to the customer, only current year
-        number_of_service = 0
-        for service in services.data:
-            if str(date.today().year) in service['created_at']:
-                number_of_service += 1
-        return number_of_service
-
-    def get_total_payment(self, obj):
-        # Getting services and sales data, that related to customer
-        services = ServiceSerializers(obj.service_set, many=True)
-        sales = SalesSerializers(obj.sales_set, many=True)
-
-        # Calculating total_payment by looping trought services and sales data, only current year
-        total_payment = 0
-        for service in services.data:
-            if str(date.today().year) in service['created_at']:
-                total_payment += service['total_service_price']
-        for sale in sales.data:
-            if str(date.today().year) in sale['created_at']:
-                total_payment += sale['total_price_sales']
-        return total_payment
-
-    def get_remaining_payment(self, obj):
-        # Getting total payment
-        total_payment = self.get_total_payment(obj)
-
-        # Getting services and sales data, that related to customer
-        services = ServiceReportSerializers(obj.service_set, many=True)
-        sales = SalesReportSerializers(obj.sales_set, many=True)
-
-        # Calculating deposit by looping trought services and sales data, only current year
-        deposit = 0
-        for service in services.data:
-            if str(date.today().year) in service['created_at']:
-                deposit += int(service['deposit'])
-        for sale in sales.data:
-            if str(date.today().year) in sale['created_at']:
-                deposit += int(sale['deposit'])
-
-        # Calculating remaining_payment, then return it if value is positive
-        remaining_payment = total_payment - deposit
-        if remaining_payment > 0:
-            return remaining_payment
-        return 0
-
 
 class CustomerManagementSerializers(serializers.ModelSerializer):
     class Meta:
@@ -1276,7 +924,7 @@ class SalesmanManagementSerializers(serializers.ModelSerializer):
 class RestockDueSerializers(serializers.ModelSerializer):
     supplier = serializers.ReadOnlyField(source='supplier_id.name')
     created_at = serializers.DateTimeField(format='%d-%m-%Y %H:%M:%S')
-    remaining_payment = serializers.SerializerMethodField()
+    remaining_payment = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Restock
@@ -1289,14 +937,6 @@ class RestockDueSerializers(serializers.ModelSerializer):
             'due_date'
         ]
 
-    def get_remaining_payment(self, obj):
-        restock_serializers = RestockDetailSerializers(obj.restock_detail_set, many=True)
-        total = 0
-        for restock in restock_serializers.data:
-            total += int(restock['individual_price']) * restock['quantity']
-        remaining_payment = total - int(obj.deposit)
-        return remaining_payment
-
 
 class SparepartOnLimitSerializers(serializers.ModelSerializer):
     brand = serializers.ReadOnlyField(source='brand_id.name')
@@ -1307,332 +947,83 @@ class SparepartOnLimitSerializers(serializers.ModelSerializer):
         fields = ['sparepart_id', 'partnumber', 'name', 'brand', 'stock']
 
 
-class SalesDetailWithDateSerializers(serializers.ModelSerializer):
-    created_at = serializers.DateTimeField(format='%d-%m-%Y %H:%M:%S')
-
-    class Meta:
-        model = Sales_detail
-        fields = '__all__'
-
-
 class SparepartMostSoldSerializers(serializers.ModelSerializer):
     brand = serializers.ReadOnlyField(source='brand_id.name')
-    total_sold = serializers.SerializerMethodField()
+    total_sold = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Sparepart
         fields = ['sparepart_id', 'partnumber', 'name', 'brand', 'total_sold']
 
-    def get_total_sold(self, obj):
-        sales_detail = SalesDetailWithDateSerializers(obj.sales_detail_set, many=True)
-        total_sold = 0
-        for detail in sales_detail.data:
-            if int(detail['created_at'].split('-')[1]) == date.today().month:
-                total_sold += detail['quantity']
-        return total_sold
-
-
-class ServiceSparepartWithDateSerializers(serializers.ModelSerializer):
-    created_at = serializers.DateTimeField(format='%d-%m-%Y %H:%M:%S')
-
-    class Meta:
-        model = Service_sparepart
-        fields = '__all__'
-
 
 class SparepartMostUsedSerializers(serializers.ModelSerializer):
     brand = serializers.ReadOnlyField(source='brand_id.name')
-    total_used = serializers.SerializerMethodField()
+    total_used = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Sparepart
         fields = ['sparepart_id', 'partnumber', 'name', 'brand', 'total_used']
 
-    def get_total_used(self, obj):
-        services_detail = ServiceSparepartWithDateSerializers(obj.service_sparepart_set, many=True)
-        total_used = 0
-        for detail in services_detail.data:
-            if int(detail['created_at'].split('-')[1]) == date.today().month:
-                total_used += detail['quantity']
-        return total_used
-
-
-class SalesRevenueSerializers(serializers.ModelSerializer):
-    revenue = serializers.SerializerMethodField()
-    created_at = serializers.DateTimeField(format='%d-%m-%Y')
-
-    class Meta:
-        model = Sales
-        fields = ['sales_id', 'revenue', 'created_at']
-
-    def get_revenue(self, obj):
-        sales_serializer = SalesDetailSerializers(obj.sales_detail_set, many=True)
-        revenue = 0
-        for sales in sales_serializer.data:
-            revenue += sales['sub_total']
-        return revenue
-
-
-class ServiceRevenueSerializers(serializers.ModelSerializer):
-    revenue = serializers.SerializerMethodField()
-    created_at = serializers.DateTimeField(format='%d-%m-%Y')
-
-    class Meta:
-        model = Service
-        fields = ['service_id', 'revenue', 'created_at']
-
-    def get_revenue(self, obj):
-        sparepart_serializer = ServiceSparepartSerializers(obj.service_sparepart_set, many=True)
-        action_serializer = ServiceActionSerializers(obj.service_action_set, many=True)
-        revenue = 0
-        for sparepart in sparepart_serializer.data:
-            revenue += sparepart['sub_total']
-        for action in action_serializer.data:
-            revenue += int(action['cost'])
-        return revenue - int(obj.discount)
-
-
-class RestockExpenditureSerializers(serializers.ModelSerializer):
-    created_at = serializers.DateTimeField(format='%d-%m-%Y')
-    expenditure = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Restock
-        fields = ['restock_id', 'expenditure', 'created_at']
-
-    def get_expenditure(self, obj):
-        restock_serializers = RestockDetailSerializers(obj.restock_detail_set, many=True)
-        expenditure = 0
-        for restock in restock_serializers.data:
-            expenditure += int(restock['individual_price']) * restock['quantity']
-        return expenditure
-
-
-class SalesDetailReceiptSerializers(serializers.ModelSerializer):
-    sparepart = serializers.ReadOnlyField(source='sparepart_id.name')
-    sub_total = serializers.SerializerMethodField()
-    individual_price = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Sales_detail
-        fields = ['sales_detail_id', 'sparepart', 'quantity', 'individual_price', 'sub_total']
 
-    def get_sub_total(self, obj):
-        # Check if workshop is true
-        if obj.sales_id.customer_id.is_workshop:
-            # calculate with workshop price
-            return int(obj.quantity * obj.sparepart_id.workshop_price)
+class SalesReceiptSerializers(serializers.BaseSerializer):
+    # Receipt data is built in one pass by get_sales_receipt, the same data is rendered as receipt pdf
+    def to_representation(self, instance):
+        return get_sales_receipt(instance)
 
-        # calculate with normal price
-        return int(obj.quantity * obj.sparepart_id.price)
 
-    def get_individual_price(self, obj):
-        # Check if workshop is true
-        if obj.sales_id.customer_id.is_workshop:
-            # return individual sparepart workshop price
-            return int(obj.sparepart_id.workshop_price)
+class ServiceReceiptSerializers(serializers.BaseSerializer):
+    # Receipt data is built in one pass by get_service_receipt, the same data is rendered as receipt pdf
+    def to_representation(self, instance):
+        return get_service_receipt(instance)
 
-        # return individual sparepart normal price
-        return int(obj.sparepart_id.price)
 
-
-class SalesReceiptSerializers(serializers.ModelSerializer):
-    created_at = serializers.DateTimeField(format='%d-%m-%Y %H:%M:%S')
-    customer_name = serializers.ReadOnlyField(source='customer_id.name')
-    customer_contact = serializers.ReadOnlyField(source='customer_id.contact')
-    total_quantity = serializers.SerializerMethodField()
-    total_price = serializers.SerializerMethodField()
-    final_total_price = serializers.SerializerMethodField()
-    change = serializers.SerializerMethodField()
-    remaining_payment = serializers.SerializerMethodField()
-    content = SalesDetailReceiptSerializers(many=True, source='sales_detail_set')
+class ReportJobSerializers(serializers.ModelSerializer):
+    month = serializers.IntegerField(min_value=1, max_value=12)
+    created_at = serializers.DateTimeField(format='%d-%m-%Y %H:%M:%S', read_only=True)
+    finished_at = serializers.DateTimeField(format='%d-%m-%Y %H:%M:%S', read_only=True)
 
     class Meta:
-        model = Sales
+        model = Report_job
         fields = [
-            'sales_id',
+            'report_job_id',
+            'report_type',
+            'year',
+            'month',
+            'status',
+            'error',
             'created_at',
-            'customer_name',
-            'customer_contact',
-            'deposit',
-            'discount',
-            'total_quantity',
-            'total_price',
-            'final_total_price',
-            'change',
-            'remaining_payment',
-            'is_paid_off',
-            'content'
+            'finished_at',
         ]
+        read_only_fields = ['status', 'error']
 
-    def get_total_quantity(self, obj):
-        # Getting all sales_detail data related to the sales
-        sales_serializer = SalesDetailReceiptSerializers(obj.sales_detail_set, many=True)
-
-        # calculating total quantity by looping throught sales_detail list
-        quantity = 0
-        for sales in sales_serializer.data:
-            quantity += sales['quantity']
-        return quantity
-
-    def get_total_price(self, obj):
-        # Getting all sales_detail data related to the sales
-        sales_serializer = SalesDetailReceiptSerializers(obj.sales_detail_set, many=True)
-
-        # calculating total price by looping throught sales_detail list
-        total_price = 0
-        for sales in sales_serializer.data:
-            total_price += sales['sub_total']
-        return total_price
-
-    def get_final_total_price(self, obj):
-        # Getting total sales price using class method
-        total_price = self.get_total_price(obj)
-        return total_price - int(obj.discount)
-
-    def get_change(self, obj):
-        # Getting total_price using class method
-        total_price = self.get_total_price(obj)
-
-        change = int(obj.deposit) - total_price
-
-        # Check if change is greater then 0, if yes return that amount
-        # else return 0, because change can't be display as negative
-        if change > 0:
-            return change
-        return 0
-
-    def get_remaining_payment(self, obj):
-        # Getting total_price using class method
-        total_price = self.get_total_price(obj)
-
-        # Calculating remaining_payment subtracting total_price with deposit
-        total = total_price - int(obj.deposit)
-
-        # Check if remaining payment is greater then 0, if yes return that amount
-        # else return 0, because remaining payment can't be display as negative
-        if total > 0:
-            return total
-        return 0
-
-
-class ServiceSparepartReceiptSerializers(serializers.ModelSerializer):
-    sparepart = serializers.ReadOnlyField(source='sparepart_id.name')
-    individual_price = serializers.ReadOnlyField(source='sparepart_id.install_price')
-    sub_total = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Service_sparepart
-        fields = ['service_sparepart_id', 'sparepart', 'quantity', 'individual_price', 'sub_total']
-
-    def get_sub_total(self, obj):
-        return int(obj.quantity * obj.sparepart_id.install_price)
 
+class StockMovementSerializers(serializers.ModelSerializer):
+    movement_type = serializers.CharField(source='get_movement_type_display', read_only=True)
+    created_at = serializers.DateTimeField(format='%d-%m-%Y %H:%M:%S', read_only=True)
 
-class ServiceActionReceiptSerializers(serializers.ModelSerializer):
     class Meta:
-        model = Service_action
-        fields = ['service_action_id', 'name', 'cost']
+        model = Stock_movement
+        fields = [
+            'stock_movement_id',
+            'movement_type',
+            'quantity',
+            'reference_id',
+            'created_at',
+        ]
 
 
-class ServiceReceiptSerializers(serializers.ModelSerializer):
-    created_at = serializers.DateTimeField(format='%d-%m-%Y %H:%M:%S')
-    customer_name = serializers.ReadOnlyField(source='customer_id.name')
-    total_quantity = serializers.SerializerMethodField()
-    sub_total_action = serializers.SerializerMethodField()
-    sub_total_part = serializers.SerializerMethodField()
-    total_price = serializers.SerializerMethodField()
-    final_total_price = serializers.SerializerMethodField()
-    change = serializers.SerializerMethodField()
-    remaining_payment = serializers.SerializerMethodField()
-    service_spareparts = ServiceSparepartReceiptSerializers(many=True, source='service_sparepart_set')
-    service_actions = ServiceActionReceiptSerializers(many=True, source='service_action_set')
+class StockAlertSerializers(serializers.ModelSerializer):
+    name = serializers.ReadOnlyField(source='sparepart_id.name')
+    created_at = serializers.DateTimeField(format='%d-%m-%Y %H:%M:%S', read_only=True)
 
     class Meta:
-        model = Service
+        model = Stock_alert
         fields = [
-            'service_id',
+            'stock_alert_id',
+            'sparepart_id',
+            'name',
+            'quantity',
+            'limit',
+            'is_low',
             'created_at',
-            'customer_name',
-            'motor_type',
-            'police_number',
-            'total_quantity',
-            'sub_total_part',
-            'sub_total_action',
-            'total_price',
-            'discount',
-            'final_total_price',
-            'deposit',
-            'change',
-            'remaining_payment',
-            'service_actions',
-            'service_spareparts'
         ]
-
-    def get_total_quantity(self, obj):
-        # Getting all service_sparepart data related to the service
-        service_spareparts = ServiceSparepartManagementSerializers(obj.service_sparepart_set, many=True)
-
-        # calculating total quantity by looping throught service_sparepart list
-        sparepart_amounts = 0
-        for sparepart in service_spareparts.data:
-            sparepart_amounts += sparepart['quantity']
-        return sparepart_amounts
-
-    def get_sub_total_part(self, obj):
-        # Getting all service_sparepart and service_action data related to the service
-        sparepart_serializer = ServiceSparepartSerializers(obj.service_sparepart_set, many=True)
-
-        # calculating total price by looping throught service_sparepart list
-        sub_total = 0
-        for sparepart in sparepart_serializer.data:
-            sub_total += sparepart['sub_total']
-        return sub_total
-
-    def get_sub_total_action(self, obj):
-        # Getting service_action data related to the service
-        action_serializer = ServiceActionSerializers(obj.service_action_set, many=True)
-
-        # calculating total price by looping throught service_action list
-        sub_total = 0
-        for action in action_serializer.data:
-            sub_total += int(action['cost'])
-        return sub_total
-
-    def get_total_price(self, obj):
-        # Getting all service_sparepart and service_action sub_total using class method
-        sub_total_sparepart = self.get_sub_total_part(obj)
-        sub_total_action = self.get_sub_total_action(obj)
-
-        total_price = sub_total_sparepart + sub_total_action
-
-        return total_price
-
-    def get_final_total_price(self, obj):
-        # Getting total service price using class method
-        total_price = self.get_total_price(obj)
-        return total_price - int(obj.discount)
-
-    def get_change(self, obj):
-        # Getting final total service price using class method
-        total = self.get_final_total_price(obj)
-
-        change = int(obj.deposit) - total
-
-        # Check if change is greater then 0, if yes return that amount
-        # else return 0, because change can't be display as negative
-        if change > 0:
-            return change
-        return 0
-
-    def get_remaining_payment(self, obj):
-        # Getting total service price using class method
-        total = self.get_final_total_price(obj)
-
-        remaining_payment = total - int(obj.deposit)
-
-        # Check if remaining payment is greater then 0, if yes return that amount
-        # else return 0, because remaining payment can't be display as negative
-        if remaining_payment > 0:
-            return remaining_payment
-        return 0
@@ -1,14 +1,46 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import date, timedelta
+from io import BytesIO, StringIO
+from unittest.mock import Mock, patch
 
+import numpy as np
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import (TransactionTestCase, override_settings,
+                         skipUnlessDBFeature)
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from openpyxl import Workbook
+from pypdf import PdfReader
 from rest_framework import status
-from rest_framework.test import APITestCase
-from si_mbe.models import (Brand, Category, Customer, Mechanic, Profile,
-                           Restock, Restock_detail, Sales, Sales_detail,
-                           Salesman, Service, Service_action,
-                           Service_sparepart, Sparepart, Supplier)
+from rest_framework.test import APIClient, APITestCase
+from si_mbe.models import (Brand, Category, Customer, Daily_sparepart_summary,
+                           Daily_summary, Logs, Mechanic, Profile, Restock,
+                           Restock_detail, Sales, Sales_detail, Salesman,
+                           Service, Service_action, Service_sparepart,
+                           Sparepart, Stock_alert, Stock_movement,
+                           Stock_snapshot, Supplier)
+from si_mbe import utility
+from si_mbe.caches import get_report_generation
+from si_mbe.receipts import get_sales_receipt, get_service_receipt
+from si_mbe.reorder import get_daily_consumption
+from si_mbe.serializers import (SalesReceiptSerializers,
+                                ServiceReceiptSerializers)
+from si_mbe.utility import (close_receipt_pool, rebuild_daily_summary,
+                            rebuild_restock_total, rebuild_stock_movement,
+                            rebuild_transaction_total, take_stock_snapshot,
+                            update_nested_detail, verify_daily_summary,
+                            verify_restock_total, verify_stock_movement,
+                            verify_transaction_total)
 from si_mbe.validators import CustomerConflictError, CustomerValidationError
+from si_mbe.views import (ReceiptBatch, RestockList, SalesList, SalesReceipt,
+                          ServiceList, ServiceReceipt)
 
 
 # Create your tests here.
@@ -113,6 +145,9 @@ class AdminDashboardTestCase(SetTestCase):
                 quantity=11+i
             )
 
+        # Restock detail is created directly, so stored restock total is recalculated
+        rebuild_restock_total()
+
         # Setting up service
         cls.service = Service.objects.create(
             police_number='B 23 A',
@@ -151,6 +186,11 @@ class AdminDashboardTestCase(SetTestCase):
             sparepart_id=cls.sparepart[6],
             quantity=21
         )
+
+        # Detail is created directly, so stored sales and service total and daily summary is recalculated
+        rebuild_transaction_total()
+        rebuild_daily_summary()
+
         return super().setUpTestData()
 
     def test_admin_successfully_accessed_admin_dashboard(self) -> None:
@@ -165,6 +205,41 @@ class AdminDashboardTestCase(SetTestCase):
         self.assertEqual(len(response.data['most_sold']), 10)
         self.assertEqual(len(response.data['most_used']), 10)
 
+    def test_admin_successfully_accessed_admin_dashboard_sparepart_ranking(self) -> None:
+        """
+        Ensure admin can get most sold and most used sparepart ranking with custom limit
+        """
+        # Moving sales detail of the most sold sparepart to previous year
+        Sales_detail.objects.filter(sparepart_id=self.sparepart[5]).update(
+            created_at=timezone.now() - timedelta(days=400)
+        )
+        rebuild_daily_summary()
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.admin_dashboard_url + '?limit=3')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(sparepart['sparepart_id'], sparepart['total_sold']) for sparepart in response.data['most_sold']],
+            [(self.sparepart[2].sparepart_id, 26), (self.sparepart[3].sparepart_id, 23),
+             (self.sparepart[0].sparepart_id, 10)]
+        )
+        self.assertEqual(
+            [(sparepart['sparepart_id'], sparepart['total_used']) for sparepart in response.data['most_used']],
+            [(self.sparepart[3].sparepart_id, 31), (self.sparepart[1].sparepart_id, 28),
+             (self.sparepart[6].sparepart_id, 21)]
+        )
+        self.assertEqual(response.data['most_used'][0]['brand'], self.brand.name)
+
+    def test_admin_failed_to_access_admin_dashboard_with_invalid_params(self) -> None:
+        """
+        Ensure admin cannot access admin dashboard with invalid year, month or limit
+        """
+        self.client.force_authenticate(user=self.user)
+        for params in ('?year=abc', '?month=13', '?month=0', '?limit=-1', '?limit=0', '?limit=1000'):
+            response = self.client.get(self.admin_dashboard_url + params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response.data, {'message': 'Data dashboard tidak sesuai / tidak lengkap'})
+
     def test_nonlogin_user_failed_to_access_admin_dashboard(self) -> None:
         """
         Ensure non-login user cannot access admin dashboard
@@ -635,6 +710,9 @@ class SalesListTestCase(SetTestCase):
             sparepart_id=cls.spareparts[1]
         )
 
+        # Detail is created directly, so stored sales and service total is recalculated
+        rebuild_transaction_total()
+
         return super().setUpTestData()
 
     def test_admin_successfully_access_sales_list(self) -> None:
@@ -691,6 +769,79 @@ class SalesListTestCase(SetTestCase):
                          self.sales_details_3.quantity)
         self.assertEqual(response.data['results'][1]['content'][1]['sub_total'], 16200000)
 
+    def test_admin_access_sales_list_with_constant_number_of_query(self) -> None:
+        """
+        Ensure sales list query count doesn't grow with number of sales and sales detail in the page
+        """
+        self.client.force_authenticate(user=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.sales_url)
+        query_count = len(queries)
+
+        # Adding sales of workshop customer with several detail each
+        workshop = Customer.objects.create(name='Steris', contact='085456105312', is_workshop=True)
+        for i in range(10):
+            sales = Sales.objects.create(customer_id=workshop)
+            for sparepart in self.spareparts[:3]:
+                Sales_detail.objects.create(quantity=1, sales_id=sales, sparepart_id=sparepart)
+
+        rebuild_transaction_total()
+
+        with self.assertNumQueries(query_count):
+            response = self.client.get(self.sales_url)
+        self.assertEqual(response.data['count_item'], 12)
+        self.assertEqual(response.data['results'][2]['total_price_sales'], 5300000 * 3)
+        self.assertEqual(response.data['results'][2]['content'][0]['sub_total'], 5300000)
+
+    def test_sales_total_is_kept_after_sparepart_price_changed(self) -> None:
+        """
+        Ensure sales use price when it's sold, and transaction total command find and fix stored total
+        """
+        Sparepart.objects.filter(pk=self.spareparts[3].pk).update(price=6000000)
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.sales_url)
+        self.assertEqual(response.data['results'][0]['total_price_sales'], 10800000)
+        self.assertEqual(response.data['results'][0]['content'][0]['sub_total'], 10800000)
+        self.assertEqual(verify_transaction_total(), [])
+        call_command('transaction_total', '--verify', stdout=StringIO())
+
+        # Detail that is created directly doesn't have price, so it's reported along with its sales total
+        Sales_detail.objects.create(quantity=1, sales_id=self.sales[0], sparepart_id=self.spareparts[3])
+        self.assertEqual(len(verify_transaction_total()), 2)
+        with self.assertRaises(CommandError):
+            call_command('transaction_total', '--verify', stdout=StringIO())
+
+        call_command('transaction_total', stdout=StringIO())
+        sales = Sales.objects.get(pk=self.sales[0].pk)
+        self.assertEqual((sales.total_price, sales.total_quantity), (10800000 + 6000000, 3))
+        self.assertEqual(verify_transaction_total(), [])
+        self.assertEqual(verify_daily_summary(), [])
+
+    def test_sales_list_values_row_is_the_same_as_serializer(self) -> None:
+        """
+        Ensure sales list built from values row is the same as sales list serializer, including sales
+        without customer
+        """
+        sales = Sales.objects.create(discount=1000)
+        Sales_detail.objects.create(quantity=1, sales_id=sales, sparepart_id=self.spareparts[2])
+        rebuild_transaction_total()
+
+        queryset = SalesList.queryset.all()
+        self.assertEqual(SalesList.list_rows(list(SalesList.list_values(queryset))),
+                         SalesList.serializer_class(queryset, many=True).data)
+
+    def test_admin_successfully_get_sales_list_through_serializer(self) -> None:
+        """
+        Ensure sales list without values row is read through serializer with the same response
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.sales_url)
+
+        with patch.object(SalesList, 'list_values', None):
+            serializer_response = self.client.get(self.sales_url)
+        self.assertEqual(serializer_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(serializer_response.data, response.data)
+
     def test_nonlogin_user_failed_to_access_sales_list(self) -> None:
         """
         Ensure non-login user cannot access sales list
@@ -1125,6 +1276,8 @@ class SalesUpdateTestCase(SetTestCase):
             sparepart_id=self.spareparts[0]
         )
 
+        rebuild_transaction_total()
+
         # Creating data that gonna be use as input
         self.data = {
             'customer_id': self.customer.customer_id,
@@ -1215,6 +1368,74 @@ class SalesUpdateTestCase(SetTestCase):
         self.assertEqual(self.spareparts[0].quantity, 55)
         self.assertEqual(self.spareparts[2].quantity, 49)
 
+    def test_admin_successfully_update_sales_with_removed_detail(self) -> None:
+        """
+        Ensure sparepart quantity of removed detail is returned to stock
+        """
+        self.data['content'] = [
+            {
+                'sales_detail_id': self.sales_detail_1.sales_detail_id,
+                'sparepart_id': self.spareparts[2].sparepart_id,
+                'quantity': 5,
+            }
+        ]
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.put(self.sales_update_url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # sparepart quantity is updated in single query from old and new detail
+        self.assertEqual(Sparepart.objects.get(sparepart_id=self.spareparts[0].sparepart_id).quantity, 85)
+        self.assertEqual(Sparepart.objects.get(sparepart_id=self.spareparts[1].sparepart_id).quantity, 51)
+        self.assertEqual(Sparepart.objects.get(sparepart_id=self.spareparts[2].sparepart_id).quantity, 49)
+
+    def test_update_nested_detail_apply_change_in_bulk(self) -> None:
+        """
+        Ensure nested detail is deleted, updated, and created with single query each, and
+        sparepart of deleted detail can be used by new detail
+        """
+        sales = Sales.objects.prefetch_related('sales_detail_set').get(sales_id=self.sales.sales_id)
+        old_details = {detail.sales_detail_id: detail for detail in sales.sales_detail_set.all()}
+        spareparts = list(self.spareparts)
+
+        with self.assertNumQueries(3):
+            diff = update_nested_detail(instance=sales, related_name='sales_detail_set', validated_details=[
+                {
+                    'sales_detail_id': self.sales_detail_1.sales_detail_id,
+                    'sparepart_id': spareparts[2],
+                    'quantity': 5,
+                },
+                {
+                    'sparepart_id': spareparts[0],
+                    'quantity': 4,
+                }
+            ])
+
+        self.assertEqual(len(diff['created']), 1)
+        self.assertEqual(len(diff['updated']), 1)
+        self.assertEqual(diff['deleted'][0].sales_detail_id, self.sales_detail_2.sales_detail_id)
+        self.assertEqual(old_details[self.sales_detail_1.sales_detail_id].quantity, 2)
+        self.assertEqual(
+            sorted(Sales_detail.objects.filter(sales_id=self.sales).values_list('sparepart_id', 'quantity')),
+            sorted([(self.spareparts[2].sparepart_id, 5), (self.spareparts[0].sparepart_id, 4)])
+        )
+
+        # unchanged detail is not updated
+        with self.assertNumQueries(1):
+            diff = update_nested_detail(instance=sales, related_name='sales_detail_set', validated_details=[
+                {
+                    'sales_detail_id': self.sales_detail_1.sales_detail_id,
+                    'sparepart_id': spareparts[2],
+                    'quantity': 5,
+                },
+                {
+                    'sales_detail_id': diff['created'][0].sales_detail_id,
+                    'sparepart_id': spareparts[0],
+                    'quantity': 4,
+                }
+            ])
+        self.assertEqual(diff, {'created': [], 'updated': [], 'deleted': []})
+
     def test_admin_successfully_update_sales_as_paid_off(self) -> None:
         """
         Ensure admin can update new sales data with it's content_as paid off
@@ -1481,6 +1702,9 @@ class RestockListTestCase(SetTestCase):
             sparepart_id=cls.spareparts[1]
         )
 
+        # Restock detail is created directly, so stored restock total is recalculated
+        rebuild_restock_total()
+
         return super().setUpTestData()
 
     def test_admin_successfully_access_restock_list(self) -> None:
@@ -1541,6 +1765,33 @@ class RestockListTestCase(SetTestCase):
         self.assertEqual(response.data['results'][1]['content'][1]['total_price'],
                          13650000)
 
+    def test_restock_total_is_verified_and_rebuilt(self) -> None:
+        """
+        Ensure restock total command find stored total that is different from restock detail and fix it
+        """
+        self.assertEqual(verify_restock_total(), [])
+        call_command('restock_total', '--verify', stdout=StringIO())
+
+        Restock_detail.objects.filter(pk=self.restock_detail_1.pk).update(quantity=4)
+        self.assertEqual(len(verify_restock_total()), 1)
+        with self.assertRaises(CommandError):
+            call_command('restock_total', '--verify', stdout=StringIO())
+
+        call_command('restock_total', stdout=StringIO())
+        restock = Restock.objects.get(pk=self.restocks[0].pk)
+        self.assertEqual((restock.total_cost, restock.total_quantity, restock.remaining_payment),
+                         (18200000, 4, 18200000))
+        self.assertEqual(verify_restock_total(), [])
+        self.assertEqual(verify_daily_summary(), [])
+
+    def test_restock_list_values_row_is_the_same_as_serializer(self) -> None:
+        """
+        Ensure restock list built from values row is the same as restock list serializer
+        """
+        queryset = RestockList.queryset.all()
+        self.assertEqual(RestockList.list_rows(list(RestockList.list_values(queryset))),
+                         RestockList.serializer_class(queryset, many=True).data)
+
     def test_nonlogin_failed_to_access_restock_list(self) -> None:
         """
         Ensure non-login user cannot access restock list
@@ -2573,6 +2824,9 @@ class ServiceListTestCase(SetTestCase):
             sparepart_id=cls.sparepart_2
         )
 
+        # Detail is created directly, so stored sales and service total is recalculated
+        rebuild_transaction_total()
+
         # Setting up time data for test comparison
         cls.created_at_1 = cls.service_1.created_at + timedelta(hours=7)
         cls.created_at_2 = cls.service_2.created_at + timedelta(hours=7)
@@ -2646,6 +2900,14 @@ class ServiceListTestCase(SetTestCase):
         self.assertEqual(response.data['results'][1]['service_spareparts'][1]['sub_total'],
                          int(self.service_sparepart_3.sparepart_id.install_price * self.service_sparepart_3.quantity))
 
+    def test_service_list_values_row_is_the_same_as_serializer(self) -> None:
+        """
+        Ensure service list built from values row is the same as service list serializer
+        """
+        queryset = ServiceList.queryset.all()
+        self.assertEqual(ServiceList.list_rows(list(ServiceList.list_values(queryset))),
+                         ServiceList.serializer_class(queryset, many=True).data)
+
     def test_nonlogin_user_failed_to_access_service_list(self) -> None:
         """
         Ensure non-login user cannot access service list
@@ -2980,6 +3242,17 @@ class ServiceAddTestCase(SetTestCase):
         # after service successfully added
         self.assertEqual(Sparepart.objects.all()[0].quantity, 48)
 
+    def test_admin_successfully_add_service_not_paid_off_when_deposit_only_cover_spareparts(self) -> None:
+        """
+        Ensure service is not paid off when deposit cover sparepart total but not service action total
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.service_add_url, {**self.data_paid, 'deposit': 220000}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['remaining_payment'], 60000)
+        self.assertEqual(response.data['is_paid_off'], False)
+        self.assertEqual(Service.objects.get().is_paid_off, False)
+
     def test_admin_successfully_add_service_with_new_customer(self) -> None:
         """
         Ensure admin can add new service data with it's content, also create customer
@@ -3184,6 +3457,8 @@ class ServiceUpdateTestCase(SetTestCase):
             sparepart_id=self.sparepart_2
         )
 
+        rebuild_transaction_total()
+
         self.data = {
             'mechanic_id': self.mechanic.mechanic_id,
             'customer_id': self.customer.customer_id,
@@ -4026,6 +4301,9 @@ class CustomerListTestCase(SetTestCase):
             service_id=cls.service_2
         )
 
+        # Detail is created directly, so stored sales and service total is recalculated
+        rebuild_transaction_total()
+
         return super().setUpTestData()
 
     def test_admin_successfully_access_customer_list(self) -> None:
@@ -4051,6 +4329,36 @@ class CustomerListTestCase(SetTestCase):
         self.assertEqual(response.data['results'][1]['total_payment'], 28000)
         self.assertEqual(response.data['results'][1]['remaining_payment'], 28000)
 
+    def test_admin_access_customer_list_with_constant_number_of_query(self) -> None:
+        """
+        Ensure customer list query count doesn't grow with number of customer and their transaction,
+        and only transaction of current year is counted
+        """
+        self.client.force_authenticate(user=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.customer_url)
+        query_count = len(queries)
+
+        # Adding customer with sales and service, one of each is made last year
+        for i in range(5):
+            customer = Customer.objects.create(name=f'Nick Valentine {i}', contact='085163511041')
+            for days in (0, 400):
+                sales = Sales.objects.create(customer_id=customer, deposit=100000)
+                Sales_detail.objects.create(sales_id=sales, sparepart_id=self.sparepart, quantity=2)
+                service = Service.objects.create(police_number='B 1 NV', motor_type='Kymco', customer_id=customer)
+                Service_action.objects.create(name='Ganti Oli', cost=50000, service_id=service)
+                Sales.objects.filter(pk=sales.pk).update(created_at=timezone.now() - timedelta(days=days))
+                Service.objects.filter(pk=service.pk).update(created_at=timezone.now() - timedelta(days=days))
+
+        rebuild_transaction_total()
+
+        with self.assertNumQueries(query_count):
+            response = self.client.get(self.customer_url)
+        self.assertEqual(response.data['count_item'], 7)
+        self.assertEqual(response.data['results'][2]['number_of_service'], 1)
+        self.assertEqual(response.data['results'][2]['total_payment'], 310000 + 50000)
+        self.assertEqual(response.data['results'][2]['remaining_payment'], 260000)
+
     def test_nonlogin_user_failed_to_access_customer_list(self) -> None:
         """
         Ensure non-login user cannot access customer list
@@ -4733,6 +5041,72 @@ class SalesReceiptTestCase(SetTestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertEqual(response.data['message'], 'Data penjualan tidak ditemukan')
 
+    def test_admin_successfully_revalidate_unchanged_sales_receipt(self) -> None:
+        """
+        Ensure admin get 304 when revalidating sales receipt that is not changed
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.sales_receipt_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+
+        response = self.client.get(self.sales_receipt_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_admin_get_new_sales_receipt_after_sparepart_is_changed(self) -> None:
+        """
+        Ensure sales receipt is rendered again when sparepart in the sales is changed
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.sales_receipt_url)
+        etag = response['ETag']
+
+        sparepart = self.spareparts[0]
+        sparepart.price = 99000
+        sparepart.save()
+
+        response = self.client.get(self.sales_receipt_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_admin_get_new_sales_receipt_after_customer_is_changed(self) -> None:
+        """
+        Ensure sales receipt is rendered again when customer contact of the sales is changed,
+        without changing the sales itself
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.sales_receipt_url)
+        etag = response['ETag']
+        sales_updated_at = Sales.objects.get(pk=self.sales.pk).updated_at
+
+        customer = Customer.objects.get(pk=self.customer.pk)
+        customer.contact = '085600000001'
+        customer.save()
+
+        response = self.client.get(self.sales_receipt_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(Sales.objects.get(pk=self.sales.pk).updated_at, sales_updated_at)
+
+    def test_sales_receipt_is_built_in_one_pass(self) -> None:
+        """
+        Ensure sales receipt data is built from prefetched sales detail without query per detail, and receipt
+        pdf is rendered from receipt data that is built once
+        """
+        with self.assertNumQueries(3):
+            receipt = SalesReceiptSerializers(SalesReceipt.queryset.get(sales_id=self.sales.sales_id)).data
+        self.assertEqual((receipt['total_quantity'], receipt['total_price'], receipt['final_total_price']),
+                         (13, 2120000, 2120000))
+        self.assertEqual((receipt['change'], receipt['remaining_payment']), (0, 1600000))
+        self.assertEqual(receipt['total_price'], sum(item['sub_total'] for item in receipt['content']))
+
+        cache.clear()
+        self.client.force_authenticate(user=self.user)
+        with patch('si_mbe.views.get_sales_receipt', wraps=get_sales_receipt) as build_receipt:
+            response = self.client.get(self.sales_receipt_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(build_receipt.call_count, 1)
+
 
 class ServiceReceiptTestCase(SetTestCase):
     @classmethod
@@ -4800,6 +5174,9 @@ class ServiceReceiptTestCase(SetTestCase):
             quantity=6
         )
 
+        # Detail is created directly, so stored sales and service total is recalculated
+        rebuild_transaction_total()
+
         cls.service_receipt_url = reverse('service_receipt', kwargs={'service_id': cls.service.service_id})
 
         return super().setUpTestData()
@@ -4840,3 +5217,1054 @@ class ServiceReceiptTestCase(SetTestCase):
         response = self.client.get(reverse('service_receipt', kwargs={'service_id': 869591}))
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertEqual(response.data['message'], 'Data servis tidak ditemukan')
+
+    def test_admin_successfully_revalidate_unchanged_service_receipt(self) -> None:
+        """
+        Ensure admin get 304 when revalidating service receipt that is not changed
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.service_receipt_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(self.service_receipt_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_service_receipt_is_built_in_one_pass(self) -> None:
+        """
+        Ensure service receipt data is built from prefetched service sparepart and service action without query
+        per detail, and receipt pdf is rendered from receipt data that is built once
+        """
+        with self.assertNumQueries(4):
+            receipt = ServiceReceiptSerializers(ServiceReceipt.queryset.get(service_id=self.service.service_id)).data
+        self.assertEqual((receipt['total_quantity'], receipt['sub_total_part'], receipt['sub_total_action']),
+                         (11, 2050000, 200000))
+        self.assertEqual((receipt['total_price'], receipt['final_total_price']), (2250000, 2236000))
+        self.assertEqual((receipt['change'], receipt['remaining_payment']), (0, 2236000))
+
+        cache.clear()
+        self.client.force_authenticate(user=self.user)
+        with patch('si_mbe.views.get_service_receipt', wraps=get_service_receipt) as build_receipt:
+            response = self.client.get(self.service_receipt_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(build_receipt.call_count, 1)
+
+
+class ReceiptBatchTestCase(SetTestCase):
+    receipt_batch_url = reverse('receipt_batch')
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        # Setting up customer and sparepart data
+        cls.customer = Customer.objects.create(name='Shallan', contact='085456105311')
+        cls.sparepart = Sparepart.objects.create(
+            name='Soulcaster',
+            partnumber='SC-001',
+            quantity=50,
+            motor_type='Roshar',
+            sparepart_type='Fabrial',
+            price=150000,
+            workshop_price=140000,
+            install_price=160000
+        )
+
+        # Setting up 2 sales and 1 service data
+        cls.sales = []
+        for i in range(2):
+            sales = Sales.objects.create(customer_id=cls.customer, deposit=500000)
+            Sales_detail.objects.create(sales_id=sales, sparepart_id=cls.sparepart, quantity=i + 1)
+            cls.sales.append(sales)
+
+        cls.service = Service.objects.create(
+            customer_id=cls.customer,
+            police_number='B 9231 FA',
+            motor_type='Yamaha RX',
+            deposit=300000
+        )
+        Service_action.objects.create(service_id=cls.service, name='Ganti Oli', cost=50000)
+        Service_sparepart.objects.create(service_id=cls.service, sparepart_id=cls.sparepart, quantity=1)
+
+        rebuild_transaction_total()
+
+        return super().setUpTestData()
+
+    def test_admin_successfully_print_receipt_batch_from_id_list(self) -> None:
+        """
+        Ensure admin can print many sales and service receipt as one pdf
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(
+            self.receipt_batch_url +
+            f'?sales_id={self.sales[0].sales_id},{self.sales[1].sales_id}&service_id={self.service.service_id}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(len(PdfReader(BytesIO(b''.join(response.streaming_content))).pages), 3)
+
+    def test_admin_successfully_print_receipt_batch_from_date_range(self) -> None:
+        """
+        Ensure admin can print every sales and service receipt in a date range as one pdf
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(
+            self.receipt_batch_url + f'?start_date={timezone.localdate() - timedelta(days=1)}'
+                                     f'&end_date={timezone.localdate()}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(PdfReader(BytesIO(b''.join(response.streaming_content))).pages), 3)
+
+    def test_small_receipt_batch_is_rendered_without_worker_pool(self) -> None:
+        """
+        Ensure receipt batch smaller than RECEIPT_POOL_THRESHOLD is rendered in the request process
+        """
+        self.client.force_authenticate(user=self.user)
+        with patch('si_mbe.utility.get_receipt_pool') as get_receipt_pool:
+            response = self.client.get(self.receipt_batch_url + f'?sales_id={self.sales[0].sales_id}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        get_receipt_pool.assert_not_called()
+
+    @override_settings(RECEIPT_POOL_THRESHOLD=2)
+    def test_large_receipt_batch_reuse_worker_pool(self) -> None:
+        """
+        Ensure receipt worker pool is started once and reused by every large receipt batch
+        """
+        close_receipt_pool()
+        self.addCleanup(close_receipt_pool)
+
+        self.client.force_authenticate(user=self.user)
+        with patch('si_mbe.utility.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as executor:
+            for i in range(2):
+                response = self.client.get(
+                    self.receipt_batch_url +
+                    f'?sales_id={self.sales[0].sales_id},{self.sales[1].sales_id}&service_id={self.service.service_id}'
+                )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(len(PdfReader(BytesIO(b''.join(response.streaming_content))).pages), 3)
+        self.assertEqual(executor.call_count, 1)
+
+    @override_settings(RECEIPT_POOL_THRESHOLD=2)
+    def test_large_receipt_batch_is_rendered_in_process_when_worker_pool_is_broken(self) -> None:
+        """
+        Ensure broken receipt worker pool is stopped and the batch is rendered in the request process
+        """
+        broken_pool = Mock(spec=ProcessPoolExecutor)
+        broken_pool.map.side_effect = BrokenProcessPool()
+
+        self.client.force_authenticate(user=self.user)
+        with patch('si_mbe.utility.receipt_pool', broken_pool):
+            response = self.client.get(
+                self.receipt_batch_url +
+                f'?sales_id={self.sales[0].sales_id},{self.sales[1].sales_id}&service_id={self.service.service_id}'
+            )
+            self.assertIsNone(utility.receipt_pool)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(PdfReader(BytesIO(b''.join(response.streaming_content))).pages), 3)
+        broken_pool.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+
+    def test_admin_failed_to_print_receipt_batch_over_maximum(self) -> None:
+        """
+        Ensure admin cannot print more receipt than the maximum, checked before transaction detail is read
+        """
+        self.client.force_authenticate(user=self.user)
+        with patch.object(ReceiptBatch, 'max_receipt', 2), CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                self.receipt_batch_url +
+                f'?sales_id={self.sales[0].sales_id},{self.sales[1].sales_id}&service_id={self.service.service_id}'
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['message'], 'Maksimal 2 nota dalam sekali cetak')
+        self.assertFalse(any('detail' in query['sql'] for query in context.captured_queries))
+
+    def test_admin_failed_to_print_receipt_batch_without_transaction(self) -> None:
+        """
+        Ensure admin get not found when there is no transaction to print
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.receipt_batch_url + '?start_date=2020-01-01')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['message'], 'Data transaksi tidak ditemukan')
+
+    def test_admin_failed_to_print_receipt_batch_with_wrong_input(self) -> None:
+        """
+        Ensure admin cannot print receipt batch without id list or date range
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.receipt_batch_url + '?sales_id=satu,dua')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['message'], 'Data nota tidak sesuai / tidak lengkap')
+
+        response = self.client.get(self.receipt_batch_url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_nonadmin_user_failed_to_print_receipt_batch(self) -> None:
+        """
+        Ensure non-admin user cannot print receipt batch
+        """
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get(self.receipt_batch_url + f'?sales_id={self.sales[0].sales_id}')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data['message'], 'Akses ditolak')
+
+
+class DailySummaryTestCase(SetTestCase):
+    sales_add_url = reverse('sales_add')
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        # Setting up sparepart data
+        cls.spareparts = []
+        for i in range(2):
+            cls.spareparts.append(
+                Sparepart.objects.create(
+                    name=f'Shardblade {i}',
+                    partnumber=f'SB-{i}',
+                    quantity=50,
+                    motor_type='Roshar',
+                    sparepart_type='Blade',
+                    price=150000,
+                    workshop_price=140000,
+                    install_price=160000
+                )
+            )
+
+        # Setting up customer data
+        cls.customer = Customer.objects.create(
+            name='Kaladin',
+            contact='084531584533',
+            address='Hearthstone',
+            is_workshop=True
+        )
+
+        # Creating data that gonna be use as input
+        cls.data = {
+            'customer_id': cls.customer.customer_id,
+            'deposit': 500000,
+            'discount': 10000,
+            'content': [
+                {
+                    'sparepart_id': cls.spareparts[0].sparepart_id,
+                    'quantity': 3,
+                },
+                {
+                    'sparepart_id': cls.spareparts[1].sparepart_id,
+                    'quantity': 1,
+                }
+            ]
+        }
+
+        return super().setUpTestData()
+
+    def test_admin_successfully_add_and_delete_sales_with_daily_summary(self) -> None:
+        """
+        Ensure daily summary is refreshed when admin add and delete sales
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.sales_add_url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        summary = Daily_summary.objects.get(date=timezone.localdate(), transaction_type=Daily_summary.Types.SALES)
+        self.assertEqual(summary.transaction_total, 550000)
+        self.assertEqual(summary.deposit_total, 500000)
+        self.assertEqual(summary.discount_total, 10000)
+        self.assertEqual(summary.transaction_count, 1)
+        sparepart_summary = Daily_sparepart_summary.objects.get(
+            date=timezone.localdate(),
+            sparepart_id=self.spareparts[0]
+        )
+        self.assertEqual(sparepart_summary.quantity_sold, 3)
+        self.assertEqual(verify_daily_summary(), [])
+
+        response = self.client.delete(reverse('sales_delete', kwargs={'sales_id': response.data['sales_id']}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Daily_summary.objects.exists())
+        self.assertFalse(Daily_sparepart_summary.objects.exists())
+
+    def test_daily_summary_command_successfully_rebuild_and_verify_summary(self) -> None:
+        """
+        Ensure daily_summary command can rebuild summary from transaction data and detect outdated summary
+        """
+        sales = Sales.objects.create(customer_id=self.customer, deposit=100000)
+        Sales_detail.objects.create(sales_id=sales, sparepart_id=self.spareparts[1], quantity=2)
+        rebuild_transaction_total()
+
+        with self.assertRaises(CommandError):
+            call_command('daily_summary', '--verify', stdout=StringIO())
+
+        # Cached report of the rebuilt month is invalidated after the rebuild is committed
+        today = timezone.localdate()
+        generation = get_report_generation(transaction_type=Daily_summary.Types.SALES, year=today.year,
+                                           month=today.month)
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('daily_summary', stdout=StringIO())
+        self.assertNotEqual(
+            get_report_generation(transaction_type=Daily_summary.Types.SALES, year=today.year, month=today.month),
+            generation
+        )
+
+        summary = Daily_summary.objects.get(date=today, transaction_type=Daily_summary.Types.SALES)
+        self.assertEqual(summary.transaction_total, 280000)
+        self.assertEqual(summary.deposit_total, 100000)
+        self.assertEqual(summary.transaction_count, 1)
+        call_command('daily_summary', '--verify', stdout=StringIO())
+
+
+class StockMovementTestCase(SetTestCase):
+    sales_add_url = reverse('sales_add')
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        # Setting up sparepart data
+        cls.spareparts = []
+        for i in range(2):
+            cls.spareparts.append(
+                Sparepart.objects.create(
+                    name=f'Stormlight Sphere {i}',
+                    partnumber=f'SS-{i}',
+                    quantity=50,
+                    motor_type='Roshar',
+                    sparepart_type='Sphere',
+                    price=150000,
+                    workshop_price=140000,
+                    install_price=160000
+                )
+            )
+
+        # Setting up customer data
+        cls.customer = Customer.objects.create(name='Shallan', contact='084531584534', address='Jah Keved',
+                                               is_workshop=True)
+
+        # Creating data that gonna be use as input
+        cls.data = {
+            'customer_id': cls.customer.customer_id,
+            'deposit': 500000,
+            'discount': 10000,
+            'content': [
+                {
+                    'sparepart_id': cls.spareparts[0].sparepart_id,
+                    'quantity': 3,
+                },
+                {
+                    'sparepart_id': cls.spareparts[1].sparepart_id,
+                    'quantity': 1,
+                }
+            ]
+        }
+
+        # Sparepart is created directly, so its quantity is written to ledger as opening adjustment 3 days ago
+        rebuild_stock_movement()
+        Stock_movement.objects.update(created_at=timezone.now() - timedelta(days=3))
+
+        return super().setUpTestData()
+
+    def test_admin_successfully_add_and_delete_sales_with_stock_movement(self) -> None:
+        """
+        Ensure stock movement is written when admin add and delete sales
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.sales_add_url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        sales_id = response.data['sales_id']
+
+        movements = Stock_movement.objects.filter(movement_type=Stock_movement.Types.SALES).order_by('sparepart_id')
+        self.assertEqual([(movement.quantity, movement.reference_id) for movement in movements],
+                         [(-3, sales_id), (-1, sales_id)])
+        self.assertEqual(verify_stock_movement(), [])
+
+        response = self.client.delete(reverse('sales_delete', kwargs={'sales_id': sales_id}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(Stock_movement.objects.filter(reference_id=sales_id).count(), 4)
+        self.assertEqual(verify_stock_movement(), [])
+
+    def test_admin_successfully_get_sparepart_stock_at_date(self) -> None:
+        """
+        Ensure admin get sparepart quantity at the end of requested date, with or without stock snapshot
+        """
+        self.client.force_authenticate(user=self.user)
+        self.client.post(self.sales_add_url, self.data, format='json')
+        url = reverse('sparepart_stock', kwargs={'sparepart_id': self.spareparts[0].sparepart_id})
+        yesterday = timezone.localdate() - timedelta(days=1)
+
+        response = self.client.get(url, {'date': (yesterday - timedelta(days=5)).isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['quantity'], 0)
+
+        for i in range(2):
+            response = self.client.get(url, {'date': yesterday.isoformat()})
+            self.assertEqual(response.data['quantity'], 50)
+            response = self.client.get(url)
+            self.assertEqual(response.data['date'], timezone.localdate())
+            self.assertEqual(response.data['quantity'], 47)
+
+            # Second round is answered from snapshot of yesterday
+            self.assertEqual(take_stock_snapshot(day=yesterday), 2)
+
+        self.assertEqual(Stock_snapshot.objects.get(sparepart_id=self.spareparts[0]).quantity, 50)
+
+    def test_admin_successfully_get_sparepart_movement_list(self) -> None:
+        """
+        Ensure admin get movement history of a sparepart with newest movement first
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.sales_add_url, self.data, format='json')
+        url = reverse('sparepart_movement', kwargs={'sparepart_id': self.spareparts[0].sparepart_id})
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count_item'], 2)
+        self.assertEqual(response.data['results'][0]['movement_type'], 'Sales')
+        self.assertEqual(response.data['results'][0]['quantity'], -3)
+        self.assertEqual(response.data['results'][1]['movement_type'], 'Adjustment')
+        self.assertEqual(response.data['results'][1]['quantity'], 50)
+
+        response = self.client.get(url, {'start_date': timezone.localdate().isoformat()})
+        self.assertEqual(response.data['count_item'], 1)
+
+    def test_admin_failed_to_get_stock_of_nonexist_sparepart_or_invalid_date(self) -> None:
+        """
+        Ensure admin cannot get stock of sparepart that doesn't exist or with invalid date
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('sparepart_stock', kwargs={'sparepart_id': 9999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['message'], 'Data sparepart tidak ditemukan')
+
+        response = self.client.get(reverse('sparepart_movement', kwargs={'sparepart_id': 9999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['message'], 'Data sparepart tidak ditemukan')
+
+        response = self.client.get(reverse('sparepart_stock', kwargs={'sparepart_id': self.spareparts[0].sparepart_id}),
+                                   {'date': '16-10-2026'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['message'], 'Format tanggal tidak sesuai, gunakan YYYY-MM-DD')
+
+    def test_stock_ledger_command_successfully_rebuild_and_verify_stock_movement(self) -> None:
+        """
+        Ensure stock_ledger command can detect and rebuild outdated stock movement
+        """
+        Sparepart.objects.filter(pk=self.spareparts[1].pk).update(quantity=45)
+        with self.assertRaises(CommandError):
+            call_command('stock_ledger', '--verify', stdout=StringIO())
+
+        call_command('stock_ledger', '--rebuild', stdout=StringIO())
+        call_command('stock_ledger', '--verify', stdout=StringIO())
+
+    def test_stock_ledger_command_failed_to_take_snapshot_of_unfinished_day(self) -> None:
+        """
+        Ensure stock_ledger command cannot take stock snapshot of today or future date
+        """
+        for day in (timezone.localdate(), timezone.localdate() + timedelta(days=1)):
+            with self.assertRaises(CommandError):
+                call_command('stock_ledger', '--date', day.isoformat(), stdout=StringIO())
+            with self.assertRaises(ValueError):
+                take_stock_snapshot(day=day)
+
+        self.assertFalse(Stock_snapshot.objects.exists())
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class StockConcurrencyTestCase(TransactionTestCase):
+    # Each request is sent from its own thread and database connection, so test data must be committed
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(username='dalinar', password='UniteThemUniteThem')
+        Profile.objects.create(user_id=self.user, role='A', name='Dalinar Kholin', contact='085260121549')
+
+        # Setting up sparepart data
+        self.spareparts = []
+        for i in range(2):
+            self.spareparts.append(
+                Sparepart.objects.create(
+                    name=f'Fabrial {i}',
+                    partnumber=f'FB-{i}',
+                    quantity=500,
+                    motor_type='Urithiru',
+                    sparepart_type='Fabrial',
+                    price=150000,
+                    workshop_price=140000,
+                    install_price=160000
+                )
+            )
+
+        # Setting up customer and supplier data
+        self.customer = Customer.objects.create(name='Navani', contact='084531584535', address='Urithiru',
+                                                is_workshop=True)
+        supplier = Supplier.objects.create(name='Kharbranth', contact='084531584536',
+                                           rekening_number='123456789', rekening_name='Kharbranth',
+                                           rekening_bank='BCA')
+        self.salesman = Salesman.objects.create(supplier_id=supplier, name='Taravangian', contact='084531584537')
+
+    def send_parallel(self, requests: list) -> list:
+        """
+        Send every (method, url, data) request at the same time, each from its own thread
+        """
+        barrier = threading.Barrier(len(requests))
+        status_codes = [None] * len(requests)
+
+        def send(index, method, url, data):
+            try:
+                client = APIClient()
+                client.force_authenticate(user=self.user)
+                barrier.wait()
+                status_codes[index] = getattr(client, method)(url, data, format='json').status_code
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=send, args=(i, *request)) for i, request in enumerate(requests)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return status_codes
+
+    def get_sales_data(self, reverse_order: bool) -> dict:
+        content = [
+            {'sparepart_id': self.spareparts[0].sparepart_id, 'quantity': 2},
+            {'sparepart_id': self.spareparts[1].sparepart_id, 'quantity': 1},
+        ]
+        return {
+            'customer_id': self.customer.customer_id,
+            'deposit': 500000,
+            'discount': 0,
+            'content': content[::-1] if reverse_order else content
+        }
+
+    def test_parallel_sales_and_restock_keep_sparepart_quantity_exact(self) -> None:
+        """
+        Ensure parallel sales and restock of the same spareparts, listed in different order, never lose stock change
+        """
+        restock_data = {
+            'no_faktur': 'URI/0001',
+            'due_date': date(2023, 4, 13),
+            'salesman_id': self.salesman.salesman_id,
+            'deposit': 0,
+            'content': [
+                {'sparepart_id': self.spareparts[1].sparepart_id, 'individual_price': 100000, 'quantity': 5},
+                {'sparepart_id': self.spareparts[0].sparepart_id, 'individual_price': 100000, 'quantity': 3},
+            ]
+        }
+        requests = [('post', reverse('sales_add'), self.get_sales_data(reverse_order=i % 2 == 1)) for i in range(24)]
+        requests += [('post', reverse('restock_add'), restock_data) for i in range(8)]
+
+        status_codes = self.send_parallel(requests)
+        self.assertEqual(status_codes, [status.HTTP_201_CREATED] * 32)
+        self.assertEqual(Sparepart.objects.get(pk=self.spareparts[0].pk).quantity, 500 - (24 * 2) + (8 * 3))
+        self.assertEqual(Sparepart.objects.get(pk=self.spareparts[1].pk).quantity, 500 - 24 + (8 * 5))
+        self.assertEqual(Stock_movement.objects.count(), 64)
+        self.assertEqual(verify_daily_summary(), [])
+
+    def test_parallel_sales_of_different_spareparts_keep_daily_summary_exact(self) -> None:
+        """
+        Ensure parallel sales of the same day using different spareparts never fail or lose daily summary
+        """
+        requests = []
+        for i in range(16):
+            requests.append(('post', reverse('sales_add'), {
+                'customer_id': self.customer.customer_id,
+                'deposit': 150000,
+                'discount': 0,
+                'content': [{'sparepart_id': self.spareparts[i % 2].sparepart_id, 'quantity': 1}]
+            }))
+
+        status_codes = self.send_parallel(requests)
+        self.assertEqual(status_codes, [status.HTTP_201_CREATED] * 16)
+        self.assertEqual(verify_daily_summary(), [])
+        self.assertEqual(Daily_summary.objects.get(transaction_type=Daily_summary.Types.SALES).transaction_count, 16)
+        self.assertEqual(
+            sorted(Daily_sparepart_summary.objects.values_list('sparepart_id', 'quantity_sold')),
+            [(self.spareparts[0].sparepart_id, 8), (self.spareparts[1].sparepart_id, 8)]
+        )
+
+    def test_parallel_delete_of_the_same_sales_return_stock_once(self) -> None:
+        """
+        Ensure sales that is deleted by several request at the same time only return its stock once
+        """
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        sales_id = client.post(reverse('sales_add'), self.get_sales_data(reverse_order=False),
+                               format='json').data['sales_id']
+
+        status_codes = self.send_parallel([('delete', reverse('sales_delete', kwargs={'sales_id': sales_id}), None)
+                                           for i in range(4)])
+        self.assertEqual(sorted(status_codes), [status.HTTP_204_NO_CONTENT] + [status.HTTP_404_NOT_FOUND] * 3)
+        self.assertEqual(Sparepart.objects.get(pk=self.spareparts[0].pk).quantity, 500)
+        self.assertEqual(Sparepart.objects.get(pk=self.spareparts[1].pk).quantity, 500)
+
+
+@override_settings(STOCK_ALERT_STREAM_TIMEOUT=0)
+class StockAlertTestCase(SetTestCase):
+    sales_add_url = reverse('sales_add')
+    stock_alert_stream_url = reverse('stock_alert_stream')
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        # Setting up sparepart data, only first sparepart quantity is just above default limit of 10
+        cls.spareparts = []
+        for i in range(2):
+            cls.spareparts.append(
+                Sparepart.objects.create(
+                    name=f'Shardblade {i}',
+                    partnumber=f'SB-{i}',
+                    quantity=12 + (i * 10),
+                    motor_type='Roshar',
+                    sparepart_type='Blade',
+                    price=150000,
+                    workshop_price=140000,
+                    install_price=160000
+                )
+            )
+
+        # Setting up customer data
+        cls.customer = Customer.objects.create(name='Kaladin', contact='084531584535', address='Hearthstone',
+                                               is_workshop=False)
+
+        # Creating data that gonna be use as input, only first sparepart cross its limit
+        cls.data = {
+            'customer_id': cls.customer.customer_id,
+            'deposit': 500000,
+            'discount': 0,
+            'content': [
+                {
+                    'sparepart_id': cls.spareparts[0].sparepart_id,
+                    'quantity': 3,
+                },
+                {
+                    'sparepart_id': cls.spareparts[1].sparepart_id,
+                    'quantity': 1,
+                }
+            ]
+        }
+
+        return super().setUpTestData()
+
+    def read_stream(self, **kwargs) -> str:
+        response = self.client.get(self.stock_alert_stream_url, **kwargs)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return b''.join(response.streaming_content).decode()
+
+    def test_admin_successfully_get_stock_alert_when_sparepart_cross_limit(self) -> None:
+        """
+        Ensure stock alert is written only when sparepart quantity cross its limit, in both direction
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.sales_add_url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        alert = Stock_alert.objects.get()
+        self.assertEqual(alert.sparepart_id, self.spareparts[0])
+        self.assertEqual((alert.quantity, alert.limit, alert.is_low), (9, 10, True))
+
+        # Selling again below limit doesn't cross it again
+        self.client.post(self.sales_add_url, self.data, format='json')
+        self.assertEqual(Stock_alert.objects.count(), 1)
+
+        # Deleting both sales return stock above limit
+        for sales in Sales.objects.all():
+            self.client.delete(reverse('sales_delete', kwargs={'sales_id': sales.sales_id}))
+        self.assertEqual(list(Stock_alert.objects.order_by('stock_alert_id').values_list('is_low', flat=True)),
+                         [True, False])
+
+    def test_admin_successfully_get_stock_alert_when_editing_quantity(self) -> None:
+        """
+        Ensure stock alert is written when admin edit sparepart quantity down to its limit
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.put(
+            reverse('sparepart_data_update', kwargs={'sparepart_id': self.spareparts[1].sparepart_id}),
+            {
+                'name': 'Shardblade 1',
+                'partnumber': 'SB-1',
+                'quantity': 10,
+                'motor_type': 'Roshar',
+                'sparepart_type': 'Blade',
+                'price': 150000,
+                'workshop_price': 140000,
+                'install_price': 160000,
+                'storage_code': 'UR-1',
+                'category_id': None,
+                'brand_id': None,
+            },
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        alert = Stock_alert.objects.get()
+        self.assertEqual((alert.sparepart_id, alert.quantity, alert.limit, alert.is_low),
+                         (self.spareparts[1], 10, 10, True))
+
+    def test_admin_successfully_stream_stock_alert(self) -> None:
+        """
+        Ensure admin receive stock alert after last received id as server-sent event
+        """
+        self.client.force_authenticate(user=self.user)
+        self.client.post(self.sales_add_url, self.data, format='json')
+        alert_id = Stock_alert.objects.get().stock_alert_id
+
+        # Without last id only alert that is created after connecting is streamed
+        self.assertNotIn('event: stock_alert', self.read_stream())
+
+        content = self.read_stream(HTTP_LAST_EVENT_ID=str(alert_id - 1))
+        self.assertIn(f'id: {alert_id}\nevent: stock_alert\n', content)
+        self.assertIn('"name": "Shardblade 0"', content)
+        self.assertIn('"is_low": true', content)
+
+        self.assertNotIn('event: stock_alert', self.read_stream(data={'last_id': alert_id}))
+
+    def test_admin_successfully_stream_stock_alert_committed_out_of_order(self) -> None:
+        """
+        Ensure alert with smaller id that is committed after bigger id is sent is still streamed,
+        and missing id older than settle time is skipped
+        """
+        alerts = [
+            Stock_alert.objects.create(sparepart_id=sparepart, quantity=9, limit=10, is_low=True)
+            for sparepart in self.spareparts
+        ]
+        first_id, second_id = (alert.stock_alert_id for alert in alerts)
+
+        # Cursor of client that only received the second alert
+        self.client.force_authenticate(user=self.user)
+        content = self.read_stream(HTTP_LAST_EVENT_ID=f'{first_id - 1}:{second_id}')
+        self.assertIn(f'id: {second_id}\nevent: stock_alert\n', content)
+        self.assertIn('"name": "Shardblade 0"', content)
+        self.assertNotIn('"name": "Shardblade 1"', content)
+
+        # First alert is rolled back, its id is skipped after the second alert is settled
+        alerts[0].delete()
+        self.assertNotIn('id: ', self.read_stream(HTTP_LAST_EVENT_ID=f'{first_id - 1}:{second_id}'))
+
+        Stock_alert.objects.filter(stock_alert_id=second_id).update(
+            created_at=timezone.now() - timedelta(minutes=5)
+        )
+        content = self.read_stream(HTTP_LAST_EVENT_ID=f'{first_id - 1}:{second_id}')
+        self.assertIn(f'id: {second_id}\n\n', content)
+        self.assertNotIn('event: stock_alert', content)
+
+    def test_admin_failed_to_stream_stock_alert_with_invalid_last_id(self) -> None:
+        """
+        Ensure admin cannot stream stock alert with invalid last id
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.stock_alert_stream_url, {'last_id': 'surge'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'message': 'Id alert stok tidak sesuai'})
+
+        response = self.client.get(self.stock_alert_stream_url, HTTP_LAST_EVENT_ID='12:13,honor')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_nonadmin_failed_to_stream_stock_alert(self) -> None:
+        """
+        Ensure non-admin user cannot stream stock alert
+        """
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get(self.stock_alert_stream_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data, {'message': 'Akses ditolak'})
+
+
+class ReorderSuggestionTestCase(SetTestCase):
+    reorder_suggestion_url = reverse('reorder_suggestion')
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        # Setting up supplier and salesman data
+        cls.supplier = Supplier.objects.create(
+            name='Mistborn',
+            contact='084894564564',
+            rekening_number='98186046800002',
+            rekening_name='Kelsier',
+            rekening_bank='Luthadel'
+        )
+        cls.salesman = Salesman.objects.create(supplier_id=cls.supplier, name='Vin', contact='084523015664')
+
+        # Setting up sparepart data, on limit, above limit, and below limit
+        cls.spareparts = []
+        for i, quantity in enumerate([20, 100, 5]):
+            cls.spareparts.append(
+                Sparepart.objects.create(
+                    name=f'Allomancy Vial {i}',
+                    partnumber=f'AV-{i}',
+                    quantity=quantity,
+                    motor_type='Scadrial',
+                    sparepart_type='Vial',
+                    price=150000,
+                    workshop_price=140000,
+                    install_price=160000
+                )
+            )
+
+        # Only first sparepart is restocked from salesman
+        restock = Restock.objects.create(no_faktur='AV/0001', due_date=date.today(), salesman_id=cls.salesman)
+        Restock_detail.objects.create(restock_id=restock, sparepart_id=cls.spareparts[0], individual_price=100000,
+                                      quantity=20)
+
+        # First sparepart is sold 2 each day of the last 30 days, and used 30 in service today
+        Daily_sparepart_summary.objects.bulk_create([
+            Daily_sparepart_summary(
+                date=date.today() - timedelta(days=i),
+                sparepart_id=cls.spareparts[0],
+                quantity_sold=2,
+                quantity_used=30 if i == 0 else 0
+            )
+            for i in range(40)
+        ])
+
+        return super().setUpTestData()
+
+    def test_admin_successfully_get_reorder_suggestion(self) -> None:
+        """
+        Ensure admin get reorder quantity of sparepart below limit plus covered consumption, grouped per salesman
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.reorder_suggestion_url, {'days': 30, 'cover': 30})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['suggestion'], [
+            {
+                'salesman_id': self.salesman.salesman_id,
+                'salesman': 'Vin',
+                'supplier_id': self.supplier.supplier_id,
+                'supplier': 'Mistborn',
+                'spareparts': [{
+                    'sparepart_id': self.spareparts[0].sparepart_id,
+                    'name': 'Allomancy Vial 0',
+                    'partnumber': 'AV-0',
+                    'quantity': 20,
+                    'limit': 10,
+                    'average_velocity': 3.0,
+                    'peak_velocity': 6.29,
+                    'days_of_cover': 6.7,
+                    'reorder_quantity': 80,
+                }]
+            },
+            {
+                'salesman_id': None,
+                'salesman': None,
+                'supplier_id': None,
+                'supplier': None,
+                'spareparts': [{
+                    'sparepart_id': self.spareparts[2].sparepart_id,
+                    'name': 'Allomancy Vial 2',
+                    'partnumber': 'AV-2',
+                    'quantity': 5,
+                    'limit': 10,
+                    'average_velocity': 0.0,
+                    'peak_velocity': 0.0,
+                    'days_of_cover': None,
+                    'reorder_quantity': 5,
+                }]
+            },
+        ])
+
+    def test_daily_consumption_only_read_given_sparepart(self) -> None:
+        """
+        Ensure daily consumption only read summary of the given sparepart
+        """
+        sparepart_ids = np.array([self.spareparts[1].sparepart_id, self.spareparts[2].sparepart_id])
+        consumption = get_daily_consumption(sparepart_ids=sparepart_ids, start=date.today() - timedelta(days=29),
+                                            days=30)
+        self.assertEqual(consumption.shape, (2, 30))
+        self.assertEqual(int(consumption.sum()), 0)
+
+    def test_admin_failed_to_get_reorder_suggestion_with_invalid_days(self) -> None:
+        """
+        Ensure admin cannot get reorder suggestion with invalid days of history
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.reorder_suggestion_url, {'days': 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'message': 'Data saran restock tidak sesuai / tidak lengkap'})
+
+    def test_nonadmin_failed_to_get_reorder_suggestion(self) -> None:
+        """
+        Ensure non-admin user cannot get reorder suggestion
+        """
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get(self.reorder_suggestion_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data, {'message': 'Akses ditolak'})
+
+
+class SparepartImportTestCase(SetTestCase):
+    sparepart_import_url = reverse('sparepart_import')
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        # Setting up brand data
+        cls.brand = Brand.objects.create(name='Cosmere')
+
+        # Setting up sparepart that is updated by import
+        cls.sparepart = Sparepart.objects.create(
+            name='Soulcaster',
+            partnumber='SC-1',
+            quantity=30,
+            motor_type='Roshar',
+            sparepart_type='Fabrial',
+            price=150000,
+            workshop_price=140000,
+            install_price=160000,
+            brand_id=cls.brand
+        )
+
+        return super().setUpTestData()
+
+    def test_admin_successfully_import_sparepart_from_csv(self) -> None:
+        """
+        Ensure admin can import csv creating new sparepart and updating sparepart with the same partnumber,
+        invalid row is reported with its row number
+        """
+        content = (
+            'Name,Partnumber,Quantity,Sparepart_type,Price,Brand,Category\n'
+            'Soulcaster,SC-1,8,Fabrial,175000,Cosmere,\n'
+            'Spanreed,SR-1,20,Fabrial,50000,Cosmere,Fabrial\n'
+            'Halfshard,HS-1,abc,Fabrial,90000,Elsecaller,Fabrial\n'
+            'Painrial,,5,Fabrial,60000,,\n'
+        )
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.sparepart_import_url, {
+            'file': SimpleUploadedFile('catalogue.csv', content.encode(), content_type='text/csv')
+        }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['created'], response.data['updated']), (1, 1))
+        self.assertEqual([error['row'] for error in response.data['errors']], [4, 5])
+        self.assertIn('quantity', response.data['errors'][0]['errors'])
+        self.assertIn('partnumber', response.data['errors'][1]['errors'])
+
+        # Existing sparepart keep its id and data that isn't in the file
+        sparepart = Sparepart.objects.get(partnumber='SC-1')
+        self.assertEqual(sparepart.pk, self.sparepart.pk)
+        self.assertEqual((sparepart.quantity, sparepart.price, sparepart.workshop_price), (8, 175000, 140000))
+        self.assertEqual(Stock_alert.objects.get().sparepart_id, sparepart)
+
+        new_sparepart = Sparepart.objects.get(partnumber='SR-1')
+        self.assertEqual(new_sparepart.brand_id, self.brand)
+        self.assertEqual(new_sparepart.category_id.name, 'Fabrial')
+        self.assertFalse(Brand.objects.filter(name='Elsecaller').exists())
+
+        self.assertEqual(sorted(Stock_movement.objects.values_list('quantity', flat=True)), [-22, 20])
+        self.assertEqual(Logs.objects.filter(table='Sparepart').count(), 1)
+
+    def test_admin_successfully_import_sparepart_from_xlsx(self) -> None:
+        """
+        Ensure admin can import xlsx file, whole number cell is read without decimal point
+        """
+        workbook = Workbook()
+        workbook.active.append(['name', 'partnumber', 'quantity', 'sparepart_type', 'price', 'limit'])
+        workbook.active.append(['Fabrial Gem', 1234, 12.0, 'Gem', 80000.0, 5])
+        file = BytesIO()
+        workbook.save(file)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.sparepart_import_url, {
+            'file': SimpleUploadedFile('catalogue.xlsx', file.getvalue())
+        }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['created'], response.data['updated'], response.data['errors']), (1, 0, []))
+
+        sparepart = Sparepart.objects.get(partnumber='1234')
+        self.assertEqual((sparepart.quantity, sparepart.limit, sparepart.price), (12, 5, 80000))
+
+    def test_admin_failed_to_import_sparepart_with_unsupported_file(self) -> None:
+        """
+        Ensure admin cannot import sparepart from file other than csv or xlsx
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.sparepart_import_url, {
+            'file': SimpleUploadedFile('catalogue.txt', b'name,partnumber')
+        }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'message': 'Format file tidak didukung, gunakan csv atau xlsx'})
+
+    def test_nonadmin_failed_to_import_sparepart(self) -> None:
+        """
+        Ensure non-admin user cannot import sparepart
+        """
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.post(self.sparepart_import_url, {}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data, {'message': 'Akses ditolak'})
+
+
+class ExportTestCase(SetTestCase):
+    sparepart_export_url = reverse('sparepart_export')
+    sales_export_url = reverse('sales_export')
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        # Setting up brand data
+        cls.brand = Brand.objects.create(name='Elantris')
+
+        # Setting up sparepart data
+        cls.spareparts = []
+        for i in range(3):
+            cls.spareparts.append(
+                Sparepart.objects.create(
+                    name=f'Aon Rune {i}',
+                    partnumber=f'AR-{i}',
+                    quantity=50,
+                    motor_type='Arelon',
+                    sparepart_type='Rune',
+                    price=100000,
+                    workshop_price=90000,
+                    install_price=110000,
+                    brand_id=cls.brand
+                )
+            )
+
+        # Setting up customer and sales data, second sales is moved to last week
+        cls.customer = Customer.objects.create(name='Raoden', contact='084531584536', address='Kae', is_workshop=True)
+        cls.sales = []
+        for i in range(2):
+            sales = Sales.objects.create(customer_id=cls.customer, discount=5000, deposit=100000)
+            Sales_detail.objects.create(sales_id=sales, sparepart_id=cls.spareparts[i], quantity=2)
+            cls.sales.append(sales)
+        Sales.objects.filter(pk=cls.sales[1].pk).update(created_at=timezone.now() - timedelta(days=7))
+        rebuild_transaction_total()
+
+        return super().setUpTestData()
+
+    def read_csv(self, response) -> list:
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        return b''.join(response.streaming_content).decode().splitlines()
+
+    def test_admin_successfully_export_sparepart(self) -> None:
+        """
+        Ensure admin can export every sparepart as csv
+        """
+        self.client.force_authenticate(user=self.user)
+        lines = self.read_csv(self.client.get(self.sparepart_export_url))
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[0].startswith('sparepart_id,name,partnumber,quantity'))
+        self.assertEqual(
+            lines[1],
+            f'{self.spareparts[0].sparepart_id},Aon Rune 0,AR-0,50,10,,Arelon,Rune,Elantris,,100000,90000,110000'
+        )
+
+    def test_admin_successfully_export_sales_within_date(self) -> None:
+        """
+        Ensure admin can export sales with its total as csv, filtered by date when given
+        """
+        self.client.force_authenticate(user=self.user)
+        lines = self.read_csv(self.client.get(self.sales_export_url))
+        self.assertEqual(len(lines), 3)
+
+        lines = self.read_csv(self.client.get(self.sales_export_url, {'start_date': timezone.localdate().isoformat()}))
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith(f'{self.sales[0].sales_id},'))
+        self.assertTrue(lines[1].endswith(',Raoden,True,180000,5000,100000,False'))
+
+    def test_admin_failed_to_export_sales_with_invalid_date(self) -> None:
+        """
+        Ensure admin cannot export sales with invalid date format
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.sales_export_url, {'start_date': '01-01-2023'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'message': 'Format tanggal tidak sesuai, gunakan YYYY-MM-DD'})
+
+    def test_nonadmin_failed_to_export_sparepart(self) -> None:
+        """
+        Ensure non-admin user cannot export sparepart
+        """
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get(self.sparepart_export_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data, {'message': 'Akses ditolak'})
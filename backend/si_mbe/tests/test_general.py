@@ -1,11 +1,19 @@
+from datetime import date
+from decimal import Decimal
+from io import BytesIO
+
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core import mail
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.encoding import force_str
 from rest_framework import status
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
 from si_mbe.models import Brand, Category, Profile, Sparepart
+from si_mbe.renderers import FastJSONParser, FastJSONRenderer
 
 
 class SetTestCase(APITestCase):
@@ -366,3 +374,33 @@ class ResetPasswordTestCase(APITestCase):
 
         response = self.client.post(self.reset_password_confirm, self.wrong_data)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FastJSONTestCase(APITestCase):
+    def test_fast_json_renderer_is_the_same_as_json_renderer(self) -> None:
+        """
+        Ensure orjson renderer write decimal, date, datetime, and line separator the same as JSONRenderer
+        """
+        data = {
+            'price': Decimal('5400000'),
+            'date': date(2022, 2, 1),
+            'created_at': timezone.now(),
+            'message': ErrorDetail('Stok\u2028habis'),
+            1: [Decimal('0.5'), None, True],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(data, renderer_context={'indent': 4}),
+                         JSONRenderer().render(data, renderer_context={'indent': 4}))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_fast_json_parser_parse_request(self) -> None:
+        """
+        Ensure orjson parser read json request and reject invalid json
+        """
+        self.assertEqual(FastJSONParser().parse(BytesIO('{"name": "Kaladin", "quantity": 2}'.encode())),
+                         {'name': 'Kaladin', 'quantity': 2})
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(BytesIO(b'{"name": '))
+
+        response = self.client.post(reverse('rest_login'), '{"username": ', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
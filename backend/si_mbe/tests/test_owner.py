@@ -1,14 +1,27 @@
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from io import StringIO
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
-from si_mbe.models import (Brand, Category, Customer, Logs, Mechanic, Profile,
-                           Restock, Restock_detail, Sales, Sales_detail,
-                           Salesman, Service, Service_action,
-                           Service_sparepart, Sparepart, Supplier)
+from si_mbe.caches import (get_cached_report, get_report_cache_key,
+                           get_report_generation, invalidate_report_cache)
+from si_mbe.models import (Brand, Category, Customer, Daily_summary, Logs,
+                           Mechanic, Profile, Report_job, Restock,
+                           Restock_detail, Sales, Sales_detail, Salesman,
+                           Service, Service_action, Service_sparepart,
+                           Sparepart, Supplier)
 from si_mbe.tests.test_admin import SetTestCase
+from si_mbe.utility import (get_dashboard_summary, get_range_report,
+                            get_report, get_restock_report, get_sales_report,
+                            get_service_report, rebuild_daily_summary,
+                            rebuild_restock_total, rebuild_transaction_total)
 
 
 class SalesReportTestCase(APITestCase):
@@ -97,10 +110,18 @@ class SalesReportTestCase(APITestCase):
             quantity=40
         )
 
+        # Detail is created directly, so stored sales and service total and daily summary is recalculated
+        rebuild_transaction_total()
+        rebuild_daily_summary()
+
         cls.date = int(date.today().day) - 1
 
         return super().setUpTestData()
 
+    def setUp(self) -> None:
+        cache.clear()
+        return super().setUp()
+
     def test_owner_successfully_access_sales_report(self) -> None:
         """
         Ensure owner can get sales report
@@ -127,6 +148,43 @@ class SalesReportTestCase(APITestCase):
         self.assertEqual(response.data['sales_transaction_month'], 44630000)
         self.assertEqual(response.data['sales_revenue_month'], 751000)
 
+    def test_owner_successfully_access_sales_report_with_date_input(self) -> None:
+        """
+        Ensure owner can get date spesific sales report, grouped by day in Asia/Jakarta timezone
+        """
+        sales = Sales.objects.create(customer_id=self.customer_1, user_id=self.user, deposit=100000)
+        Sales_detail.objects.create(sales_id=sales, sparepart_id=self.spareparts[0], quantity=1)
+        rebuild_transaction_total()
+
+        # 1 February 2022 18:00 UTC is 2 February 2022 01:00 in Asia/Jakarta
+        Sales.objects.filter(sales_id=sales.sales_id).update(
+            created_at=datetime(2022, 2, 1, 18, 0, tzinfo=dt_timezone.utc)
+        )
+        rebuild_daily_summary()
+
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get(self.sales_report_url + '?year=2022&month=2')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['sales_report']), 28)
+        self.assertEqual(response.data['sales_report'][0]['sales_count'], 0)
+        self.assertEqual(response.data['sales_report'][1]['date'], date(2022, 2, 2))
+        self.assertEqual(response.data['sales_report'][1]['sales_transaction'], 540000)
+        self.assertEqual(response.data['sales_report'][1]['sales_revenue'], 100000)
+        self.assertEqual(response.data['sales_report'][1]['sales_count'], 1)
+        self.assertEqual(response.data['sales_transaction_month'], 540000)
+        self.assertEqual(response.data['sales_revenue_month'], 100000)
+
+    def test_report_is_aggregated_in_single_query(self) -> None:
+        """
+        Ensure sales, restock, and service report each only need one query regardless of history size
+        """
+        with self.assertNumQueries(1):
+            get_sales_report()
+        with self.assertNumQueries(1):
+            get_restock_report()
+        with self.assertNumQueries(1):
+            get_service_report()
+
     def test_nonlogin_user_failed_to_access_sales_report_list(self) -> None:
         """
         Ensure non-login user cannot access sales report list
@@ -242,6 +300,10 @@ class RestockReportTestCase(APITestCase):
             individual_price=62000
         )
 
+        # Restock detail is created directly, so stored restock total and daily summary is recalculated
+        rebuild_restock_total()
+        rebuild_daily_summary()
+
         # Getting current date / day
         cls.date = int(date.today().day) - 1
 
@@ -470,6 +532,11 @@ class OwnerDashboardTestCase(SetTestCase):
             sparepart_id=cls.sparepart
         )
 
+        # Detail is created directly, so stored total and daily summary is recalculated
+        rebuild_restock_total()
+        rebuild_transaction_total()
+        rebuild_daily_summary()
+
         return super().setUpTestData()
 
     def test_owner_successfully_access_owner_dashboard(self) -> None:
@@ -486,6 +553,39 @@ class OwnerDashboardTestCase(SetTestCase):
         self.assertEqual(response.data['service_count_today'], 2)
         self.assertEqual(response.data['expenditure_today'], 9241500)
 
+    def test_owner_successfully_access_owner_dashboard_with_date_input(self) -> None:
+        """
+        Ensure owner can access owner dashboard of particular day, counting only that day transaction
+        """
+        Sales.objects.filter(sales_id=self.sales_1.sales_id).update(
+            created_at=datetime(2022, 2, 1, 18, 0, tzinfo=dt_timezone.utc)
+        )
+        Restock.objects.filter(restock_id=self.restock_2.restock_id).update(
+            created_at=datetime(2022, 2, 2, 10, 0, tzinfo=dt_timezone.utc)
+        )
+        rebuild_daily_summary()
+
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get(self.owner_dashboard_url + '?year=2022&month=2&day=2')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_revenue_today'], 96000)
+        self.assertEqual(response.data['sales_revenue_today'], 96000)
+        self.assertEqual(response.data['service_revenue_today'], 0)
+        self.assertEqual(response.data['sales_count_today'], 1)
+        self.assertEqual(response.data['service_count_today'], 0)
+        self.assertEqual(response.data['expenditure_today'], 3588000)
+
+    def test_owner_dashboard_summary_is_fetched_in_single_query(self) -> None:
+        """
+        Ensure owner dashboard revenue, count, and expenditure is fetched in one query
+        """
+        with self.assertNumQueries(1):
+            summary = get_dashboard_summary()
+
+        self.assertEqual(summary['sales'], {'total': 372000, 'count': 2})
+        self.assertEqual(summary['service'], {'total': 245500, 'count': 2})
+        self.assertEqual(summary['restock'], {'total': 9241500, 'count': 2})
+
     def test_nonlogin_user_failed_to_access_owner_dashboard(self) -> None:
         """
         Ensure non-login user cannot access owner dashboard
@@ -870,6 +970,10 @@ class ServiceReportTestCase(SetTestCase):
             service_id=cls.service_2
         )
 
+        # Detail is created directly, so stored sales and service total and daily summary is recalculated
+        rebuild_transaction_total()
+        rebuild_daily_summary()
+
         cls.date = int(date.today().day) - 1
 
         return super().setUpTestData()
@@ -1362,3 +1466,322 @@ class DownloadServiceTestCase(SetTestCase):
         response = self.client.get(self.download_service_report_url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
         self.assertEqual(response.data['message'], 'Akses ditolak')
+
+
+class ReportCacheTestCase(SetTestCase):
+    sales_report_url = reverse('sales_report') + '?year=2022&month=2'
+    download_sales_report_url = reverse('sales_report_download') + '?year=2022&month=2'
+    report_cache_url = reverse('report_cache')
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        super().setUpTestData()
+
+        # Setting up sparepart data
+        cls.brand = Brand.objects.create(name='Shard')
+        cls.category = Category.objects.create(name='Honor')
+        cls.sparepart = Sparepart.objects.create(
+            name='Honorblade',
+            partnumber='HB-0010',
+            quantity=50,
+            motor_type='Roshar',
+            sparepart_type='Stormlight',
+            price=500000,
+            workshop_price=450000,
+            install_price=550000,
+            brand_id=cls.brand,
+            category_id=cls.category
+        )
+
+        # Setting up sales data on a closed month (February 2022 in Asia/Jakarta)
+        cls.customer = Customer.objects.create(name='Kaladin', contact='085456105311')
+        cls.sales = Sales.objects.create(customer_id=cls.customer, user_id=cls.user, deposit=100000)
+        Sales_detail.objects.create(sales_id=cls.sales, sparepart_id=cls.sparepart, quantity=2)
+        Sales.objects.filter(sales_id=cls.sales.sales_id).update(
+            created_at=datetime(2022, 2, 10, 3, 0, tzinfo=dt_timezone.utc)
+        )
+        rebuild_transaction_total()
+        rebuild_daily_summary()
+
+    def setUp(self) -> None:
+        cache.clear()
+        return super().setUp()
+
+    def test_owner_successfully_get_cached_report(self) -> None:
+        """
+        Ensure closed month report is computed once, then taken from cache without reading daily summary
+        """
+        self.client.force_authenticate(user=self.owner)
+        first_response = self.client.get(self.sales_report_url)
+        with CaptureQueriesContext(connection) as context:
+            second_response = get_report(transaction_type=Daily_summary.Types.SALES, year=2022, month=2)
+        self.assertFalse(any('daily_summary' in query['sql'] for query in context.captured_queries))
+
+        self.assertEqual(first_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(first_response.data, second_response)
+        self.assertEqual(second_response['sales_transaction_month'], 1000000)
+
+        response = self.client.get(self.report_cache_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['sales'], {'hit': 1, 'miss': 1})
+        self.assertEqual(response.data['service'], {'hit': 0, 'miss': 0})
+
+    def test_owner_successfully_download_cached_report(self) -> None:
+        """
+        Ensure closed month report pdf is rendered once, then taken from cache
+        """
+        self.client.force_authenticate(user=self.owner)
+        first_response = self.client.get(self.download_sales_report_url)
+        second_response = self.client.get(self.download_sales_report_url)
+
+        self.assertEqual(first_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(first_response.streaming_content), b''.join(second_response.streaming_content))
+        self.assertEqual(second_response.filename, 'Laporan_Penjualan-2022-2.pdf')
+
+        # pdf and report data each counted as one miss, then second download is a pdf hit
+        response = self.client.get(self.report_cache_url)
+        self.assertEqual(response.data['sales'], {'hit': 1, 'miss': 2})
+
+    def test_cached_report_is_invalidated_when_transaction_is_deleted(self) -> None:
+        """
+        Ensure cached report of a month is invalidated when sales in that month is deleted
+        """
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get(self.sales_report_url)
+        self.assertEqual(response.data['sales_report'][9]['sales_count'], 1)
+
+        self.client.force_authenticate(user=self.user)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.delete(reverse('sales_delete', kwargs={'sales_id': self.sales.sales_id}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        # Cached report is only invalidated after the transaction is committed
+        generation = get_report_generation(transaction_type=Daily_summary.Types.SALES, year=2022, month=2)
+        key = get_report_cache_key(kind='data', transaction_type=Daily_summary.Types.SALES, year=2022, month=2,
+                                   generation=generation)
+        self.assertIsNotNone(cache.get(key))
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(
+            get_report_generation(transaction_type=Daily_summary.Types.SALES, year=2022, month=2),
+            generation
+        )
+
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get(self.sales_report_url)
+        self.assertEqual(response.data['sales_report'][9]['sales_count'], 0)
+        self.assertEqual(response.data['sales_transaction_month'], 0)
+
+    def test_report_computed_while_invalidated_is_not_cached(self) -> None:
+        """
+        Ensure report that is computed while its month is invalidated is not stored in cache
+        """
+        def compute_outdated_report() -> dict:
+            # Transaction of the month is committed after the summary is read
+            invalidate_report_cache(transaction_type=Daily_summary.Types.SALES, days={date(2022, 2, 10)})
+            return {'sales_transaction_month': 1000000}
+
+        report = get_cached_report(transaction_type=Daily_summary.Types.SALES, year=2022, month=2,
+                                   compute=compute_outdated_report)
+        self.assertEqual(report, {'sales_transaction_month': 1000000})
+
+        report = get_cached_report(transaction_type=Daily_summary.Types.SALES, year=2022, month=2,
+                                   compute=lambda: {'sales_transaction_month': 0})
+        self.assertEqual(report, {'sales_transaction_month': 0})
+
+        # Report computed after the invalidation is stored
+        report = get_cached_report(transaction_type=Daily_summary.Types.SALES, year=2022, month=2,
+                                   compute=lambda: {'sales_transaction_month': -1})
+        self.assertEqual(report, {'sales_transaction_month': 0})
+
+    def test_current_month_report_is_not_cached(self) -> None:
+        """
+        Ensure report of current month is always computed from transaction data
+        """
+        self.client.force_authenticate(user=self.owner)
+        self.client.get(reverse('sales_report'))
+
+        response = self.client.get(self.report_cache_url)
+        self.assertEqual(response.data['sales'], {'hit': 0, 'miss': 0})
+
+    def test_nonowner_user_failed_to_access_report_cache(self) -> None:
+        """
+        Ensure non-owner user cannot access report cache counter
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.report_cache_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data['message'], 'Akses ditolak')
+
+
+class ReportJobTestCase(SetTestCase):
+    report_job_add_url = reverse('report_job_add')
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        super().setUpTestData()
+
+        cls.data = {
+            'report_type': Daily_summary.Types.SALES,
+            'year': 2022,
+            'month': 2,
+        }
+
+    def test_owner_successfully_add_and_download_report_job(self) -> None:
+        """
+        Ensure owner can submit report job, then download the pdf after worker finished it
+        """
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.post(self.report_job_add_url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['message'], 'Laporan sedang dibuat')
+        self.assertEqual(response.data['status'], Report_job.Status.PENDING)
+
+        report_job_id = response.data['report_job_id']
+        detail_url = reverse('report_job_detail', kwargs={'report_job_id': report_job_id})
+        download_url = reverse('report_job_download', kwargs={'report_job_id': report_job_id})
+
+        response = self.client.get(download_url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['message'], 'Laporan belum selesai dibuat')
+
+        call_command('report_worker', '--once', stdout=StringIO())
+
+        response = self.client.get(detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], Report_job.Status.DONE)
+
+        response = self.client.get(download_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response.filename, 'Laporan_Penjualan-2022-2.pdf')
+
+    def test_owner_failed_to_add_report_job_with_wrong_month(self) -> None:
+        """
+        Ensure owner cannot submit report job with month outside 1 - 12
+        """
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.post(self.report_job_add_url, {**self.data, 'month': 13}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_owner_failed_to_access_nonexist_report_job(self) -> None:
+        """
+        Ensure owner cannot access non-exist report job
+        """
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get(reverse('report_job_detail', kwargs={'report_job_id': 99999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['message'], 'Data laporan tidak ditemukan')
+
+    def test_nonowner_user_failed_to_add_report_job(self) -> None:
+        """
+        Ensure non-owner user cannot submit report job
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.report_job_add_url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data['message'], 'Akses ditolak')
+
+
+class RangeReportTestCase(SetTestCase):
+    range_report_url = reverse('range_report')
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        super().setUpTestData()
+
+        # Setting up sparepart and customer data
+        cls.brand = Brand.objects.create(name='Shard')
+        cls.category = Category.objects.create(name='Honor')
+        cls.sparepart = Sparepart.objects.create(
+            name='Honorblade',
+            partnumber='HB-0010',
+            quantity=50,
+            motor_type='Roshar',
+            sparepart_type='Stormlight',
+            price=100000,
+            workshop_price=90000,
+            install_price=110000,
+            brand_id=cls.brand,
+            category_id=cls.category
+        )
+        cls.customer = Customer.objects.create(name='Kaladin', contact='085456105311')
+
+        # Setting up sales spread over several month, 31 March 2022 18:00 UTC is 1 April 2022 in Asia/Jakarta
+        for created_at in (
+            datetime(2022, 1, 15, 3, 0, tzinfo=dt_timezone.utc),
+            datetime(2022, 2, 10, 3, 0, tzinfo=dt_timezone.utc),
+            datetime(2022, 2, 20, 3, 0, tzinfo=dt_timezone.utc),
+            datetime(2022, 3, 31, 18, 0, tzinfo=dt_timezone.utc),
+        ):
+            sales = Sales.objects.create(customer_id=cls.customer, user_id=cls.user, deposit=50000)
+            Sales_detail.objects.create(sales_id=sales, sparepart_id=cls.sparepart, quantity=1)
+            Sales.objects.filter(sales_id=sales.sales_id).update(created_at=created_at)
+        rebuild_transaction_total()
+        rebuild_daily_summary()
+
+    def test_owner_successfully_access_range_report_per_month(self) -> None:
+        """
+        Ensure owner can get report of several month grouped per month
+        """
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get(self.range_report_url + '?start_date=2022-01-01&end_date=2022-04-30&group=month')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        sales_report = response.data['sales']['report']
+        self.assertEqual([row['period'] for row in sales_report],
+                         [date(2022, 1, 1), date(2022, 2, 1), date(2022, 3, 1), date(2022, 4, 1)])
+        self.assertEqual([row['count'] for row in sales_report], [1, 2, 0, 1])
+        self.assertEqual(sales_report[1]['transaction'], 200000)
+        self.assertEqual(response.data['sales']['transaction_total'], 400000)
+        self.assertEqual(response.data['sales']['payment_total'], 200000)
+        self.assertEqual(response.data['service']['count_total'], 0)
+
+    def test_owner_successfully_access_range_report_per_week(self) -> None:
+        """
+        Ensure owner can get report of a date range grouped per week starting on monday
+        """
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get(
+            self.range_report_url + '?start_date=2022-02-09&end_date=2022-02-20&group=week&type=sales'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('restock', response.data)
+
+        sales_report = response.data['sales']['report']
+        self.assertEqual([row['period'] for row in sales_report], [date(2022, 2, 7), date(2022, 2, 14)])
+        self.assertEqual([row['count'] for row in sales_report], [1, 1])
+
+    def test_range_report_is_aggregated_in_single_query(self) -> None:
+        """
+        Ensure range report of each report type only need one query
+        """
+        with self.assertNumQueries(1):
+            get_range_report(
+                transaction_type=Daily_summary.Types.SALES,
+                start_date=date(2021, 1, 1),
+                end_date=date(2022, 12, 31),
+                group='month'
+            )
+
+    def test_owner_failed_to_access_range_report_with_wrong_input(self) -> None:
+        """
+        Ensure owner cannot get range report with wrong grouping or date
+        """
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get(self.range_report_url + '?group=year')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['message'], 'Data laporan tidak sesuai / tidak lengkap')
+
+        response = self.client.get(self.range_report_url + '?start_date=2022-13-01')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['message'], 'Format tanggal tidak sesuai, gunakan YYYY-MM-DD')
+
+    def test_nonowner_user_failed_to_access_range_report(self) -> None:
+        """
+        Ensure non-owner user cannot access range report
+        """
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.range_report_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data['message'], 'Akses ditolak')
@@ -10,16 +10,25 @@ urlpatterns = [
      path('admin/', views.AdminDashboard.as_view(), name='admin_dashboard'),
      path('admin/sparepart/', views.SparepartDataList.as_view(), name='sparepart_data_list'),
      path('admin/sparepart/add/', views.SparepartDataAdd.as_view(), name='sparepart_data_add'),
+     path('admin/sparepart/import/', views.SparepartImport.as_view(), name='sparepart_import'),
+     path('admin/sparepart/export/', views.SparepartExport.as_view(), name='sparepart_export'),
      path('admin/sparepart/edit/<int:sparepart_id>/', views.SparepartDataUpdate.as_view(),
           name='sparepart_data_update'),
      path('admin/sparepart/delete/<int:sparepart_id>/', views.SparepartDataDelete.as_view(),
           name='sparepart_data_delete'),
+     path('admin/sparepart/stock/<int:sparepart_id>/', views.SparepartStock.as_view(), name='sparepart_stock'),
+     path('admin/sparepart/alert/', views.StockAlertStream.as_view(), name='stock_alert_stream'),
+     path('admin/sparepart/reorder/', views.ReorderSuggestion.as_view(), name='reorder_suggestion'),
+     path('admin/sparepart/movement/<int:sparepart_id>/', views.SparepartMovementList.as_view(),
+          name='sparepart_movement'),
      path('admin/sales/', views.SalesList.as_view(), name='sales_list'),
+     path('admin/sales/export/', views.SalesExport.as_view(), name='sales_export'),
      path('admin/sales/add/', views.SalesAdd.as_view(), name='sales_add'),
      path('admin/sales/receipt/<int:sales_id>/', views.SalesReceipt.as_view(), name='sales_receipt'),
      path('admin/sales/edit/<int:sales_id>/', views.SalesUpdate.as_view(), name='sales_update'),
      path('admin/sales/delete/<int:sales_id>/', views.SalesDelete.as_view(), name='sales_delete'),
      path('admin/restock/', views.RestockList.as_view(), name='restock_list'),
+     path('admin/restock/export/', views.RestockExport.as_view(), name='restock_export'),
      path('admin/restock/add/', views.RestockAdd.as_view(), name='restock_add'),
      path('admin/restock/edit/<int:restock_id>/', views.RestockUpdate.as_view(), name='restock_update'),
      path('admin/restock/delete/<int:restock_id>/', views.RestockDelete.as_view(), name='restock_delete'),
@@ -28,8 +37,10 @@ urlpatterns = [
      path('admin/supplier/edit/<int:supplier_id>/', views.SupplierUpdate.as_view(), name='supplier_update'),
      path('admin/supplier/delete/<int:supplier_id>/', views.SupplierDelete.as_view(), name='supplier_delete'),
      path('admin/service/', views.ServiceList.as_view(), name='service_list'),
+     path('admin/service/export/', views.ServiceExport.as_view(), name='service_export'),
      path('admin/service/add/', views.ServiceAdd.as_view(), name='service_add'),
      path('admin/service/receipt/<int:service_id>/', views.ServiceReceipt.as_view(), name='service_receipt'),
+     path('admin/receipt/', views.ReceiptBatch.as_view(), name='receipt_batch'),
      path('admin/service/edit/<int:service_id>/', views.ServiceUpdate.as_view(), name='service_update'),
      path('admin/service/delete/<int:service_id>/', views.ServiceDelete.as_view(), name='service_delete'),
      path('admin/brand/', views.BrandList.as_view(), name='brand_list'),
@@ -57,6 +68,12 @@ urlpatterns = [
      path('owner/report/restock/download/', views.RestockReportDownload.as_view(), name='restock_report_download'),
      path('owner/report/service/', views.ServiceReport.as_view(), name='service_report'),
      path('owner/report/service/download/', views.ServiceReportDownload.as_view(), name='service_report_download'),
+     path('owner/report/range/', views.RangeReport.as_view(), name='range_report'),
+     path('owner/report/cache/', views.ReportCacheStats.as_view(), name='report_cache'),
+     path('owner/report/job/add/', views.ReportJobAdd.as_view(), name='report_job_add'),
+     path('owner/report/job/<int:report_job_id>/', views.ReportJobDetail.as_view(), name='report_job_detail'),
+     path('owner/report/job/<int:report_job_id>/download/', views.ReportJobDownload.as_view(),
+          name='report_job_download'),
      path('owner/profile/<int:user_id>/', views.ProfileDetail.as_view(), name='profile_detail'),
      path('owner/profile/edit/<int:user_id>/', views.ProfileUpdate.as_view(), name='profile_update'),
      path('owner/log/', views.LogList.as_view(), name='log'),
@@ -1,17 +1,39 @@
 from calendar import monthrange
-from datetime import date
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from copy import copy
+from datetime import date, datetime, timedelta
 from io import BytesIO
 import locale
+import threading
+import django
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (Case, Count, DateField, DecimalField, Exists, F,
+                              IntegerField, Max, OuterRef, Subquery, Sum, Value,
+                              When)
+from django.db.models.functions import Coalesce, Greatest, Trunc, TruncDate
 from django.http import FileResponse
+from django.utils import timezone
+from pypdf import PdfReader, PdfWriter
 from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer, TableStyle
 from reportlab.lib.styles import ParagraphStyle
-from si_mbe.models import Logs
+from si_mbe.models import (Daily_sparepart_summary, Daily_summary, Logs,
+                           Restock, Restock_detail, Sales, Sales_detail,
+                           Service, Service_action, Service_sparepart,
+                           Sparepart, Stock_alert, Stock_movement,
+                           Stock_snapshot)
 from reportlab.lib.units import cm, mm
 from reportlab.lib.enums import TA_CENTER
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet
 from rest_framework.exceptions import ValidationError
+from si_mbe.caches import (get_cached_report, get_cached_report_pdf,
+                           invalidate_report_cache)
+
+# output field for money calculation in database, same as money field in models
+MONEY_FIELD = DecimalField(max_digits=15, decimal_places=0)
 
 
 def perform_log(request: any, operation: str, table: str) -> None:
@@ -22,68 +44,201 @@ def perform_log(request: any, operation: str, table: str) -> None:
     )
 
 
+def get_detail_quantity(details: any) -> dict:
+    '''
+    Function to sum quantity of transaction detail per sparepart, details is list / queryset of
+    detail instance (Sales_detail, Restock_detail, Service_sparepart) or list of dict of old detail data.
+
+    Return dict of {sparepart_id: quantity}, detail of deleted sparepart is skipped
+    '''
+    quantity_map = {}
+    for detail in details:
+        if isinstance(detail, dict):
+            sparepart_id = getattr(detail['sparepart_id'], 'pk', detail['sparepart_id'])
+            quantity = detail['quantity']
+        else:
+            sparepart_id = detail.sparepart_id_id
+            quantity = detail.quantity
+
+        if sparepart_id is not None:
+            quantity_map[sparepart_id] = quantity_map.get(sparepart_id, 0) + quantity
+
+    return quantity_map
+
+
+def get_quantity_delta(added: dict, removed: dict) -> dict:
+    '''
+    Function to get stock change per sparepart from quantity that is added to and removed from stock.
+
+    Return dict of {sparepart_id: delta} without sparepart that stock doesn't change
+    '''
+    delta = {}
+    for sparepart_id in added.keys() | removed.keys():
+        change = added.get(sparepart_id, 0) - removed.get(sparepart_id, 0)
+        if change != 0:
+            delta[sparepart_id] = change
+
+    return delta
+
+
+def update_nested_detail(instance: any, related_name: str, validated_details: list) -> dict:
+    '''
+    A function to update nested detail (related_name, e.g. sales_detail_set) of instance from validated
+    detail list of dict. Detail having its id is updated, detail without id is created, and existing detail
+    that isn't sent is deleted.
+
+    Each kind of change is applied in single query (DELETE ... IN, bulk_update, bulk_create) and only
+    changed field is updated. Existing detail instance is copied before changed, so detail that is read
+    before update (e.g. prefetched old detail) keep its old value.
+
+    Return dict of {created, updated, deleted} detail instance list
+    '''
+    manager = getattr(instance, related_name)
+    detail_model = manager.model
+    id_field = detail_model._meta.pk.name
+
+    # get all nested objects related with this instance and make a dict(id, object)
+    details_dict = dict((detail.pk, copy(detail)) for detail in manager.all())
+
+    created = []
+    updated = []
+    updated_fields = set()
+    for validated_detail in validated_details:
+        data = dict(validated_detail)
+        detail_id = data.pop(id_field, None)
+        if detail_id is None:
+            created.append(detail_model(**{manager.field.name: instance}, **data))
+            continue
+
+        # remove from the dict and assign only the field that is changed
+        detail = details_dict.pop(detail_id)
+        changed_fields = []
+        for key, value in data.items():
+            field = detail_model._meta.get_field(key)
+            new_value = getattr(value, 'pk', value) if field.is_relation else value
+            if getattr(detail, field.attname) != new_value:
+                setattr(detail, key, value)
+                changed_fields.append(key)
+
+        if changed_fields:
+            updated.append(detail)
+            updated_fields.update(changed_fields)
+
+    # delete remaining detail first because they're not present in update call,
+    # so new detail can use sparepart of the deleted one
+    deleted = list(details_dict.values())
+    if deleted:
+        detail_model.objects.filter(pk__in=details_dict.keys()).delete()
+    if updated:
+        detail_model.objects.bulk_update(updated, sorted(updated_fields))
+    if created:
+        detail_model.objects.bulk_create(created)
+
+    # prefetched detail of the instance is outdated
+    getattr(instance, '_prefetched_objects_cache', {}).pop(related_name, None)
+
+    return {'created': created, 'updated': updated, 'deleted': deleted}
+
+
+def lock_rows(queryset: any) -> list:
+    '''
+    Function to lock rows of queryset until current transaction is finished, must be called inside
+    transaction.atomic. Rows are locked in ascending primary key order, so transactions locking
+    the same rows always wait for each other instead of deadlock.
+
+    Return list of locked primary key
+    '''
+    return list(queryset.select_for_update(no_key=True).order_by('pk').values_list('pk', flat=True))
+
+
+def lock_spareparts(*details: any) -> list:
+    '''
+    Function to lock sparepart rows used by every given details (detail instance, validated detail dict,
+    or old data list) before their quantity is changed.
+
+    Return list of locked sparepart id
+    '''
+    sparepart_id_list = set()
+    for detail_list in details:
+        sparepart_id_list.update(get_detail_quantity(detail_list))
+
+    return lock_rows(Sparepart.objects.filter(sparepart_id__in=sparepart_id_list))
+
+
+def apply_sparepart_quantity_delta(delta: dict, movement_type: str, reference_id: int = None) -> None:
+    '''
+    A function to apply stock change of every sparepart in single update query, quantity is calculated
+    by the database (F expression) so concurrent transaction never overwrite each other stock change.
+
+    Every change is also written to stock movement ledger with movement_type (Stock_movement.Types)
+    and reference_id (id of the transaction causing the change)
+    '''
+    if not delta:
+        return
+
+    Sparepart.objects.filter(sparepart_id__in=delta.keys()).update(
+        quantity=F('quantity') + Case(
+            *[When(sparepart_id=sparepart_id, then=Value(change)) for sparepart_id, change in delta.items()],
+            default=Value(0)
+        )
+    )
+
+    # Quantity is read after update, updated row is locked until transaction finished so quantity before
+    # this change is exactly quantity after update minus its change
+    new_stock = {
+        sparepart_id: (quantity, limit) for sparepart_id, quantity, limit in Sparepart.objects.filter(
+            sparepart_id__in=delta.keys()
+        ).values_list('sparepart_id', 'quantity', 'limit')
+    }
+    record_stock_alert(
+        old_stock={sparepart_id: (quantity - delta[sparepart_id], limit)
+                   for sparepart_id, (quantity, limit) in new_stock.items()},
+        new_stock=new_stock
+    )
+
+    created_at = timezone.now()
+    Stock_movement.objects.bulk_create([
+        Stock_movement(
+            sparepart_id_id=sparepart_id,
+            quantity=change,
+            movement_type=movement_type,
+            reference_id=reference_id,
+            created_at=created_at
+        ) for sparepart_id, change in delta.items()
+    ])
+
+
 def sales_adjust_sparepart_quantity(
                                     new_instance: any = None,
                                     old_instance: any = None,
                                     old_data_list: list = [],
                                     create: bool = False,
-                                    update: bool = False
+                                    update: bool = False,
+                                    transaction_id: int = None
                                 ) -> None:
     '''
     A function to adjust sparepart quantity after Creating, Updating, and Deleting
-    Sales data / object / instance
-    '''
-    instance = new_instance
-    old_sales_details = old_instance
-
-    if create:
-        # Subtracting spareapart quantity with new sales detail data
-        for sales_detail in instance.sales_detail_set.all():
-            # Get the Sparepart instance associated with the Sales_detail instance
-            sparepart = sales_detail.sparepart_id
-            # Update the quantity field of the Sparepart instance
-            sparepart.quantity -= sales_detail.quantity
-            sparepart.save()
-    elif update:
-        # looping trought new sales_detail data to adjust sparepart quantity
-        for sales_detail in instance.sales_detail_set.all():
-            # Get the Sparepart instance associated with the sales_detail instance
-            sparepart = sales_detail.sparepart_id
-
-            # Find the old sales_detail instance with the same sparepart_id
-            old_sales_detail = next(
-                (sd for sd in old_sales_details if sd.sparepart_id == sparepart),
-                None
-            )
-
-            # Update the quantity field of the Sparepart instance:
-            # 1. If an old sales_detail instance was found, increase the quantity field of
-            # the Sparepart instance by the old quantity value
-            if old_sales_detail:
-                sparepart.quantity += old_sales_detail.quantity
-
-            # 2. Decrease the quantity field of the Sparepart instance by the new quantity value
-            sparepart.quantity -= sales_detail.quantity
-            sparepart.save()
-
-        # Loop over all the old sales_detail instances
-        for old_sales_detail in old_sales_details:
-            # Check if the old sales_detail instance is not present in the
-            # new data / updated instance
-            if old_sales_detail not in instance.sales_detail_set.all():
-                sparepart = old_sales_detail.sparepart_id
-                # increase the quantity field of the Sparepart instance by the old
-                # quantity value
-                sparepart.quantity += old_sales_detail.quantity
-                sparepart.save()
+    Sales data / object / instance, transaction_id is sales id of deleted sales
+    '''
+    new_quantity = {}
+    if create or update:
+        # Reading saved sales detail from database, instance prefetch cache may still hold old detail
+        new_quantity = get_detail_quantity(Sales_detail.objects.filter(sales_id=new_instance).only(
+            'sparepart_id', 'quantity'))
+
+    if update:
+        old_quantity = get_detail_quantity(old_instance)
+    elif create:
+        old_quantity = {}
     else:
-        # Adding (plus) Sparepart quantity with old sales detail data
-        for old_data in old_data_list:
-            # Get the Sparepart instance associated with the old Sales_detail instance
-            sparepart = old_data['sparepart_id']
-            # Update the quantity field of the Sparepart instance
-            sparepart.quantity += old_data['quantity']
-            sparepart.save()
+        old_quantity = get_detail_quantity(old_data_list)
+
+    # Old sold sparepart is returned to stock and new sold sparepart is taken from stock
+    apply_sparepart_quantity_delta(
+        delta=get_quantity_delta(added=old_quantity, removed=new_quantity),
+        movement_type=Stock_movement.Types.SALES,
+        reference_id=new_instance.pk if new_instance is not None else transaction_id
+    )
 
 
 def restock_adjust_sparepart_quantity(
@@ -91,63 +246,32 @@ def restock_adjust_sparepart_quantity(
                                     old_instance: any = None,
                                     old_data_list: list = [],
                                     create: bool = False,
-                                    update: bool = False
+                                    update: bool = False,
+                                    transaction_id: int = None
                                 ) -> None:
     '''
     A function to adjust sparepart quantity after Creating, Updating, and Deleting
-    Restock data / object / instance
-    '''
-    instance = new_instance
-    old_restock_details = old_instance
-
-    if create:
-        # Subtracting spareapart quantity with new restock detail data
-        for restock_detail in instance.restock_detail_set.all():
-            # Get the Sparepart instance associated with the Restock_detail instance
-            sparepart = restock_detail.sparepart_id
-            # Update the quantity field of the Sparepart instance
-            sparepart.quantity += restock_detail.quantity
-            sparepart.save()
-    elif update:
-        # looping trought new restock sparepart data to adjust sparepart quantity
-        for restock_detail in instance.restock_detail_set.all():
-            # Get the Sparepart instance associated with the restock_detail instance
-            sparepart = restock_detail.sparepart_id
-
-            # Find the old restock_sparepart instance with the same sparepart_id
-            old_restock_detail = next(
-                (rd for rd in old_restock_details if rd.sparepart_id == sparepart),
-                None
-            )
-
-            # Update the quantity field of the Sparepart instance:
-            # 1. If an old restock_detail instance was found, increase the quantity field of
-            # the Sparepart instance by the old quantity value
-            if old_restock_detail:
-                sparepart.quantity -= old_restock_detail.quantity
-
-            # 2. Decrease the quantity field of the Sparepart instance by the new quantity value
-            sparepart.quantity += restock_detail.quantity
-            sparepart.save()
-
-        # Loop over all the old restock_detail instances, to find old but not present data in new data
-        for old_restock_detail in old_restock_details:
-            # Check if the old Service_sparepart instance is not present in the
-            # new data / updated instance
-            if old_restock_detail not in instance.restock_detail_set.all():
-                sparepart = old_restock_detail.sparepart_id
-                # increase the quantity field of the Sparepart instance by the old
-                # quantity value
-                sparepart.quantity -= old_restock_detail.quantity
-                sparepart.save()
+    Restock data / object / instance, transaction_id is restock id of deleted restock
+    '''
+    new_quantity = {}
+    if create or update:
+        # Reading saved restock detail from database, instance prefetch cache may still hold old detail
+        new_quantity = get_detail_quantity(Restock_detail.objects.filter(restock_id=new_instance).only(
+            'sparepart_id', 'quantity'))
+
+    if update:
+        old_quantity = get_detail_quantity(old_instance)
+    elif create:
+        old_quantity = {}
     else:
-        # Adding (plus) Sparepart quantity with old restock detail data
-        for old_data in old_data_list:
-            # Get the Sparepart instance associated with the old Restock_detail instance
-            sparepart = old_data['sparepart_id']
-            # Update the quantity field of the Sparepart instance
-            sparepart.quantity -= old_data['quantity']
-            sparepart.save()
+        old_quantity = get_detail_quantity(old_data_list)
+
+    # New restocked sparepart is added to stock and old restocked sparepart is taken back from stock
+    apply_sparepart_quantity_delta(
+        delta=get_quantity_delta(added=new_quantity, removed=old_quantity),
+        movement_type=Stock_movement.Types.RESTOCK,
+        reference_id=new_instance.pk if new_instance is not None else transaction_id
+    )
 
 
 def service_adjust_sparepart_quantity(
@@ -155,212 +279,1043 @@ def service_adjust_sparepart_quantity(
                                     old_instance: any = None,
                                     old_data_list: list = [],
                                     create: bool = False,
-                                    update: bool = False
+                                    update: bool = False,
+                                    transaction_id: int = None
                                 ) -> None:
     '''
     A function to adjust sparepart quantity after Creating, Updating, and Deleting
-    Service data / object / instance
-    '''
-    instance = new_instance
-    old_service_spareparts = old_instance
-
-    if create:
-        # Subtracting spareapart quantity with new service_sparepart data
-        for service_sparepart in instance.service_sparepart_set.all():
-            # Get the Sparepart instance associated with the Service_sparepart instance
-            sparepart = service_sparepart.sparepart_id
-            # Update the quantity field of the Sparepart instance
-            sparepart.quantity -= service_sparepart.quantity
-            sparepart.save()
-    elif update:
-        # looping trought new service sparepart data to adjust sparepart quantity
-        for service_sparepart in instance.service_sparepart_set.all():
-            # Get the Sparepart instance associated with the Service_sparepart instance
-            sparepart = service_sparepart.sparepart_id
-
-            # Find the old Service_sparepart instance with the same sparepart_id
-            old_service_sparepart = next(
-                (ss for ss in old_service_spareparts if ss.sparepart_id == sparepart),
-                None
-            )
+    Service data / object / instance, transaction_id is service id of deleted service
+    '''
+    new_quantity = {}
+    if create or update:
+        # Reading saved service sparepart from database, instance prefetch cache may still hold old data
+        new_quantity = get_detail_quantity(Service_sparepart.objects.filter(service_id=new_instance).only(
+            'sparepart_id', 'quantity'))
+
+    if update:
+        old_quantity = get_detail_quantity(old_instance)
+    elif create:
+        old_quantity = {}
+    else:
+        old_quantity = get_detail_quantity(old_data_list)
 
-            # Update the quantity field of the Sparepart instance:
-            # 1. If an old Service_action instance was found, increase the quantity field of
-            # the Sparepart instance by the old quantity value
-            if old_service_sparepart:
-                sparepart.quantity += old_service_sparepart.quantity
-
-            # 2. Decrease the quantity field of the Sparepart instance by the new quantity value
-            sparepart.quantity -= service_sparepart.quantity
-            sparepart.save()
-
-        # Loop over all the old Service_sparepart instances
-        for old_service_sparepart in old_service_spareparts:
-            # Check if the old Service_sparepart instance is not present in the
-            # new data / updated instance
-            if old_service_sparepart not in instance.service_sparepart_set.all():
-                sparepart = old_service_sparepart.sparepart_id
-                # increase the quantity field of the Sparepart instance by the old
-                # quantity value
-                sparepart.quantity += old_service_sparepart.quantity
-                sparepart.save()
+    # Old used sparepart is returned to stock and new used sparepart is taken from stock
+    apply_sparepart_quantity_delta(
+        delta=get_quantity_delta(added=old_quantity, removed=new_quantity),
+        movement_type=Stock_movement.Types.SERVICE,
+        reference_id=new_instance.pk if new_instance is not None else transaction_id
+    )
+
+
+def record_stock_alert(old_stock: dict, new_stock: dict) -> list:
+    '''
+    A function to write stock alert for every sparepart that quantity cross its limit, either become low
+    (quantity <= limit) or no longer low. old_stock and new_stock are dict of {sparepart_id: (quantity, limit)}
+    before and after the change, sparepart that is not in old_stock is new and counted as not low.
+
+    Return list of created stock alert
+    '''
+    alerts = []
+    for sparepart_id, (quantity, limit) in new_stock.items():
+        old_quantity, old_limit = old_stock.get(sparepart_id, (limit + 1, limit))
+        is_low = quantity <= limit
+        if is_low != (old_quantity <= old_limit):
+            alerts.append(Stock_alert(sparepart_id_id=sparepart_id, quantity=quantity, limit=limit, is_low=is_low))
+
+    return Stock_alert.objects.bulk_create(alerts)
+
+
+def record_stock_adjustment(sparepart: any, change: int) -> None:
+    '''
+    A function to write sparepart quantity that is changed directly by admin (new sparepart or
+    edited quantity) to stock movement ledger, sparepart quantity itself is already saved
+    '''
+    if change != 0:
+        Stock_movement.objects.create(
+            sparepart_id=sparepart,
+            quantity=change,
+            movement_type=Stock_movement.Types.ADJUSTMENT
+        )
+
+
+def get_stock_at(day: date, sparepart_id_list: list = None) -> dict:
+    '''
+    Function to get sparepart quantity at the end of the day (Asia/Jakarta), starting from the latest
+    stock snapshot before the day then adding stock movement after the snapshot, so only movement
+    between them is scanned instead of whole history.
+
+    Return dict of {sparepart_id: quantity} of sparepart that have snapshot or movement until the day
+    '''
+    end = get_day_range(day=day)[1]
+    snapshots = Stock_snapshot.objects.filter(date__lte=day)
+    movements = Stock_movement.objects.filter(created_at__lt=end)
+    if sparepart_id_list is not None:
+        snapshots = snapshots.filter(sparepart_id__in=sparepart_id_list)
+        movements = movements.filter(sparepart_id__in=sparepart_id_list)
+
+    stock = {}
+    snapshot_day = snapshots.aggregate(day=Max('date'))['day']
+    if snapshot_day is not None:
+        stock = dict(snapshots.filter(date=snapshot_day).values_list('sparepart_id', 'quantity'))
+        movements = movements.filter(created_at__gte=get_day_range(day=snapshot_day)[1])
+
+    for sparepart_id, quantity in movements.values('sparepart_id').annotate(
+        total=Sum('quantity')
+    ).order_by().values_list('sparepart_id', 'total'):
+        stock[sparepart_id] = stock.get(sparepart_id, 0) + quantity
+
+    return stock
+
+
+def take_stock_snapshot(day: date) -> int:
+    '''
+    A function to store quantity of every sparepart at the end of the day as stock snapshot,
+    existing snapshot of the day is replaced. Only day that already ended can be stored, since snapshot
+    is used as the final quantity of the day by get_stock_at.
+
+    Return number of stored snapshot
+    '''
+    if day >= timezone.localdate():
+        raise ValueError(f'Stock snapshot of {day} can only be taken after the day ended')
+
+    Stock_snapshot.objects.filter(date=day).delete()
+    snapshots = Stock_snapshot.objects.bulk_create([
+        Stock_snapshot(date=day, sparepart_id_id=sparepart_id, quantity=quantity)
+        for sparepart_id, quantity in get_stock_at(day=day).items()
+    ], batch_size=1000)
+
+    return len(snapshots)
+
+
+def rebuild_stock_movement() -> None:
+    '''
+    A function to rebuild stock movement ledger from sales detail, restock detail, and service sparepart,
+    then add adjustment movement at sparepart created time so ledger total equal current sparepart quantity.
+    Every stock snapshot is removed since it may not match rebuilt ledger
+    '''
+    Stock_snapshot.objects.all().delete()
+    Stock_movement.objects.all().delete()
+
+    movements = []
+    for detail_model, movement_type, sign, reference in (
+        (Sales_detail, Stock_movement.Types.SALES, -1, 'sales_id'),
+        (Restock_detail, Stock_movement.Types.RESTOCK, 1, 'restock_id'),
+        (Service_sparepart, Stock_movement.Types.SERVICE, -1, 'service_id'),
+    ):
+        for sparepart_id, quantity, reference_id, created_at in detail_model.objects.filter(
+            sparepart_id__isnull=False
+        ).values_list('sparepart_id', 'quantity', reference, 'created_at').iterator():
+            movements.append(Stock_movement(
+                sparepart_id_id=sparepart_id,
+                quantity=sign * quantity,
+                movement_type=movement_type,
+                reference_id=reference_id,
+                created_at=created_at
+            ))
+
+    # Quantity that doesn't come from transaction is counted as adjustment when sparepart is created
+    total = get_detail_quantity({'sparepart_id': movement.sparepart_id_id, 'quantity': movement.quantity}
+                                for movement in movements)
+    for sparepart_id, quantity, created_at in Sparepart.objects.values_list('sparepart_id', 'quantity', 'created_at'):
+        if quantity != total.get(sparepart_id, 0):
+            movements.append(Stock_movement(
+                sparepart_id_id=sparepart_id,
+                quantity=quantity - total.get(sparepart_id, 0),
+                movement_type=Stock_movement.Types.ADJUSTMENT,
+                created_at=created_at
+            ))
+
+    Stock_movement.objects.bulk_create(movements, batch_size=1000)
+
+
+def verify_stock_movement() -> list:
+    '''
+    Function to compare current sparepart quantity against stock movement ledger.
+
+    Return list of message for every sparepart that quantity is different from ledger
+    '''
+    stock = get_stock_at(day=timezone.localdate())
+    mismatches = []
+    for sparepart_id, name, quantity in Sparepart.objects.values_list('sparepart_id', 'name', 'quantity'):
+        if quantity != stock.get(sparepart_id, 0):
+            mismatches.append(f'{sparepart_id} {name}: quantity={quantity}, ledger={stock.get(sparepart_id, 0)}')
+
+    return mismatches
+
+
+def get_month_range(year: int, month: int) -> tuple:
+    '''
+    Function to get the first moment of the month and the first moment of the next month
+    as aware datetime in current timezone (Asia/Jakarta), used to filter created_at by range
+    so the database can use the created_at index
+    '''
+    start = timezone.make_aware(datetime(year, month, 1))
+    if month == 12:
+        end = timezone.make_aware(datetime(year + 1, 1, 1))
     else:
-        # Adding (plus) Sparepart quantity with old service_sparepart data
-        for old_data in old_data_list:
-            # Get the Sparepart instance associated with the old service_sparepart instance
-            sparepart = old_data['sparepart_id']
-            # Update the quantity field of the Sparepart instance
-            sparepart.quantity += old_data['quantity']
-            sparepart.save()
-
-
-def get_sales_report(
-                    data_list: list,
-                    year: int = date.today().year,
-                    month: int = date.today().month,
+        end = timezone.make_aware(datetime(year, month + 1, 1))
+
+    return start, end
+
+
+def get_day_range(day: date) -> tuple:
+    '''
+    Function to get the first moment of the day and the first moment of the next day
+    as aware datetime in current timezone (Asia/Jakarta)
+    '''
+    start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+    end = timezone.make_aware(datetime.combine(day + timedelta(days=1), datetime.min.time()))
+
+    return start, end
+
+
+def sales_sub_total_expression() -> any:
+    '''
+    Expression of sales detail sub total (price when sparepart is sold times quantity)
+    to annotate Sales_detail queryset
+    '''
+    return F('quantity') * F('individual_price')
+
+
+def detail_sum_expression(detail_model: any, reference: str, total: any, output_field: any = MONEY_FIELD) -> Coalesce:
+    '''
+    Subquery expression of total of detail_model grouped by its transaction (reference, e.g. sales_id)
+    to annotate the transaction queryset, transaction without detail get 0
+    '''
+    total = detail_model.objects.filter(
+        **{reference: OuterRef(reference)}
+    ).values(reference).annotate(total=total).values('total')
+
+    return Coalesce(Subquery(total), Value(0), output_field=output_field)
+
+
+def sales_total_expression() -> Coalesce:
+    '''
+    Subquery expression of sales total price (sum of sales detail sub total, before discount)
+    to annotate Sales queryset
+    '''
+    return detail_sum_expression(Sales_detail, 'sales_id', Sum(sales_sub_total_expression()))
+
+
+def restock_total_expression() -> Coalesce:
+    '''
+    Subquery expression of restock total cost (sum of individual price times quantity)
+    to annotate Restock queryset
+    '''
+    total = Restock_detail.objects.filter(
+        restock_id=OuterRef('restock_id')
+    ).values('restock_id').annotate(total=Sum(F('quantity') * F('individual_price'))).values('total')
+
+    return Coalesce(Subquery(total), Value(0), output_field=MONEY_FIELD)
+
+
+def restock_quantity_expression() -> Coalesce:
+    '''
+    Subquery expression of restock total sparepart quantity to annotate Restock queryset
+    '''
+    total = Restock_detail.objects.filter(
+        restock_id=OuterRef('restock_id')
+    ).values('restock_id').annotate(total=Sum('quantity')).values('total')
+
+    return Coalesce(Subquery(total), Value(0))
+
+
+def get_restock_total(details: list, deposit: int) -> dict:
+    '''
+    Function to get stored total of restock from its validated restock detail and deposit,
+    remaining payment is never below zero
+
+    Return dict of {total_cost, total_quantity, remaining_payment}
+    '''
+    total_cost = sum(int(detail['individual_price']) * detail['quantity'] for detail in details)
+
+    return {
+        'total_cost': total_cost,
+        'total_quantity': sum(detail['quantity'] for detail in details),
+        'remaining_payment': max(total_cost - int(deposit), 0),
+    }
+
+
+def rebuild_restock_total() -> int:
+    '''
+    A function to recalculate stored total of every restock from its restock detail in single update
+
+    Return number of updated restock
+    '''
+    total_cost = restock_total_expression()
+
+    return Restock.objects.update(
+        total_cost=total_cost,
+        total_quantity=restock_quantity_expression(),
+        remaining_payment=Greatest(total_cost - F('deposit'), Value(0), output_field=MONEY_FIELD)
+    )
+
+
+def verify_restock_total() -> list:
+    '''
+    Function to compare stored total of restock against its restock detail
+
+    Return list of message for every restock that stored total is different from restock detail
+    '''
+    total_cost = restock_total_expression()
+    restocks = Restock.objects.annotate(
+        expected_cost=total_cost,
+        expected_quantity=restock_quantity_expression(),
+        expected_remaining=Greatest(total_cost - F('deposit'), Value(0), output_field=MONEY_FIELD),
+    ).exclude(
+        total_cost=F('expected_cost'),
+        total_quantity=F('expected_quantity'),
+        remaining_payment=F('expected_remaining'),
+    ).order_by('restock_id')
+
+    return [
+        f'Restock {restock.restock_id}: '
+        f'stored=({restock.total_cost}, {restock.total_quantity}, {restock.remaining_payment}) '
+        f'expected=({restock.expected_cost}, {restock.expected_quantity}, {restock.expected_remaining})'
+        for restock in restocks
+    ]
+
+
+def get_sales_price(sparepart: any, is_workshop: bool) -> any:
+    '''
+    Function to get current price of sparepart for sales, workshop customer use sparepart workshop price
+    '''
+    return sparepart.workshop_price if is_workshop else sparepart.price
+
+
+def capture_detail_price(validated_details: list, old_details: any, id_field: str, get_price: any) -> None:
+    '''
+    A function to write unit price (individual_price) into every validated sales detail or service sparepart
+    before it's saved. Existing detail that keep its sparepart keep its captured price, so editing a transaction
+    doesn't change the price it's sold with. New detail and detail that change its sparepart use current
+    sparepart price from get_price(sparepart).
+    '''
+    old_prices = {detail.pk: (detail.sparepart_id_id, detail.individual_price) for detail in old_details}
+    for detail in validated_details:
+        sparepart_id, price = old_prices.get(detail.get(id_field), (None, None))
+        if price is None or sparepart_id != detail['sparepart_id'].pk:
+            price = get_price(detail['sparepart_id'])
+        detail['individual_price'] = price
+
+
+def get_sales_total(details: list) -> dict:
+    '''
+    Function to get stored total of sales from its validated sales detail with captured price
+
+    Return dict of {total_price, total_quantity}
+    '''
+    return {
+        'total_price': sum(int(detail['individual_price']) * detail['quantity'] for detail in details),
+        'total_quantity': sum(detail['quantity'] for detail in details),
+    }
+
+
+def get_service_total(sparepart_details: list, action_details: list) -> dict:
+    '''
+    Function to get stored total of service from its validated service sparepart with captured price
+    and service action
+
+    Return dict of {sparepart_total, action_total, total_quantity}
+    '''
+    return {
+        'sparepart_total': sum(int(detail['individual_price']) * detail['quantity'] for detail in sparepart_details),
+        'action_total': sum(int(action['cost']) for action in action_details),
+        'total_quantity': sum(detail['quantity'] for detail in sparepart_details),
+    }
+
+
+def service_total_expressions() -> dict:
+    '''
+    Subquery expressions of service sparepart total (captured price times quantity), service action total,
+    and service sparepart quantity to annotate Service queryset
+
+    Return dict of {field name: expression}
+    '''
+    return {
+        'sparepart_total': detail_sum_expression(Service_sparepart, 'service_id',
+                                                 Sum(F('quantity') * F('individual_price'))),
+        'action_total': detail_sum_expression(Service_action, 'service_id', Sum('cost')),
+        'total_quantity': detail_sum_expression(Service_sparepart, 'service_id', Sum('quantity'),
+                                                output_field=IntegerField()),
+    }
+
+
+def sales_total_expressions() -> dict:
+    '''
+    Subquery expressions of sales total price and sales quantity to annotate Sales queryset
+
+    Return dict of {field name: expression}
+    '''
+    return {
+        'total_price': sales_total_expression(),
+        'total_quantity': detail_sum_expression(Sales_detail, 'sales_id', Sum('quantity'),
+                                                output_field=IntegerField()),
+    }
+
+
+def capture_missing_price() -> int:
+    '''
+    A function to write current sparepart price into sales detail and service sparepart that price isn't
+    captured yet (written directly to database instead of through serializer), detail of deleted sparepart
+    is left empty
+
+    Return number of updated detail
+    '''
+    sparepart = Sparepart.objects.filter(sparepart_id=OuterRef('sparepart_id'))
+    count = Sales_detail.objects.filter(individual_price__isnull=True).update(individual_price=Case(
+        When(
+            Exists(Sales.objects.filter(sales_id=OuterRef('sales_id'), customer_id__is_workshop=True)),
+            then=Subquery(sparepart.values('workshop_price')[:1])
+        ),
+        default=Subquery(sparepart.values('price')[:1]),
+        output_field=MONEY_FIELD
+    ))
+    count += Service_sparepart.objects.filter(individual_price__isnull=True).update(
+        individual_price=Subquery(sparepart.values('install_price')[:1])
+    )
+
+    return count
+
+
+def rebuild_transaction_total() -> int:
+    '''
+    A function to capture missing detail price, then recalculate stored total of every sales and service
+    from their detail, each in single update
+
+    Return number of updated sales and service
+    '''
+    capture_missing_price()
+
+    return Sales.objects.update(**sales_total_expressions()) + Service.objects.update(**service_total_expressions())
+
+
+def verify_transaction_total() -> list:
+    '''
+    Function to compare stored total of sales and service against their detail, and find detail that price
+    isn't captured
+
+    Return list of message for every detail without price and every transaction that stored total is different
+    '''
+    mismatches = []
+    for detail_model, reference in ((Sales_detail, 'sales_id'), (Service_sparepart, 'service_id')):
+        for detail_id, transaction_id in detail_model.objects.filter(
+            individual_price__isnull=True,
+            sparepart_id__isnull=False
+        ).order_by('pk').values_list('pk', reference):
+            mismatches.append(f'{detail_model.__name__} {detail_id} of {transaction_id}: price is not captured')
+
+    for model, expressions in ((Sales, sales_total_expressions()), (Service, service_total_expressions())):
+        fields = list(expressions)
+        transactions = model.objects.annotate(
+            **{f'expected_{field}': expression for field, expression in expressions.items()}
+        ).exclude(
+            **{field: F(f'expected_{field}') for field in fields}
+        ).order_by('pk')
+        for instance in transactions:
+            mismatches.append(
+                f'{model.__name__} {instance.pk}: '
+                f'stored={tuple(getattr(instance, field) for field in fields)} '
+                f'expected={tuple(getattr(instance, f"expected_{field}") for field in fields)}'
+            )
+
+    return mismatches
+
+
+def sales_final_total_expression() -> any:
+    '''
+    Expression of sales total after discount from stored total, to annotate Sales queryset
+    '''
+    return F('total_price') - F('discount')
+
+
+def service_final_total_expression() -> any:
+    '''
+    Expression of service total after discount from stored total, to annotate Service queryset
+    '''
+    return F('sparepart_total') + F('action_total') - F('discount')
+
+
+def sparepart_quantity_expression(quantity_field: str, start_date: date, end_date: date) -> Coalesce:
+    '''
+    Subquery expression of total quantity_field (quantity_sold or quantity_used) of sparepart in daily
+    sparepart summary between start_date and end_date (inclusive), to annotate Sparepart queryset
+    '''
+    quantity = Daily_sparepart_summary.objects.filter(
+        sparepart_id=OuterRef('sparepart_id'),
+        date__gte=start_date,
+        date__lte=end_date
+    ).values('sparepart_id').annotate(total=Sum(quantity_field)).values('total')
+
+    return Coalesce(Subquery(quantity), Value(0))
+
+
+def customer_balance_expressions(year: int = None) -> dict:
+    '''
+    Expressions of customer service count, total payment (service total after discount plus sales total),
+    and remaining payment (total payment minus deposit, not below zero) of sales and service created in
+    the year, to annotate Customer queryset. Every value is a correlated subquery grouped by the database,
+    so listing any number of customer is a single query.
+
+    Return dict of {field name: expression}
+    '''
+    year = year or timezone.localdate().year
+    start, end = get_month_range(year=year, month=1)[0], get_month_range(year=year, month=12)[1]
+
+    def customer_sum(queryset: any, total: any, output_field: any = MONEY_FIELD) -> Coalesce:
+        total = queryset.filter(
+            customer_id=OuterRef('customer_id'),
+            created_at__gte=start,
+            created_at__lt=end,
+        ).values('customer_id').annotate(total=total).values('total')
+
+        return Coalesce(Subquery(total), Value(0), output_field=output_field)
+
+    # Total is read from stored total of sales and service, so their detail isn't joined
+    service_count = customer_sum(Service.objects, Count('service_id'), output_field=IntegerField())
+    service_total = customer_sum(Service.objects, Sum(service_final_total_expression()))
+    service_deposit = customer_sum(Service.objects, Sum('deposit'))
+    sales_total = customer_sum(Sales.objects, Sum('total_price'))
+    sales_deposit = customer_sum(Sales.objects, Sum('deposit'))
+
+    total_payment = service_total + sales_total
+
+    return {
+        'number_of_service': service_count,
+        'total_payment': total_payment,
+        'remaining_payment': Greatest(total_payment - service_deposit - sales_deposit, Value(0),
+                                      output_field=MONEY_FIELD),
+    }
+
+
+def get_sparepart_ranking(
+                        quantity_field: str,
+                        field_name: str,
+                        year: int = None,
+                        month: int = None,
+                        limit: int = 10
+                    ) -> any:
+    '''
+    Function to get top sparepart ranked by quantity_field of daily sparepart summary (quantity_sold or
+    quantity_used) within particular month.
+
+    Total quantity is annotated as field_name, ordered and limited by database
+    '''
+    year = year or date.today().year
+    month = month or date.today().month
+    start_date = date(year, month, 1)
+    end_date = date(year, month, monthrange(year=year, month=month)[1])
+
+    return Sparepart.objects.select_related('brand_id').annotate(
+        **{field_name: sparepart_quantity_expression(
+            quantity_field=quantity_field, start_date=start_date, end_date=end_date
+        )}
+    ).order_by(f'-{field_name}', 'sparepart_id')[:limit]
+
+
+def get_period_summary(
+                    queryset: any,
+                    total: any,
+                    discount: any,
+                    group: str = 'day',
+                    start: datetime = None,
+                    end: datetime = None,
+                ) -> dict:
+    '''
+    Function to aggregate transaction queryset per day, week, or month (Asia/Jakarta) in single query,
+    when start and end is given only transaction created between them is aggregated.
+
+    Return dict of {first date of period: {transaction, payment, discount, count}} only for period
+    that have transaction
+    '''
+    if start is not None:
+        queryset = queryset.filter(created_at__gte=start)
+    if end is not None:
+        queryset = queryset.filter(created_at__lt=end)
+
+    period_rows = queryset.annotate(
+        period=Trunc('created_at', group, output_field=DateField(), tzinfo=timezone.get_current_timezone())
+    ).values('period').annotate(
+        transaction=Sum(total),
+        payment=Sum('deposit'),
+        discount=Sum(discount),
+        count=Count('pk')
+    ).order_by('period')
+
+    return {
+        row['period']: {
+            'transaction': int(row['transaction'] or 0),
+            'payment': int(row['payment'] or 0),
+            'discount': int(row['discount'] or 0),
+            'count': row['count'],
+        } for row in period_rows
+    }
+
+
+def get_daily_summary(
+                    queryset: any,
+                    total: any,
+                    discount: any,
+                    start: datetime = None,
+                    end: datetime = None,
                 ) -> dict:
     '''
+    Function to aggregate transaction queryset per day (Asia/Jakarta) in single query,
+    when start and end is given only transaction created between them is aggregated.
+
+    Return dict of {date: {transaction, payment, discount, count}} only for date that have transaction
+    '''
+    return get_period_summary(queryset=queryset, total=total, discount=discount, group='day', start=start, end=end)
+
+
+def get_stored_summary(transaction_type: str, start_date: date, end_date: date, group: str = 'day') -> dict:
+    '''
+    Function to get stored daily summary of transaction_type (Daily_summary.Types) between start_date and
+    end_date (inclusive) summed per day, week, or month in single query, reading at most one row per day
+    instead of every transaction.
+
+    Return dict of {first date of period: {transaction, payment, count}} only for period that have transaction
+    '''
+    period_rows = Daily_summary.objects.filter(
+        transaction_type=transaction_type,
+        date__gte=start_date,
+        date__lte=end_date
+    ).annotate(
+        period=Trunc('date', group, output_field=DateField())
+    ).values('period').annotate(
+        transaction=Sum('transaction_total'),
+        payment=Sum('deposit_total'),
+        count=Sum('transaction_count')
+    ).order_by('period')
+
+    return {
+        row['period']: {
+            'transaction': int(row['transaction'] or 0),
+            'payment': int(row['payment'] or 0),
+            'count': row['count'],
+        } for row in period_rows
+    }
+
+
+def get_sparepart_daily_quantity(start: datetime = None, end: datetime = None, spareparts: list = None) -> dict:
+    '''
+    Function to aggregate sparepart quantity sold (sales detail) and used (service sparepart) per day
+    and per sparepart, when start and end is given only detail created between them is aggregated,
+    when spareparts (list of sparepart id) is given only those sparepart is aggregated.
+
+    Return dict of {(date, sparepart_id): {quantity_sold, quantity_used}}
+    '''
+    daily_quantity = {}
+    for detail_model, field_name in ((Sales_detail, 'quantity_sold'), (Service_sparepart, 'quantity_used')):
+        queryset = detail_model.objects.filter(sparepart_id__isnull=False)
+        if start is not None:
+            queryset = queryset.filter(created_at__gte=start)
+        if end is not None:
+            queryset = queryset.filter(created_at__lt=end)
+        if spareparts is not None:
+            queryset = queryset.filter(sparepart_id__in=spareparts)
+
+        daily_rows = queryset.annotate(
+            day=TruncDate('created_at', tzinfo=timezone.get_current_timezone())
+        ).values('day', 'sparepart_id').annotate(quantity=Sum('quantity')).order_by()
+
+        for row in daily_rows:
+            quantity = daily_quantity.setdefault(
+                (row['day'], row['sparepart_id']),
+                {'quantity_sold': 0, 'quantity_used': 0}
+            )
+            quantity[field_name] = row['quantity']
+
+    return daily_quantity
+
+
+def get_summary_source(transaction_type: str) -> tuple:
+    '''
+    Function to get transaction queryset, its transaction total expression (after discount) from stored
+    transaction total, and its discount expression based on Daily_summary transaction type
+    '''
+    if transaction_type == Daily_summary.Types.SALES:
+        return Sales.objects.all(), sales_final_total_expression(), F('discount')
+    elif transaction_type == Daily_summary.Types.RESTOCK:
+        return Restock.objects.all(), F('total_cost'), Value(0, output_field=MONEY_FIELD)
+    return Service.objects.all(), service_final_total_expression(), F('discount')
+
+
+def get_summary_days(instance: any, details: list = []) -> set:
+    '''
+    Function to get set of date (Asia/Jakarta) affected by a transaction instance and its details,
+    used to know which daily summary need to be refreshed
+    '''
+    days = {timezone.localtime(instance.created_at).date()}
+    for detail in details:
+        days.add(timezone.localtime(detail.created_at).date())
+
+    return days
+
+
+def refresh_daily_summary(transaction_type: str, days: set, spareparts: list = None) -> None:
+    '''
+    A function to recalculate daily summary of transaction_type on each of given days
+    from transaction data. Sales and service also recalculate daily sparepart summary of the given
+    spareparts (id of sparepart used by the transaction) on those days.
+
+    Daily summary row of each day is locked before it is recalculated, so concurrent transaction of the
+    same day wait and recalculate with this transaction data instead of overwriting it. Sparepart rows are
+    already locked by the transaction, so daily sparepart summary is only written as upsert.
+
+    Cached report of the months of those days is invalidated as well after the transaction is committed,
+    so report computed before the commit is never cached again after it.
+    '''
+    spareparts = spareparts or []
+    transaction.on_commit(lambda: invalidate_report_cache(transaction_type=transaction_type, days=days))
+
+    for day in sorted(days):
+        start, end = get_day_range(day=day)
+
+        # Lock the summary row of the day, created first when the day doesn't have summary yet
+        Daily_summary.objects.get_or_create(date=day, transaction_type=transaction_type)
+        lock_rows(Daily_summary.objects.filter(date=day, transaction_type=transaction_type))
+
+        # Recalculating transaction total, deposit, and count of the day
+        queryset, total, discount = get_summary_source(transaction_type=transaction_type)
+        summary = get_daily_summary(queryset=queryset, total=total, discount=discount, start=start, end=end).get(day)
+        if summary is None:
+            Daily_summary.objects.filter(date=day, transaction_type=transaction_type).delete()
+        else:
+            Daily_summary.objects.filter(date=day, transaction_type=transaction_type).update(
+                transaction_total=summary['transaction'],
+                deposit_total=summary['payment'],
+                discount_total=summary['discount'],
+                transaction_count=summary['count'],
+            )
+
+        # Restock doesn't change sparepart sold or used quantity
+        if transaction_type == Daily_summary.Types.RESTOCK or not spareparts:
+            continue
+
+        # Recalculating sold and used quantity of the day only for sparepart used by the transaction
+        daily_quantity = get_sparepart_daily_quantity(start=start, end=end, spareparts=spareparts)
+        Daily_sparepart_summary.objects.filter(date=day, sparepart_id__in=spareparts).exclude(
+            sparepart_id__in=[sparepart_id for _, sparepart_id in daily_quantity]
+        ).delete()
+        Daily_sparepart_summary.objects.bulk_create(
+            [
+                Daily_sparepart_summary(date=date_key, sparepart_id_id=sparepart_id, **quantity)
+                for (date_key, sparepart_id), quantity in daily_quantity.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['date', 'sparepart_id'],
+            update_fields=['quantity_sold', 'quantity_used'],
+        )
+
+
+def rebuild_daily_summary() -> None:
+    '''
+    A function to rebuild every daily summary and daily sparepart summary from whole transaction history,
+    cached report of every month that has summary before or after the rebuild is deleted after commit
+    '''
+    days = set(Daily_summary.objects.values_list('date', flat=True).distinct())
+    Daily_summary.objects.all().delete()
+    for transaction_type in Daily_summary.Types.values:
+        queryset, total, discount = get_summary_source(transaction_type=transaction_type)
+        Daily_summary.objects.bulk_create([
+            Daily_summary(
+                date=day,
+                transaction_type=transaction_type,
+                transaction_total=summary['transaction'],
+                deposit_total=summary['payment'],
+                discount_total=summary['discount'],
+                transaction_count=summary['count'],
+            ) for day, summary in get_daily_summary(queryset=queryset, total=total, discount=discount).items()
+        ], batch_size=1000)
+
+    Daily_sparepart_summary.objects.all().delete()
+    Daily_sparepart_summary.objects.bulk_create([
+        Daily_sparepart_summary(date=day, sparepart_id_id=sparepart_id, **quantity)
+        for (day, sparepart_id), quantity in get_sparepart_daily_quantity().items()
+    ], batch_size=1000)
+
+    days |= set(Daily_summary.objects.values_list('date', flat=True).distinct())
+    for transaction_type in Daily_summary.Types.values:
+        transaction.on_commit(
+            lambda transaction_type=transaction_type: invalidate_report_cache(transaction_type=transaction_type,
+                                                                              days=days)
+        )
+
+
+def verify_daily_summary() -> list:
+    '''
+    Function to compare stored daily summary and daily sparepart summary against transaction data.
+
+    Return list of message for every date that stored summary is different from transaction data
+    '''
+    mismatches = []
+    for transaction_type in Daily_summary.Types.values:
+        queryset, total, discount = get_summary_source(transaction_type=transaction_type)
+        expected = get_daily_summary(queryset=queryset, total=total, discount=discount)
+        stored = {
+            summary.date: {
+                'transaction': int(summary.transaction_total),
+                'payment': int(summary.deposit_total),
+                'discount': int(summary.discount_total),
+                'count': summary.transaction_count,
+            } for summary in Daily_summary.objects.filter(transaction_type=transaction_type)
+        }
+        for day in sorted(expected.keys() | stored.keys()):
+            if expected.get(day) != stored.get(day):
+                mismatches.append(
+                    f'{Daily_summary.Types(transaction_type).label} {day}: '
+                    f'stored={stored.get(day)} expected={expected.get(day)}'
+                )
+
+    expected = get_sparepart_daily_quantity()
+    stored = {
+        (summary.date, summary.sparepart_id_id): {
+            'quantity_sold': summary.quantity_sold,
+            'quantity_used': summary.quantity_used,
+        } for summary in Daily_sparepart_summary.objects.all()
+    }
+    for key in sorted(expected.keys() | stored.keys()):
+        if expected.get(key) != stored.get(key):
+            mismatches.append(
+                f'Sparepart {key[1]} {key[0]}: stored={stored.get(key)} expected={expected.get(key)}'
+            )
+
+    return mismatches
+
+
+def get_dashboard_summary(day: date = None) -> dict:
+    '''
+    Function to get sales revenue (before discount), service revenue, and restock expenditure with their count
+    for particular day from stored daily summary, at most one row of each transaction type is read.
+
+    Return dict in format of {sales: {total, count}, service: {total, count}, restock: {total, count}}
+    '''
+    day = day or date.today()
+
+    summary = {
+        'sales': {'total': 0, 'count': 0},
+        'service': {'total': 0, 'count': 0},
+        'restock': {'total': 0, 'count': 0},
+    }
+    labels = {
+        Daily_summary.Types.SALES: 'sales',
+        Daily_summary.Types.SERVICE: 'service',
+        Daily_summary.Types.RESTOCK: 'restock',
+    }
+    for daily_summary in Daily_summary.objects.filter(date=day):
+        total = daily_summary.transaction_total
+        # Sales revenue in dashboard is counted before discount, the same as price of every sold sparepart
+        if daily_summary.transaction_type == Daily_summary.Types.SALES:
+            total += daily_summary.discount_total
+        summary[labels[daily_summary.transaction_type]] = {
+            'total': int(total),
+            'count': daily_summary.transaction_count
+        }
+
+    return summary
+
+
+def get_sales_report(year: int = None, month: int = None) -> dict:
+    '''
     Function to get sales report information per day as dict (date, sales_transaction, sales_revenue, sales_count),
     total sales a month, total revenue a month.
 
     Then return a dict as result in format of {sales_report, sales_transaction_month, sales_revenue_month}
     '''
-    # Getting number of day form current month
-    number_of_day = monthrange(year=year, month=month)[1]
+    year = year or date.today().year
+    month = month or date.today().month
+
+    # Getting sales transaction (after discount), revenue, and count per day from stored daily summary
+    daily_summary = get_stored_summary(
+        transaction_type=Daily_summary.Types.SALES,
+        start_date=date(year, month, 1),
+        end_date=date(year, month, monthrange(year=year, month=month)[1])
+    )
 
-    # Getting total revenue per day in particular a month
+    # Make sales report information in particular month, day without transaction is filled with 0
     sales_report = []
-
-    # Getting sales revenue, transaction, and count for a month
-    sales_transaction_month = 0
-    sales_revenue_month = 0
-
-    data_list = data_list
-
-    # Make sales report information in particular month
-    for i, object in enumerate(range(number_of_day), 1):
-        # Getting sales revenue, transaction, and count for a day
-        sales_transaction = 0
-        sales_revenue = 0
-        sales_count = 0
-
-        for sales in data_list:
-            if sales['created_at'] == date(year, month, i).strftime('%d-%m-%Y'):
-                sales_transaction_month += sales['total_price_sales']
-                sales_revenue_month += int(sales['deposit'])
-                sales_transaction += sales['total_price_sales']
-                sales_revenue += int(sales['deposit'])
-                sales_count += 1
+    for day in range(1, monthrange(year=year, month=month)[1] + 1):
+        summary = daily_summary.get(date(year, month, day), {'transaction': 0, 'payment': 0, 'count': 0})
         sales_report.append({
-            'date': date(year, month, i),
-            'sales_transaction': sales_transaction,
-            'sales_revenue': sales_revenue,
-            'sales_count': sales_count
+            'date': date(year, month, day),
+            'sales_transaction': summary['transaction'],
+            'sales_revenue': summary['payment'],
+            'sales_count': summary['count']
         })
 
     return {
                 'sales_report': sales_report,
-                'sales_transaction_month': sales_transaction_month,
-                'sales_revenue_month': sales_revenue_month
+                'sales_transaction_month': sum(row['sales_transaction'] for row in sales_report),
+                'sales_revenue_month': sum(row['sales_revenue'] for row in sales_report)
             }
 
 
-def get_restock_report(
-                    data_list: list,
-                    year: int = date.today().year,
-                    month: int = date.today().month,
-                ) -> dict:
+def get_restock_report(year: int = None, month: int = None) -> dict:
     '''
     Function to get restock report information per day as dict (date, restock_transaction, restock_cost),
     total restock a month, total revenue a month.
 
     Then return a dict as result in format of {restock_report, restock_transaction_month, restock_cost_month}
     '''
-    # Getting number of day form current month
-    number_of_day = monthrange(year=year, month=month)[1]
+    year = year or date.today().year
+    month = month or date.today().month
+
+    # Getting restock transaction and cost per day from stored daily summary
+    daily_summary = get_stored_summary(
+        transaction_type=Daily_summary.Types.RESTOCK,
+        start_date=date(year, month, 1),
+        end_date=date(year, month, monthrange(year=year, month=month)[1])
+    )
 
-    # Getting restock report information per day in particular a month
+    # Make restock report information in particular month, day without transaction is filled with 0
     restock_report = []
-
-    # Getting restock cost and transaction for a month
-    restock_transaction_month = 0
-    restock_cost_month = 0
-
-    data_list = data_list
-
-    # Make restock report information in particular month
-    for i, object in enumerate(range(number_of_day), 1):
-        # Getting restock cost and transaction for a day
-        restock_transaction = 0
-        restock_cost = 0
-
-        for restock in data_list:
-            if restock['created_at'] == date(year, month, i).strftime('%d-%m-%Y'):
-                restock_transaction_month += restock['total_restock_cost']
-                restock_cost_month += int(restock['deposit'])
-                restock_transaction += restock['total_restock_cost']
-                restock_cost += int(restock['deposit'])
+    for day in range(1, monthrange(year=year, month=month)[1] + 1):
+        summary = daily_summary.get(date(year, month, day), {'transaction': 0, 'payment': 0})
         restock_report.append({
-            'date': date(year, month, i),
-            'restock_transaction': restock_transaction,
-            'restock_cost': restock_cost,
+            'date': date(year, month, day),
+            'restock_transaction': summary['transaction'],
+            'restock_cost': summary['payment'],
         })
 
     return {
                 'restock_report': restock_report,
-                'restock_transaction_month': restock_transaction_month,
-                'restock_cost_month': restock_cost_month
+                'restock_transaction_month': sum(row['restock_transaction'] for row in restock_report),
+                'restock_cost_month': sum(row['restock_cost'] for row in restock_report)
             }
 
 
-def get_service_report(
-                    data_list: list,
-                    year: int = date.today().year,
-                    month: int = date.today().month,
-                ) -> dict:
+def get_service_report(year: int = None, month: int = None) -> dict:
     '''
     Function to get service report information per day as dict (date, service_transaction, service_revenue),
     total service a month, total revenue a month.
 
     Then return a dict as result in format of {service_report, service_transaction_month, service_revenue_month}
     '''
-    # Getting number of day form current month
-    number_of_day = monthrange(year=year, month=month)[1]
+    year = year or date.today().year
+    month = month or date.today().month
+
+    # Getting service transaction (after discount) and revenue per day from stored daily summary
+    daily_summary = get_stored_summary(
+        transaction_type=Daily_summary.Types.SERVICE,
+        start_date=date(year, month, 1),
+        end_date=date(year, month, monthrange(year=year, month=month)[1])
+    )
 
-    # Getting service report information per day in particular a month
+    # Make service report information in particular month, day without transaction is filled with 0
     service_report = []
+    for day in range(1, monthrange(year=year, month=month)[1] + 1):
+        summary = daily_summary.get(date(year, month, day), {'transaction': 0, 'payment': 0})
+        service_report.append({
+            'date': date(year, month, day),
+            'service_transaction': summary['transaction'],
+            'service_revenue': summary['payment'],
+        })
+
+    return {
+                'service_report': service_report,
+                'service_transaction_month': sum(row['service_transaction'] for row in service_report),
+                'service_revenue_month': sum(row['service_revenue'] for row in service_report)
+            }
+
 
-    # Getting service revenue and transaction for a month
-    service_transaction_month = 0
-    service_revenue_month = 0
+def get_period_list(start_date: date, end_date: date, group: str = 'day') -> list:
+    '''
+    Function to get list of first date of every day, week (monday), or month between start_date and end_date
+    '''
+    if group == 'month':
+        period = start_date.replace(day=1)
+    elif group == 'week':
+        period = start_date - timedelta(days=start_date.weekday())
+    else:
+        period = start_date
+
+    period_list = []
+    while period <= end_date:
+        period_list.append(period)
+        if group == 'month':
+            period = (period + timedelta(days=31)).replace(day=1)
+        elif group == 'week':
+            period += timedelta(days=7)
+        else:
+            period += timedelta(days=1)
 
-    data_list = data_list
+    return period_list
 
-    # Make service report information in particular month
-    for i, object in enumerate(range(number_of_day), 1):
-        # Getting service revenue and transaction for a day
-        service_transaction = 0
-        service_revenue = 0
 
-        for service in data_list:
-            if service['created_at'] == date(year, month, i).strftime('%d-%m-%Y'):
-                service_transaction_month += service['total_service_price']
-                service_revenue_month += int(service['deposit'])
-                service_transaction += service['total_service_price']
-                service_revenue += int(service['deposit'])
-        service_report.append({
-            'date': date(year, month, i),
-            'service_transaction': service_transaction,
-            'service_revenue': service_revenue,
-        })
+def get_range_report(transaction_type: str, start_date: date, end_date: date, group: str = 'day') -> dict:
+    '''
+    Function to get report of transaction_type (Daily_summary.Types) between start_date and end_date
+    grouped per day, week, or month in single query, period without transaction is filled with 0.
+
+    Then return a dict as result in format of {report, transaction_total, payment_total, count_total}
+    '''
+    # Getting transaction (after discount), payment, and count per period from stored daily summary
+    period_summary = get_stored_summary(
+        transaction_type=transaction_type,
+        start_date=start_date,
+        end_date=end_date,
+        group=group
+    )
+
+    report = []
+    for period in get_period_list(start_date=start_date, end_date=end_date, group=group):
+        summary = period_summary.get(period, {'transaction': 0, 'payment': 0, 'count': 0})
+        report.append({'period': period, **summary})
 
     return {
-                'service_report': service_report,
-                'service_transaction_month': service_transaction_month,
-                'service_revenue_month': service_revenue_month
+                'report': report,
+                'transaction_total': sum(row['transaction'] for row in report),
+                'payment_total': sum(row['payment'] for row in report),
+                'count_total': sum(row['count'] for row in report),
             }
 
 
+# report function of each transaction type (Daily_summary.Types)
+REPORT_FUNCTIONS = {
+    Daily_summary.Types.SALES: get_sales_report,
+    Daily_summary.Types.RESTOCK: get_restock_report,
+    Daily_summary.Types.SERVICE: get_service_report,
+}
+
+# report title of each transaction type (Daily_summary.Types), used in pdf title and filename
+REPORT_TITLES = {
+    Daily_summary.Types.SALES: 'Penjualan',
+    Daily_summary.Types.RESTOCK: 'Pengadaan',
+    Daily_summary.Types.SERVICE: 'Servis',
+}
+
+
+def get_report(transaction_type: str, year: int, month: int) -> dict:
+    '''
+    Function to get report dict of transaction_type (Daily_summary.Types) in a month,
+    report of closed month is taken from cache when it is already computed before
+    '''
+    return get_cached_report(
+        transaction_type=transaction_type,
+        year=year,
+        month=month,
+        compute=lambda: REPORT_FUNCTIONS[transaction_type](year=year, month=month)
+    )
+
+
+def get_report_pdf(transaction_type: str, report_type: str, year: int, month: int) -> bytes:
+    '''
+    Function to get rendered report pdf bytes of transaction_type (Daily_summary.Types) in a month,
+    report pdf of closed month is taken from cache when it is already rendered before
+    '''
+    return get_cached_report_pdf(
+        transaction_type=transaction_type,
+        year=year,
+        month=month,
+        render=lambda: render_report_pdf(
+            data=get_report(transaction_type=transaction_type, year=year, month=month),
+            report_type=report_type,
+            year=year,
+            month=month
+        )
+    )
+
+
 def format_money(number: int) -> str:
     # formating number to include . after three number
     locale.setlocale(locale.LC_ALL, 'id_ID.utf8')
@@ -370,41 +1325,40 @@ def format_money(number: int) -> str:
     return money
 
 
-def generate_report_pdf(
+def render_report_pdf(
                     data: dict,
                     report_type: str,
-                    year: int = date.today().year,
-                    month: int = date.today().month
-                ):
+                    year: int,
+                    month: int
+                ) -> bytes:
     '''
-    A function to generate pdf file using user input data.
+    A function to render report pdf file using report data, then return the pdf file as bytes.
 
     This function takes few arguments:
-    - data (required) as main ingredients to create pdf content;
-    - report_type (required) to create filename, title, and few operation in creating pdf file;
-    - year (additional) to create filename and subtitle, when not given use current year;
-    - month (additional) to create filename and subtitle, when not given use current month.
+    - data (required) as main ingredients to create pdf content, it is not modified so cached report can be used;
+    - report_type (required) to create title and few operation in creating pdf file;
+    - year (required) to create subtitle;
+    - month (required) to create subtitle.
     '''
-    # Setting up data and non_table_data as blank dict
-    data = data
+    # Setting up non_table_data as blank dict
     non_table_data = {}
 
     # Checking report_type value, then assinging non table data and data based on report_type
     if report_type == 'Penjualan':
-        non_table_data['transaction_month'] = data.pop('sales_transaction_month')
-        non_table_data['revenue_month'] = data.pop('sales_revenue_month')
+        non_table_data['transaction_month'] = data['sales_transaction_month']
+        non_table_data['revenue_month'] = data['sales_revenue_month']
         data = data['sales_report']
         column_2 = 'sales_transaction'
         column_3 = 'sales_revenue'
     elif report_type == 'Pengadaan':
-        non_table_data['transaction_month'] = data.pop('restock_transaction_month')
-        non_table_data['cost_month'] = data.pop('restock_cost_month')
+        non_table_data['transaction_month'] = data['restock_transaction_month']
+        non_table_data['cost_month'] = data['restock_cost_month']
         data = data['restock_report']
         column_2 = 'restock_transaction'
         column_3 = 'restock_cost'
     elif report_type == 'Servis' or report_type == 'Service':
-        non_table_data['transaction_month'] = data.pop('service_transaction_month')
-        non_table_data['revenue_month'] = data.pop('service_revenue_month')
+        non_table_data['transaction_month'] = data['service_transaction_month']
+        non_table_data['revenue_month'] = data['service_revenue_month']
         data = data['service_report']
         column_2 = 'service_transaction'
         column_3 = 'service_revenue'
@@ -523,31 +1477,75 @@ def generate_report_pdf(
     # Add the table to the PDF document
     doc.build([title, sub_title, space, table])
 
-    buffer.seek(0)
+    return buffer.getvalue()
+
+
+def report_pdf_response(pdf: bytes, report_type: str, year: int, month: int) -> FileResponse:
+    '''
+    A function to send rendered report pdf bytes to user as downloaded file
+    '''
+    return FileResponse(BytesIO(pdf), as_attachment=True, filename=f'Laporan_{report_type}-{year}-{month}.pdf')
+
+
+def generate_report_pdf(
+                    data: dict,
+                    report_type: str,
+                    year: int = None,
+                    month: int = None
+                ) -> FileResponse:
+    '''
+    A function to generate pdf file using user input data.
+
+    This function takes few arguments:
+    - data (required) as main ingredients to create pdf content;
+    - report_type (required) to create filename, title, and few operation in creating pdf file;
+    - year (additional) to create filename and subtitle, when not given use current year;
+    - month (additional) to create filename and subtitle, when not given use current month.
+    '''
+    year = year or date.today().year
+    month = month or date.today().month
+
+    pdf = render_report_pdf(data=data, report_type=report_type, year=year, month=month)
 
     # Send builded pdf file to user
-    response = FileResponse(buffer, as_attachment=True, filename=f'Laporan_{report_type}-{year}-{month}.pdf')
+    return report_pdf_response(pdf=pdf, report_type=report_type, year=year, month=month)
 
-    return response
 
+def get_receipt_last_modified(queryset: any, detail_name: str, **lookup) -> datetime:
+    '''
+    Function to get last modified time of a transaction receipt in single indexed lookup,
+    it is the latest of transaction updated_at, updated_at of its customer, and updated_at of sparepart
+    in its detail since receipt show customer and sparepart data.
 
-def generate_receipt(
+    Return None when the transaction doesn't exist
+    '''
+    row = queryset.filter(**lookup).values('updated_at', 'customer_id__updated_at').annotate(
+        sparepart_updated_at=Max(f'{detail_name}__sparepart_id__updated_at')
+    ).order_by().first()
+
+    if row is None:
+        return None
+
+    return max(filter(None, (row['updated_at'], row['customer_id__updated_at'], row['sparepart_updated_at'])))
+
+
+def render_receipt(
                     data: dict,
                     transaction_type: str,
-                ):
+                ) -> bytes:
     '''
-    A function to generate transaction receipt to print using user input data.
+    A function to render transaction receipt to print using user input data, then return the pdf file as bytes.
 
     This function takes few arguments:
     - data (required) as main ingredients to create reciept content;
-    - transaction_type (required) to create filename, title, and few operation in creating reciept
+    - transaction_type (required) to create title and few operation in creating reciept
     '''
     # print(data)
     if transaction_type in ('Penjualan', 'Sales'):
         keyword = ('Sales', 'sales')
 
         # Retrieve transation_detail list from main transaction
-        content = data.pop('content', [])
+        content = data.get('content', [])
 
         # Retrieve items count to make dynamic paper lenght
         item_count = len(content) * 2
@@ -570,8 +1568,8 @@ def generate_receipt(
         keyword = ('Service', 'service')
 
         # Retrieve transation_detail list from main transaction
-        content_sparepart = data.pop('service_spareparts', [])
-        content_action = data.pop('service_actions', [])
+        content_sparepart = data.get('service_spareparts', [])
+        content_action = data.get('service_actions', [])
 
         action_count = len(content_action)
         sparepart_count = (len(content_sparepart) * 2)
@@ -705,13 +1703,114 @@ def generate_receipt(
 
     doc.build(receipt)
 
-    buffer.seek(0)
+    return buffer.getvalue()
+
+
+def receipt_pdf_response(pdf: bytes, transaction_type: str, transaction_id: int) -> FileResponse:
+    '''
+    A function to send rendered receipt pdf bytes to user to be printed
+    '''
+    keyword = 'Sales' if transaction_type in ('Penjualan', 'Sales') else 'Service'
+
+    return FileResponse(BytesIO(pdf), as_attachment=False, filename=f'{keyword}_Receipt_{transaction_id}.pdf')
+
+
+# process pool rendering receipt of large batch, started on first use and reused by every batch,
+# lock keep threads of the same process from starting their own pool
+receipt_pool = None
+receipt_pool_lock = threading.Lock()
 
-    # Send builded pdf file to user
-    response = FileResponse(
-        buffer,
-        as_attachment=False,
-        filename=f'{keyword[0]}_Receipt_{data[f"{keyword[1]}_id"]}.pdf'
-    )
 
-    return response
+def get_receipt_pool() -> ProcessPoolExecutor:
+    '''
+    Function to get process pool of RECEIPT_WORKERS worker used to render receipt batch, the pool is
+    started once per process since starting worker cost more than rendering a small batch
+    '''
+    global receipt_pool
+    with receipt_pool_lock:
+        if receipt_pool is None:
+            # Worker process need django to be set up before rendering, since utility import models
+            receipt_pool = ProcessPoolExecutor(max_workers=settings.RECEIPT_WORKERS, initializer=django.setup)
+
+        return receipt_pool
+
+
+def close_receipt_pool() -> None:
+    '''
+    Function to stop every worker of receipt pool, new pool is started on the next large batch
+    '''
+    global receipt_pool
+    with receipt_pool_lock:
+        pool, receipt_pool = receipt_pool, None
+
+    if pool is not None:
+        pool.shutdown()
+
+
+def drop_receipt_pool(pool: ProcessPoolExecutor) -> None:
+    '''
+    Function to stop broken receipt pool without waiting for its worker, new pool is started on the next
+    large batch. Pool that is already replaced by another thread is only stopped
+    '''
+    global receipt_pool
+    with receipt_pool_lock:
+        if receipt_pool is pool:
+            receipt_pool = None
+
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def render_receipt_batch(receipts: list) -> bytes:
+    '''
+    A function to render many transaction receipt into one pdf file, then return the pdf file as bytes.
+
+    receipts is list of (data, transaction_type) in the order they are printed, batch of at least
+    RECEIPT_POOL_THRESHOLD receipt is rendered in receipt worker pool, smaller batch is rendered in this process.
+    Then their pages are merged in the same order
+    '''
+    pdf_list = None
+    if len(receipts) >= settings.RECEIPT_POOL_THRESHOLD:
+        pool = get_receipt_pool()
+        try:
+            pdf_list = list(pool.map(
+                render_receipt,
+                [data for data, transaction_type in receipts],
+                [transaction_type for data, transaction_type in receipts],
+            ))
+        except BrokenProcessPool:
+            # Worker is killed (e.g. out of memory), the batch is rendered in this process instead
+            drop_receipt_pool(pool)
+
+    if pdf_list is None:
+        pdf_list = [render_receipt(data=data, transaction_type=transaction_type) for data, transaction_type in receipts]
+
+    # Merging every receipt page into single pdf file
+    writer = PdfWriter()
+    for pdf in pdf_list:
+        for page in PdfReader(BytesIO(pdf)).pages:
+            writer.add_page(page)
+
+    buffer = BytesIO()
+    writer.write(buffer)
+
+    return buffer.getvalue()
+
+
+def generate_receipt(
+                    data: dict,
+                    transaction_type: str,
+                ) -> FileResponse:
+    '''
+    A function to generate transaction receipt to print using user input data.
+
+    This function takes few arguments:
+    - data (required) as main ingredients to create reciept content;
+    - transaction_type (required) to create filename, title, and few operation in creating reciept
+    '''
+    keyword = 'sales' if transaction_type in ('Penjualan', 'Sales') else 'service'
+    transaction_id = data[f'{keyword}_id']
+
+    pdf = render_receipt(data=data, transaction_type=transaction_type)
+
+    # Send builded pdf file to user
+    return receipt_pdf_response(pdf=pdf, transaction_type=transaction_type, transaction_id=transaction_id)
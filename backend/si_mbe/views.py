@@ -1,24 +1,53 @@
-from calendar import monthrange
 from datetime import date, timedelta
+from io import BytesIO
 
 from dj_rest_auth.views import PasswordChangeView
 from django.contrib.auth.models import User
-from django.db.models import F, Q
-from django.http import Http404
+from django.db import transaction
+from django.db.models import F, Prefetch, Q
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, generics, status
 from rest_framework.response import Response
 from si_mbe import exceptions, serializers
+from si_mbe.caches import (get_cached_receipt, get_receipt_etag,
+                           get_report_cache_stats)
+from si_mbe.events import (EventStreamRenderer, get_last_stock_alert_id,
+                           parse_stock_alert_cursor, stream_stock_alert)
+from si_mbe.exports import (export_restock, export_sales, export_service,
+                            export_sparepart)
 from si_mbe.filters import SparepartFilter
-from si_mbe.models import (Brand, Category, Customer, Logs, Mechanic, Profile,
-                           Restock, Sales, Salesman, Service, Sparepart,
-                           Supplier)
+from si_mbe.imports import (UnsupportedFileError, import_spareparts,
+                            read_sparepart_file)
+from si_mbe.listings import (get_restock_rows, get_sales_rows,
+                             get_service_rows, restock_values, sales_values,
+                             service_values)
+from si_mbe.models import (Brand, Category, Customer, Daily_summary, Logs,
+                           Mechanic, Profile, Report_job, Restock,
+                           Restock_detail, Sales, Sales_detail, Salesman,
+                           Service, Service_sparepart, Sparepart,
+                           Stock_movement, Supplier)
 from si_mbe.paginations import CustomPagination
 from si_mbe.permissions import (IsAdminRole, IsLogin, IsOwnerRole,
                                 IsRelatedUserOrAdmin)
-from si_mbe.utility import (generate_receipt, generate_report_pdf,
-                            get_restock_report, get_sales_report,
-                            get_service_report, perform_log,
+from si_mbe.receipts import get_sales_receipt, get_service_receipt
+from si_mbe.renderers import FastJSONRenderer
+from si_mbe.reorder import get_reorder_suggestion
+from si_mbe.utility import (REPORT_TITLES, customer_balance_expressions,
+                            get_dashboard_summary, get_day_range,
+                            get_range_report, get_receipt_last_modified,
+                            get_report, get_report_pdf, get_sparepart_ranking,
+                            get_stock_at,
+                            get_summary_days, lock_rows, lock_spareparts,
+                            perform_log, receipt_pdf_response,
+                            record_stock_adjustment, record_stock_alert,
+                            refresh_daily_summary,
+                            render_receipt, render_receipt_batch,
+                            report_pdf_response,
                             restock_adjust_sparepart_quantity,
                             sales_adjust_sparepart_quantity,
                             service_adjust_sparepart_quantity)
@@ -50,7 +79,8 @@ class SearchSparepart(generics.ListAPIView):
 
 
 class AdminDashboard(generics.GenericAPIView):
-    queryset = Restock.objects.prefetch_related('restock_detail_set').filter(
+    # Remaining payment is stored in restock, so restock detail isn't needed for due list
+    queryset = Restock.objects.filter(
         Q(due_date__range=(date.today(), date.today() + timedelta(days=7))) &
         Q(is_paid_off=False)
         ).order_by('due_date')
@@ -58,6 +88,20 @@ class AdminDashboard(generics.GenericAPIView):
     serializer_class = serializers.RestockDueSerializers
 
     def get(self, request, *args, **kwargs):
+        # Getting url params of year, month and limit for sparepart ranking, if doesn't exist
+        # use current month and 10 sparepart, limit is capped so ranking stay a small response
+        year = request.query_params.get('year', str(date.today().year))
+        month = request.query_params.get('month', str(date.today().month))
+        limit = request.query_params.get('limit', '10')
+        if not year.isdigit() or not month.isdigit() or not limit.isdigit() or \
+                not 1 <= int(year) <= 9999 or not 1 <= int(month) <= 12 or not 0 < int(limit) <= 100:
+            return Response({'message': 'Data dashboard tidak sesuai / tidak lengkap'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        self.year = int(year)
+        self.month = int(month)
+        self.limit = int(limit)
+
         # Getting restock due data
         restock_due_queryset = self.filter_queryset(self.get_queryset())
         restock_due = self.get_serializer(restock_due_queryset, many=True)
@@ -70,29 +114,81 @@ class AdminDashboard(generics.GenericAPIView):
         sparepart_on_limit_queryset = self.filter_queryset(self.get_queryset())
         sparepart_on_limit = self.get_serializer(sparepart_on_limit_queryset, many=True)
 
-        # Getting 10 most sold sparepart in a month
-        self.queryset = Sparepart.objects.prefetch_related('sales_detail_set', 'service_sparepart_set')
-        self.serializer_class = serializers.SparepartMostSoldSerializers
-        most_sold_queryset = self.filter_queryset(self.get_queryset())
-        most_sold = self.get_serializer(most_sold_queryset, many=True)
-        most_sold = sorted(most_sold.data, key=lambda k: k['total_sold'], reverse=True)
+        # Getting most sold sparepart in a month, ranked and limited by database
+        most_sold_queryset = get_sparepart_ranking(
+            quantity_field='quantity_sold',
+            field_name='total_sold',
+            year=self.year,
+            month=self.month,
+            limit=self.limit
+        )
+        most_sold = serializers.SparepartMostSoldSerializers(most_sold_queryset, many=True)
 
-        # Getting 10 most used sparepart from services in a month
-        self.serializer_class = serializers.SparepartMostUsedSerializers
-        most_used_queryset = self.filter_queryset(self.get_queryset())
-        most_used = self.get_serializer(most_used_queryset, many=True)
-        most_used = sorted(most_used.data, key=lambda k: k['total_used'], reverse=True)
+        # Getting most used sparepart from services in a month, ranked and limited by database
+        most_used_queryset = get_sparepart_ranking(
+            quantity_field='quantity_used',
+            field_name='total_used',
+            year=self.year,
+            month=self.month,
+            limit=self.limit
+        )
+        most_used = serializers.SparepartMostUsedSerializers(most_used_queryset, many=True)
 
         return Response({
             'sparepart_on_limit': sparepart_on_limit.data,
             'restock_due': restock_due.data,
-            'most_sold': most_sold[:10],
-            'most_used': most_used[:10]
+            'most_sold': most_sold.data,
+            'most_used': most_used.data
             },
             status=status.HTTP_200_OK
         )
 
 
+class StockAlertStream(generics.GenericAPIView):
+    permission_classes = [IsLogin, IsAdminRole]
+    renderer_classes = [FastJSONRenderer, EventStreamRenderer]
+
+    def get(self, request, *args, **kwargs):
+        # Getting cursor of last received alert from reconnecting EventSource or url params of last_id,
+        # if doesn't exist only stream alert that is created after connecting
+        cursor = request.headers.get('Last-Event-ID', request.query_params.get('last_id'))
+        if cursor is None:
+            last_id, received = get_last_stock_alert_id(), set()
+        elif parse_stock_alert_cursor(str(cursor)) is None:
+            return Response({'message': 'Id alert stok tidak sesuai'}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            last_id, received = parse_stock_alert_cursor(str(cursor))
+
+        response = StreamingHttpResponse(
+            stream_stock_alert(last_id=last_id, received=received),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+
+        return response
+
+
+class ReorderSuggestion(generics.GenericAPIView):
+    permission_classes = [IsLogin, IsAdminRole]
+
+    def get(self, request, *args, **kwargs):
+        # Getting url params of days of sales and service history and days of stock to cover,
+        # if doesn't exist use last 90 days to cover 30 days
+        days = request.query_params.get('days', '90')
+        cover = request.query_params.get('cover', '30')
+        if not days.isdigit() or not cover.isdigit() or not 0 < int(days) <= 730 or int(cover) > 365:
+            return Response({'message': 'Data saran restock tidak sesuai / tidak lengkap'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # Getting reorder quantity of every sparepart computed at once, grouped per salesman
+        return Response({
+            'days': int(days),
+            'cover': int(cover),
+            'suggestion': get_reorder_suggestion(days=int(days), cover=int(cover)),
+        })
+
+
 class SparepartDataList(generics.ListAPIView):
     queryset = Sparepart.objects.all().order_by('sparepart_id')
     serializer_class = serializers.SparepartListSerializers
@@ -111,6 +207,14 @@ class SparepartDataList(generics.ListAPIView):
         return super().get_paginated_response(data)
 
 
+class SparepartExport(generics.GenericAPIView):
+    permission_classes = [IsLogin, IsAdminRole]
+
+    def get(self, request, *args, **kwargs):
+        # Streaming whole sparepart catalogue as csv instead of paginated json
+        return export_sparepart()
+
+
 class SparepartDataAdd(generics.CreateAPIView):
     queryset = Sparepart.objects.all()
     serializer_class = serializers.SparepartSerializers
@@ -132,6 +236,39 @@ class SparepartDataAdd(generics.CreateAPIView):
 
         return Response(data, status=status.HTTP_201_CREATED, headers=headers)
 
+    def perform_create(self, serializer):
+        # Save instance to database
+        instance = serializer.save()
+
+        # Write quantity of new sparepart as adjustment in stock movement
+        record_stock_adjustment(sparepart=instance, change=instance.quantity)
+
+        # Write stock alert if new sparepart is already on limit
+        record_stock_alert(old_stock={}, new_stock={instance.sparepart_id: (instance.quantity, instance.limit)})
+
+
+class SparepartImport(generics.GenericAPIView):
+    permission_classes = [IsLogin, IsAdminRole]
+
+    def post(self, request, *args, **kwargs):
+        file = request.FILES.get('file')
+        if file is None:
+            return Response({'message': 'File sparepart tidak ditemukan'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Reading file row by row, rows are validated and written per batch
+        try:
+            data = import_spareparts(rows=read_sparepart_file(file=file.file, filename=file.name))
+        except UnsupportedFileError:
+            return Response({'message': 'Format file tidak didukung, gunakan csv atau xlsx'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # Whole import is written as one log
+        if data['created'] or data['updated']:
+            perform_log(request=request, operation='C' if data['created'] else 'E', table='Sparepart')
+
+        data['message'] = 'Data sparepart berhasil diimpor'
+        return Response(data, status=status.HTTP_200_OK)
+
 
 class SparepartDataUpdate(generics.RetrieveUpdateAPIView):
     queryset = Sparepart.objects.all()
@@ -168,6 +305,24 @@ class SparepartDataUpdate(generics.RetrieveUpdateAPIView):
 
         return Response(data)
 
+    def perform_update(self, serializer):
+        # Getting old quantity and limit, sales and service keep their own price so price change doesn't matter
+        instance = serializer.instance
+        old_quantity = instance.quantity
+        old_limit = instance.limit
+
+        # Save instance to database
+        instance = serializer.save()
+
+        # Write changed quantity as adjustment in stock movement
+        record_stock_adjustment(sparepart=instance, change=instance.quantity - old_quantity)
+
+        # Write stock alert if changed quantity or limit make sparepart cross its limit
+        record_stock_alert(
+            old_stock={instance.sparepart_id: (old_quantity, old_limit)},
+            new_stock={instance.sparepart_id: (instance.quantity, instance.limit)}
+        )
+
 
 class SparepartDataDelete(generics.DestroyAPIView):
     queryset = Sparepart.objects.all()
@@ -190,11 +345,121 @@ class SparepartDataDelete(generics.DestroyAPIView):
 
         return Response(message, status=status.HTTP_204_NO_CONTENT)
 
+    def perform_destroy(self, instance):
+        # Deleting instance in database, sales and service using this sparepart keep their stored total
+        # and daily sparepart summary of this sparepart is deleted with it
+        instance.delete()
+
 
-class SalesList(generics.ListAPIView):
-    queryset = Sales.objects.select_related('customer_id').prefetch_related('sales_detail_set').order_by('sales_id')
+class SparepartStock(generics.GenericAPIView):
+    queryset = Sparepart.objects.all()
+    permission_classes = [IsLogin, IsAdminRole]
+    lookup_field = 'sparepart_id'
+    lookup_url_kwarg = 'sparepart_id'
+
+    def handle_exception(self, exc):
+        if isinstance(exc, Http404):
+            exc = exceptions.SparepartNotFound()
+        return super().handle_exception(exc)
+
+    def get(self, request, *args, **kwargs):
+        instance = self.get_object()
+
+        # Getting url params of date, if doesn't exist use today
+        try:
+            day = date.fromisoformat(request.query_params.get('date', timezone.localdate().isoformat()))
+        except ValueError:
+            return Response({'message': 'Format tanggal tidak sesuai, gunakan YYYY-MM-DD'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # Getting quantity at the end of the day from latest stock snapshot and stock movement after it
+        stock = get_stock_at(day=day, sparepart_id_list=[instance.sparepart_id])
+
+        return Response({
+            'sparepart_id': instance.sparepart_id,
+            'name': instance.name,
+            'date': day,
+            'quantity': stock.get(instance.sparepart_id, 0),
+        })
+
+
+class SparepartMovementList(generics.ListAPIView):
+    serializer_class = serializers.StockMovementSerializers
+    permission_classes = [IsLogin, IsAdminRole]
+    pagination_class = CustomPagination
+
+    def handle_exception(self, exc):
+        if isinstance(exc, Http404):
+            exc = exceptions.SparepartNotFound()
+        return super().handle_exception(exc)
+
+    def list(self, request, *args, **kwargs):
+        self.sparepart = get_object_or_404(Sparepart, sparepart_id=self.kwargs['sparepart_id'])
+
+        # Getting url params of date range, both are optional
+        try:
+            self.start_date = request.query_params.get('start_date')
+            self.start_date = date.fromisoformat(self.start_date) if self.start_date else None
+            self.end_date = request.query_params.get('end_date')
+            self.end_date = date.fromisoformat(self.end_date) if self.end_date else None
+        except ValueError:
+            return Response({'message': 'Format tanggal tidak sesuai, gunakan YYYY-MM-DD'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        # Movement is read by sparepart and created_at index, newest movement first
+        queryset = Stock_movement.objects.filter(sparepart_id=self.sparepart).order_by(
+            '-created_at', '-stock_movement_id'
+        )
+        if self.start_date is not None:
+            queryset = queryset.filter(created_at__gte=get_day_range(day=self.start_date)[0])
+        if self.end_date is not None:
+            queryset = queryset.filter(created_at__lt=get_day_range(day=self.end_date)[1])
+
+        return queryset
+
+    def get_paginated_response(self, data):
+        if len(data) == 0:
+            self.paginator.message = 'Riwayat stok sparepart tidak ditemukan'
+            self.paginator.status = status.HTTP_404_NOT_FOUND
+        else:
+            self.paginator.message = f'Riwayat stok {self.sparepart.name}'
+        return super().get_paginated_response(data)
+
+
+class TransactionList(generics.ListAPIView):
+    # Page is read as values row and its response is built without serializer when list_values and list_rows
+    # is set, otherwise page is read from queryset with its prefetch and serialized by serializer_class.
+    # Both build the same response, see `python manage.py benchmark list`
+
+    # Function turning filtered queryset into values queryset, set by transaction list using values row
+    list_values = None
+    # Function building response rows from values of the page, set by transaction list using values row
+    list_rows = None
+
+    def list(self, request, *args, **kwargs):
+        if self.list_values is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.list_values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(self.list_rows(page))
+
+
+class SalesList(TransactionList):
+    # Total price and detail price are stored, so serializer only need sparepart name of the detail
+    queryset = Sales.objects.select_related('customer_id').prefetch_related(
+        Prefetch(
+            'sales_detail_set',
+            queryset=Sales_detail.objects.select_related('sparepart_id').order_by('sales_detail_id')
+        )
+    ).order_by('sales_id')
     serializer_class = serializers.SalesSerializers
     permission_classes = [IsLogin, IsAdminRole]
+    list_values = staticmethod(sales_values)
+    list_rows = staticmethod(get_sales_rows)
 
     pagination_class = CustomPagination
     pagination_class.page_size = 100
@@ -209,11 +474,36 @@ class SalesList(generics.ListAPIView):
         return super().get_paginated_response(data)
 
 
+class TransactionExport(generics.GenericAPIView):
+    permission_classes = [IsLogin, IsAdminRole]
+
+    # Function streaming csv of the transaction, set by each transaction export
+    export = None
+
+    def get(self, request, *args, **kwargs):
+        # Getting url params of date range, if doesn't exist every transaction is exported
+        try:
+            start_date = request.query_params.get('start_date')
+            start_date = date.fromisoformat(start_date) if start_date else None
+            end_date = request.query_params.get('end_date')
+            end_date = date.fromisoformat(end_date) if end_date else None
+        except ValueError:
+            return Response({'message': 'Format tanggal tidak sesuai, gunakan YYYY-MM-DD'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return self.export(start_date=start_date, end_date=end_date)
+
+
+class SalesExport(TransactionExport):
+    export = staticmethod(export_sales)
+
+
 class SalesAdd(generics.CreateAPIView):
     queryset = Sales.objects.select_related('customer_id').prefetch_related('sales_detail_set').order_by('sales_id')
     serializer_class = serializers.SalesManagementSerializers
     permission_classes = [IsLogin, IsAdminRole]
 
+    @transaction.atomic
     def create(self, request, *args, **kwargs):
         if len(request.data) < 3:
             return Response({'message': 'Data penjualan tidak sesuai / tidak lengkap'},
@@ -235,12 +525,20 @@ class SalesAdd(generics.CreateAPIView):
         return Response(data, status=status.HTTP_201_CREATED, headers=headers)
 
     def perform_create(self, serializer):
+        # Lock sparepart of new sales detail, concurrent sales of the same sparepart wait until this one is saved
+        spareparts = lock_spareparts(serializer.validated_data['sales_detail_set'])
+
         # Save the new Sales instance to the database
         instance = serializer.save()
 
         # Adjust sparepart data based on new sales data
         sales_adjust_sparepart_quantity(new_instance=instance, create=True)
 
+        # Refresh daily summary of the day sales is created
+        refresh_daily_summary(
+            transaction_type=Daily_summary.Types.SALES, days=get_summary_days(instance), spareparts=spareparts
+        )
+
 
 class SalesUpdate(generics.RetrieveUpdateAPIView):
     queryset = Sales.objects.select_related('customer_id').prefetch_related('sales_detail_set').order_by('sales_id')
@@ -255,6 +553,7 @@ class SalesUpdate(generics.RetrieveUpdateAPIView):
             exc = exceptions.SalesNotFound()
         return super().handle_exception(exc)
 
+    @transaction.atomic
     def update(self, request, *args, **kwargs):
         if len(request.data) < 3:
             return Response({'message': 'Data penjualan tidak sesuai / tidak lengkap'},
@@ -265,6 +564,9 @@ class SalesUpdate(generics.RetrieveUpdateAPIView):
                                 status=status.HTTP_400_BAD_REQUEST)
 
         partial = kwargs.pop('partial', False)
+
+        # Lock sales before reading it, so concurrent update / delete of the same sales wait for this one
+        lock_rows(Sales.objects.filter(sales_id=kwargs['sales_id']))
         instance = self.get_object()
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
@@ -282,9 +584,11 @@ class SalesUpdate(generics.RetrieveUpdateAPIView):
         return Response(data)
 
     def perform_update(self, serializer):
-        # Get the old Sales instance and its associated sales_detail instances
-        old_instance = self.get_object()
-        old_sales_details = old_instance.sales_detail_set.all()
+        # Get the old sales_detail instances read with the instance, before they are replaced by update
+        old_sales_details = list(serializer.instance.sales_detail_set.all())
+
+        # Lock sparepart of old and new sales detail before their quantity is changed
+        spareparts = lock_spareparts(old_sales_details, serializer.validated_data['sales_detail_set'])
 
         # Save intance to database
         instance = serializer.save()
@@ -296,9 +600,16 @@ class SalesUpdate(generics.RetrieveUpdateAPIView):
             update=True
         )
 
+        # Refresh daily summary of the day sales and its old details is created, and today for new details
+        refresh_daily_summary(
+            transaction_type=Daily_summary.Types.SALES,
+            days=get_summary_days(instance, old_sales_details) | {timezone.localdate()},
+            spareparts=spareparts
+        )
+
 
 class SalesDelete(generics.DestroyAPIView):
-    queryset = Sales.objects.all().order_by('sales_id')
+    queryset = Sales.objects.prefetch_related('sales_detail_set').order_by('sales_id')
     serializer_class = serializers.SalesManagementSerializers
     permission_classes = [IsLogin, IsAdminRole]
 
@@ -310,7 +621,10 @@ class SalesDelete(generics.DestroyAPIView):
             exc = exceptions.SalesNotFound()
         return super().handle_exception(exc)
 
+    @transaction.atomic
     def destroy(self, request, *args, **kwargs):
+        # Lock sales before reading it, so concurrent update / delete of the same sales wait for this one
+        lock_rows(Sales.objects.filter(sales_id=kwargs['sales_id']))
         instance = self.get_object()
         self.perform_destroy(instance)
         message = {'message': 'Data penjualan berhasil dihapus'}
@@ -320,9 +634,8 @@ class SalesDelete(generics.DestroyAPIView):
         return Response(message, status=status.HTTP_204_NO_CONTENT)
 
     def perform_destroy(self, instance):
-        # Get the old Sales instance and its associated Sales_detail instances
-        old_instance = self.get_object()
-        old_sales_details = old_instance.sales_detail_set.all().order_by('sales_detail_id')
+        # Get the associated Sales_detail instances of deleted sales
+        old_sales_details = instance.sales_detail_set.all()
 
         # Getting list of dict from old data, for post delete calculaltion
         old_data_list = []
@@ -335,17 +648,33 @@ class SalesDelete(generics.DestroyAPIView):
                 }
             )
 
+        # Getting days of daily summary affected by deleted data
+        summary_days = get_summary_days(instance, old_sales_details)
+
+        # Lock sparepart of deleted data before its quantity is returned
+        spareparts = lock_spareparts(old_data_list)
+
+        # Getting sales id before deleted, used as reference in stock movement
+        sales_id = instance.sales_id
+
         # Deleting instance in database
         instance.delete()
 
         # Adjust sparepart data based on old data as list
-        sales_adjust_sparepart_quantity(old_data_list=old_data_list)
+        sales_adjust_sparepart_quantity(old_data_list=old_data_list, transaction_id=sales_id)
 
+        # Refresh daily summary of the day deleted data is created
+        refresh_daily_summary(transaction_type=Daily_summary.Types.SALES, days=summary_days, spareparts=spareparts)
 
-class RestockList(generics.ListAPIView):
-    queryset = Restock.objects.prefetch_related('restock_detail_set').order_by('restock_id')
+
+class RestockList(TransactionList):
+    queryset = Restock.objects.select_related('salesman_id__supplier_id').prefetch_related(
+        Prefetch('restock_detail_set', queryset=Restock_detail.objects.select_related('sparepart_id'))
+    ).order_by('restock_id')
     serializer_class = serializers.RestockSerializers
     permission_classes = [IsLogin, IsAdminRole]
+    list_values = staticmethod(restock_values)
+    list_rows = staticmethod(get_restock_rows)
 
     pagination_class = CustomPagination
     pagination_class.page_size = 100
@@ -360,11 +689,16 @@ class RestockList(generics.ListAPIView):
         return super().get_paginated_response(data)
 
 
+class RestockExport(TransactionExport):
+    export = staticmethod(export_restock)
+
+
 class RestockAdd(generics.CreateAPIView):
     queryset = Restock.objects.prefetch_related('restock_detail_set').order_by('restock_id')
     serializer_class = serializers.RestockManagementSerializers
     permission_classes = [IsLogin, IsAdminRole]
 
+    @transaction.atomic
     def create(self, request, *args, **kwargs):
         if len(request.data) < 4:
             return Response({'message': 'Data pengadaan tidak sesuai / tidak lengkap'},
@@ -386,12 +720,18 @@ class RestockAdd(generics.CreateAPIView):
         return Response(data, status=status.HTTP_201_CREATED, headers=headers)
 
     def perform_create(self, serializer):
+        # Lock sparepart of new restock detail, concurrent transaction of the same sparepart wait for this one
+        lock_spareparts(serializer.validated_data['restock_detail_set'])
+
         # Save the new Restock instance to the database
         instance = serializer.save()
 
         # Adjust sparepart data based on new sales data
         restock_adjust_sparepart_quantity(create=True, new_instance=instance)
 
+        # Refresh daily summary of the day restock is created
+        refresh_daily_summary(transaction_type=Daily_summary.Types.RESTOCK, days=get_summary_days(instance))
+
 
 class RestockUpdate(generics.RetrieveUpdateAPIView):
     queryset = Restock.objects.prefetch_related('restock_detail_set').order_by('restock_id')
@@ -406,6 +746,7 @@ class RestockUpdate(generics.RetrieveUpdateAPIView):
             exc = exceptions.RestockNotFound()
         return super().handle_exception(exc)
 
+    @transaction.atomic
     def update(self, request, *args, **kwargs):
         if len(request.data) < 4:
             return Response({'message': 'Data pengadaan tidak sesuai / tidak lengkap'},
@@ -416,6 +757,9 @@ class RestockUpdate(generics.RetrieveUpdateAPIView):
                                 status=status.HTTP_400_BAD_REQUEST)
 
         partial = kwargs.pop('partial', False)
+
+        # Lock restock before reading it, so concurrent update / delete of the same restock wait for this one
+        lock_rows(Restock.objects.filter(restock_id=kwargs['restock_id']))
         instance = self.get_object()
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
@@ -433,9 +777,11 @@ class RestockUpdate(generics.RetrieveUpdateAPIView):
         return Response(data)
 
     def perform_update(self, serializer):
-        # Get the old restock instance and its associated restock_detail instances
-        old_instance = self.get_object()
-        old_restock_details = old_instance.restock_detail_set.all()
+        # Get the old restock_detail instances read with the instance, before they are replaced by update
+        old_restock_details = list(serializer.instance.restock_detail_set.all())
+
+        # Lock sparepart of old and new restock detail before their quantity is changed
+        lock_spareparts(old_restock_details, serializer.validated_data['restock_detail_set'])
 
         # Save intance to database
         instance = serializer.save()
@@ -447,6 +793,9 @@ class RestockUpdate(generics.RetrieveUpdateAPIView):
             old_instance=old_restock_details
         )
 
+        # Refresh daily summary of the day restock is created
+        refresh_daily_summary(transaction_type=Daily_summary.Types.RESTOCK, days=get_summary_days(instance))
+
 
 class RestockDelete(generics.DestroyAPIView):
     queryset = Restock.objects.prefetch_related('restock_detail_set').order_by('restock_id')
@@ -461,7 +810,10 @@ class RestockDelete(generics.DestroyAPIView):
             exc = exceptions.RestockNotFound()
         return super().handle_exception(exc)
 
+    @transaction.atomic
     def destroy(self, request, *args, **kwargs):
+        # Lock restock before reading it, so concurrent update / delete of the same restock wait for this one
+        lock_rows(Restock.objects.filter(restock_id=kwargs['restock_id']))
         instance = self.get_object()
         self.perform_destroy(instance)
         message = {'message': 'Data pengadaan berhasil dihapus'}
@@ -471,9 +823,8 @@ class RestockDelete(generics.DestroyAPIView):
         return Response(message, status=status.HTTP_204_NO_CONTENT)
 
     def perform_destroy(self, instance):
-        # Get the old Restock instance and its associated Restock_detail instances
-        old_instance = self.get_object()
-        old_restock_details = old_instance.restock_detail_set.all().order_by('restock_detail_id')
+        # Get the associated Restock_detail instances of deleted restock
+        old_restock_details = instance.restock_detail_set.all()
 
         # Getting list of dict from old data, for post save calculaltion
         old_data_list = []
@@ -486,11 +837,23 @@ class RestockDelete(generics.DestroyAPIView):
                 }
             )
 
+        # Getting days of daily summary affected by deleted data
+        summary_days = get_summary_days(instance)
+
+        # Lock sparepart of deleted data before its quantity is returned
+        lock_spareparts(old_data_list)
+
+        # Getting restock id before deleted, used as reference in stock movement
+        restock_id = instance.restock_id
+
         # Deleting instance in database
         instance.delete()
 
         # Adjust sparepart data based on old data as list
-        restock_adjust_sparepart_quantity(old_data_list=old_data_list)
+        restock_adjust_sparepart_quantity(old_data_list=old_data_list, transaction_id=restock_id)
+
+        # Refresh daily summary of the day deleted data is created
+        refresh_daily_summary(transaction_type=Daily_summary.Types.RESTOCK, days=summary_days)
 
 
 class SupplierList(generics.ListAPIView):
@@ -583,8 +946,6 @@ class SupplierDelete(generics.DestroyAPIView):
 
 
 class SalesReport(generics.GenericAPIView):
-    queryset = Sales.objects.select_related('customer_id', 'user_id').prefetch_related('sales_detail_set')
-    serializer_class = serializers.SalesReportSerializers
     permission_classes = [IsLogin, IsOwnerRole]
 
     def get(self, request, *args, **kwargs):
@@ -592,24 +953,13 @@ class SalesReport(generics.GenericAPIView):
         self.year = int(request.query_params.get('year', date.today().year))
         self.month = int(request.query_params.get('month', date.today().month))
 
-        # Getting sales data
-        sales_queryset = self.filter_queryset(self.get_queryset())
-        sales = self.get_serializer(sales_queryset, many=True)
-        sales_list = sorted(sales.data, key=lambda k: k['created_at'], reverse=True)
-
-        # Getting sales report data
-        self.data = get_sales_report(
-            data_list=sales_list,
-            year=self.year,
-            month=self.month
-        )
+        # Getting sales report data aggregated per day by database, closed month is taken from cache
+        self.data = get_report(transaction_type=Daily_summary.Types.SALES, year=self.year, month=self.month)
 
         return Response(self.data)
 
 
 class RestockReport(generics.GenericAPIView):
-    queryset = Restock.objects.select_related('salesman_id', 'user_id').prefetch_related('restock_detail_set')
-    serializer_class = serializers.RestockReportSerializers
     permission_classes = [IsLogin, IsOwnerRole]
 
     def get(self, request, *args, **kwargs):
@@ -617,17 +967,8 @@ class RestockReport(generics.GenericAPIView):
         self.year = int(request.query_params.get('year', date.today().year))
         self.month = int(request.query_params.get('month', date.today().month))
 
-        # Getting restock data
-        restock_queryset = self.filter_queryset(self.get_queryset())
-        restock = self.get_serializer(restock_queryset, many=True)
-        restock_list = sorted(restock.data, key=lambda k: k['created_at'], reverse=True)
-
-        # Getting restock report data
-        self.data = get_restock_report(
-            data_list=restock_list,
-            year=self.year,
-            month=self.month
-        )
+        # Getting restock report data aggregated per day by database, closed month is taken from cache
+        self.data = get_report(transaction_type=Daily_summary.Types.RESTOCK, year=self.year, month=self.month)
 
         return Response(self.data)
 
@@ -689,62 +1030,20 @@ class OwnerDashboard(generics.GenericAPIView):
         self.month = int(request.query_params.get('month', date.today().month))
         self.day = int(request.query_params.get('day', date.today().day))
 
-        # Getting number of day form current month
-        self.number_of_day = monthrange(year=self.year, month=self.month)[1]
-
-        # Getting sparepart revenue for today
-        self.sales_revenue_today = 0
-
-        # Getting service revenue for today
-        self.service_revenue_today = 0
-
-        # Getting total revenue for today
-        self.total_revenue_today = 0
+        # Getting revenue, count, and expenditure of the day aggregated by database
+        summary = get_dashboard_summary(day=date(self.year, self.month, self.day))
 
-        # Getting revenue from sales
-        self.queryset = Sales.objects.prefetch_related('sales_detail_set')
-        self.serializer_class = serializers.SalesRevenueSerializers
-        sales_queryset = self.filter_queryset(self.get_queryset())
-        sales = self.get_serializer(sales_queryset, many=True)
-        sales_list = sorted(sales.data, key=lambda k: k['created_at'], reverse=True)
-
-        # Getting revenue from service
-        self.queryset = Service.objects.prefetch_related('service_sparepart_set', 'service_action_set')
-        self.serializer_class = serializers.ServiceRevenueSerializers
-        service_queryset = self.filter_queryset(self.get_queryset())
-        service = self.get_serializer(service_queryset, many=True)
-        service_list = sorted(service.data, key=lambda k: k['created_at'], reverse=True)
-
-        # Getting total sales revenue and service revenue of today
-        for sales in sales_list:
-            if sales['created_at'] == date(self.year, self.month, self.day).strftime('%d-%m-%Y'):
-                self.sales_revenue_today += sales['revenue']
-        for service in service_list:
-            if service['created_at'] == date(self.year, self.month, self.day).strftime('%d-%m-%Y'):
-                self.service_revenue_today += service['revenue']
+        # Getting sparepart revenue, service revenue and expenditure for the day
+        self.sales_revenue_today = summary['sales']['total']
+        self.service_revenue_today = summary['service']['total']
+        self.expenditure_today = summary['restock']['total']
 
         # Getting total revenue today by adding sales and service
         self.total_revenue_today = self.service_revenue_today + self.sales_revenue_today
 
-        # Getting number of sales from today
-        self.count_sales = Sales.objects.filter(created_at__date=date.today()).count()
-
-        # Getting number of service from today
-        self.count_service = Service.objects.filter(created_at__date=date.today()).count()
-
-        # Getting expenditure total from today
-        self.expenditure_today = 0
-
-        self.queryset = Restock.objects.prefetch_related('restock_detail_set')
-        self.serializer_class = serializers.RestockExpenditureSerializers
-
-        restock_queryset = self.filter_queryset(self.get_queryset())
-        restock = self.get_serializer(restock_queryset, many=True)
-        restock_list = sorted(restock.data, key=lambda k: k['created_at'], reverse=True)
-
-        for restock in restock_list:
-            if restock['created_at'] == date.today().strftime('%d-%m-%Y'):
-                self.expenditure_today += restock['expenditure']
+        # Getting number of sales and service from the day
+        self.count_sales = summary['sales']['count']
+        self.count_service = summary['service']['count']
 
         return Response(
             {
@@ -836,8 +1135,6 @@ class AdminDelete(generics.DestroyAPIView):
 
 
 class ServiceReport(generics.GenericAPIView):
-    queryset = Service.objects.prefetch_related('service_action_set', 'service_sparepart_set')
-    serializer_class = serializers.ServiceReportSerializers
     permission_classes = [IsLogin, IsOwnerRole]
 
     def get(self, request, *args, **kwargs):
@@ -845,25 +1142,21 @@ class ServiceReport(generics.GenericAPIView):
         self.year = int(request.query_params.get('year', date.today().year))
         self.month = int(request.query_params.get('month', date.today().month))
 
-        # Getting service data
-        service_queryset = self.filter_queryset(self.get_queryset())
-        service = self.get_serializer(service_queryset, many=True)
-        service_list = sorted(service.data, key=lambda k: k['created_at'], reverse=True)
-
-        # Getting service report data
-        self.data = get_service_report(
-            data_list=service_list,
-            year=self.year,
-            month=self.month
-        )
+        # Getting service report data aggregated per day by database, closed month is taken from cache
+        self.data = get_report(transaction_type=Daily_summary.Types.SERVICE, year=self.year, month=self.month)
 
         return Response(self.data)
 
 
-class ServiceList(generics.ListAPIView):
-    queryset = Service.objects.prefetch_related('service_action_set', 'service_sparepart_set').order_by('service_id')
+class ServiceList(TransactionList):
+    queryset = Service.objects.select_related('customer_id', 'mechanic_id').prefetch_related(
+        'service_action_set',
+        Prefetch('service_sparepart_set', queryset=Service_sparepart.objects.select_related('sparepart_id'))
+    ).order_by('service_id')
     serializer_class = serializers.ServiceSerializers
     permission_classes = [IsLogin, IsAdminRole]
+    list_values = staticmethod(service_values)
+    list_rows = staticmethod(get_service_rows)
 
     pagination_class = CustomPagination
     pagination_class.page_size = 100
@@ -878,6 +1171,10 @@ class ServiceList(generics.ListAPIView):
         return super().get_paginated_response(data)
 
 
+class ServiceExport(TransactionExport):
+    export = staticmethod(export_service)
+
+
 class ServiceAdd(generics.CreateAPIView):
     queryset = Service.objects.prefetch_related(
         'service_action_set', 'service_sparepart_set'
@@ -886,6 +1183,7 @@ class ServiceAdd(generics.CreateAPIView):
     serializer_class = serializers.ServiceManagementSerializers
     permission_classes = [IsLogin, IsAdminRole]
 
+    @transaction.atomic
     def create(self, request, *args, **kwargs):
         if len(request.data) < 7:
             return Response({'message': 'Data servis tidak sesuai / tidak lengkap'},
@@ -911,12 +1209,20 @@ class ServiceAdd(generics.CreateAPIView):
         return Response(data, status=status.HTTP_201_CREATED, headers=headers)
 
     def perform_create(self, serializer):
+        # Lock sparepart of new service, concurrent transaction of the same sparepart wait for this one
+        spareparts = lock_spareparts(serializer.validated_data['service_sparepart_set'])
+
         # Save the new Service instance to the database
         instance = serializer.save()
 
         # Adjust sparepart data based on new service data
         service_adjust_sparepart_quantity(create=True, new_instance=instance)
 
+        # Refresh daily summary of the day service is created
+        refresh_daily_summary(
+            transaction_type=Daily_summary.Types.SERVICE, days=get_summary_days(instance), spareparts=spareparts
+        )
+
 
 class ServiceUpdate(generics.RetrieveUpdateAPIView):
     queryset = Service.objects.prefetch_related(
@@ -933,6 +1239,7 @@ class ServiceUpdate(generics.RetrieveUpdateAPIView):
             exc = exceptions.ServiceNotFound()
         return super().handle_exception(exc)
 
+    @transaction.atomic
     def update(self, request, *args, **kwargs):
         if len(request.data) < 7:
             return Response({'message': 'Data servis tidak sesuai / tidak lengkap'},
@@ -947,6 +1254,9 @@ class ServiceUpdate(generics.RetrieveUpdateAPIView):
                                 status=status.HTTP_400_BAD_REQUEST)
 
         partial = kwargs.pop('partial', False)
+
+        # Lock service before reading it, so concurrent update / delete of the same service wait for this one
+        lock_rows(Service.objects.filter(service_id=kwargs['service_id']))
         instance = self.get_object()
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
@@ -964,9 +1274,11 @@ class ServiceUpdate(generics.RetrieveUpdateAPIView):
         return Response(data)
 
     def perform_update(self, serializer):
-        # Get the old Service instance and its associated Service_sparepart instances
-        old_instance = self.get_object()
-        old_service_spareparts = old_instance.service_sparepart_set.all()
+        # Get the old service_sparepart instances read with the instance, before they are replaced by update
+        old_service_spareparts = list(serializer.instance.service_sparepart_set.all())
+
+        # Lock sparepart of old and new service sparepart before their quantity is changed
+        spareparts = lock_spareparts(old_service_spareparts, serializer.validated_data['service_sparepart_set'])
 
         # Save intance to database
         instance = serializer.save()
@@ -978,6 +1290,13 @@ class ServiceUpdate(generics.RetrieveUpdateAPIView):
             old_instance=old_service_spareparts
         )
 
+        # Refresh daily summary of the day service and its old spareparts is created, and today for new spareparts
+        refresh_daily_summary(
+            transaction_type=Daily_summary.Types.SERVICE,
+            days=get_summary_days(instance, old_service_spareparts) | {timezone.localdate()},
+            spareparts=spareparts
+        )
+
 
 class ServiceDelete(generics.DestroyAPIView):
     queryset = Service.objects.prefetch_related('service_action_set', 'service_sparepart_set')
@@ -992,7 +1311,10 @@ class ServiceDelete(generics.DestroyAPIView):
             exc = exceptions.ServiceNotFound()
         return super().handle_exception(exc)
 
+    @transaction.atomic
     def destroy(self, request, *args, **kwargs):
+        # Lock service before reading it, so concurrent update / delete of the same service wait for this one
+        lock_rows(Service.objects.filter(service_id=kwargs['service_id']))
         instance = self.get_object()
         self.perform_destroy(instance)
         message = {'message': 'Data servis berhasil dihapus'}
@@ -1002,9 +1324,8 @@ class ServiceDelete(generics.DestroyAPIView):
         return Response(message, status=status.HTTP_204_NO_CONTENT)
 
     def perform_destroy(self, instance):
-        # Get the old Sales instance and its associated service_sparepart instances
-        old_instance = self.get_object()
-        old_service_spareparts = old_instance.service_sparepart_set.all().order_by('service_sparepart_id')
+        # Get the associated service_sparepart instances of deleted service
+        old_service_spareparts = instance.service_sparepart_set.all()
 
         # Getting list of dict from old data, for post save calculaltion
         old_data_list = []
@@ -1017,11 +1338,23 @@ class ServiceDelete(generics.DestroyAPIView):
                 }
             )
 
+        # Getting days of daily summary affected by deleted data
+        summary_days = get_summary_days(instance, old_service_spareparts)
+
+        # Lock sparepart of deleted data before its quantity is returned
+        spareparts = lock_spareparts(old_data_list)
+
+        # Getting service id before deleted, used as reference in stock movement
+        service_id = instance.service_id
+
         # Deleting instance in database
         instance.delete()
 
         # Adjust sparepart data based on old service data
-        service_adjust_sparepart_quantity(old_data_list=old_data_list)
+        service_adjust_sparepart_quantity(old_data_list=old_data_list, transaction_id=service_id)
+
+        # Refresh daily summary of the day deleted data is created
+        refresh_daily_summary(transaction_type=Daily_summary.Types.SERVICE, days=summary_days, spareparts=spareparts)
 
 
 class BrandList(generics.ListAPIView):
@@ -1203,7 +1536,6 @@ class CategoryDelete(generics.DestroyAPIView):
 
 
 class CustomerList(generics.ListAPIView):
-    queryset = Customer.objects.prefetch_related('service_set', 'sales_set').order_by('customer_id')
     serializer_class = serializers.CustomerSerializers
     permission_classes = [IsLogin, IsAdminRole]
 
@@ -1213,6 +1545,10 @@ class CustomerList(generics.ListAPIView):
     filter_backends = [filters.SearchFilter]
     search_fields = ['name', 'contact', 'address', 'is_workshop']
 
+    def get_queryset(self):
+        # Service count and payment of current year are annotated per customer in the same query
+        return Customer.objects.annotate(**customer_balance_expressions()).order_by('customer_id')
+
     def get_paginated_response(self, data):
         if len(data) == 0:
             self.paginator.message = 'Pelanggan yang dicari tidak ditemukan'
@@ -1470,8 +1806,6 @@ class SalesmanDelete(generics.DestroyAPIView):
 
 
 class SalesReportDownload(generics.GenericAPIView):
-    queryset = Sales.objects.select_related('customer_id', 'user_id').prefetch_related('sales_detail_set')
-    serializer_class = serializers.SalesReportSerializers
     permission_classes = [IsLogin, IsOwnerRole]
 
     def get(self, request, *args, **kwargs):
@@ -1479,27 +1813,18 @@ class SalesReportDownload(generics.GenericAPIView):
         self.year = int(request.query_params.get('year', date.today().year))
         self.month = int(request.query_params.get('month', date.today().month))
 
-        # Getting sales data
-        sales_queryset = self.filter_queryset(self.get_queryset())
-        sales = self.get_serializer(sales_queryset, many=True)
-        sales_list = sorted(sales.data, key=lambda k: k['created_at'], reverse=True)
-
-        # Getting sales report data
-        self.data = get_sales_report(
-            data_list=sales_list,
+        # Using function to generete pdf from sales report data, closed month pdf is taken from cache
+        pdf = get_report_pdf(
+            transaction_type=Daily_summary.Types.SALES,
+            report_type='Penjualan',
             year=self.year,
             month=self.month
         )
 
-        # Using function to generete pdf
-        response = generate_report_pdf(data=self.data, report_type='Penjualan', year=self.year, month=self.month)
-
-        return response
+        return report_pdf_response(pdf=pdf, report_type='Penjualan', year=self.year, month=self.month)
 
 
 class RestockReportDownload(generics.GenericAPIView):
-    queryset = Restock.objects.select_related('salesman_id', 'user_id').prefetch_related('restock_detail_set')
-    serializer_class = serializers.RestockReportSerializers
     permission_classes = [IsLogin, IsOwnerRole]
 
     def get(self, request, *args, **kwargs):
@@ -1507,27 +1832,18 @@ class RestockReportDownload(generics.GenericAPIView):
         self.year = int(request.query_params.get('year', date.today().year))
         self.month = int(request.query_params.get('month', date.today().month))
 
-        # Getting restock data
-        restock_queryset = self.filter_queryset(self.get_queryset())
-        restock = self.get_serializer(restock_queryset, many=True)
-        restock_list = sorted(restock.data, key=lambda k: k['created_at'], reverse=True)
-
-        # Getting restock report data
-        self.data = get_restock_report(
-            data_list=restock_list,
+        # Using function to generete pdf from restock report data, closed month pdf is taken from cache
+        pdf = get_report_pdf(
+            transaction_type=Daily_summary.Types.RESTOCK,
+            report_type='Pengadaan',
             year=self.year,
             month=self.month
         )
 
-        # Using function to generete pdf
-        response = generate_report_pdf(data=self.data, report_type='Pengadaan', year=self.year, month=self.month)
-
-        return response
+        return report_pdf_response(pdf=pdf, report_type='Pengadaan', year=self.year, month=self.month)
 
 
 class ServiceReportDownload(generics.GenericAPIView):
-    queryset = Service.objects.prefetch_related('service_action_set', 'service_sparepart_set')
-    serializer_class = serializers.ServiceReportSerializers
     permission_classes = [IsLogin, IsOwnerRole]
 
     def get(self, request, *args, **kwargs):
@@ -1535,26 +1851,140 @@ class ServiceReportDownload(generics.GenericAPIView):
         self.year = int(request.query_params.get('year', date.today().year))
         self.month = int(request.query_params.get('month', date.today().month))
 
-        # Getting service data
-        service_queryset = self.filter_queryset(self.get_queryset())
-        service = self.get_serializer(service_queryset, many=True)
-        service_list = sorted(service.data, key=lambda k: k['created_at'], reverse=True)
-
-        # Getting service report data
-        self.data = get_service_report(
-            data_list=service_list,
+        # Using function to generete pdf from service report data, closed month pdf is taken from cache
+        pdf = get_report_pdf(
+            transaction_type=Daily_summary.Types.SERVICE,
+            report_type='Servis',
             year=self.year,
             month=self.month
         )
 
-        # Using function to generete pdf
-        response = generate_report_pdf(data=self.data, report_type='Servis', year=self.year, month=self.month)
+        return report_pdf_response(pdf=pdf, report_type='Servis', year=self.year, month=self.month)
 
-        return response
+
+class RangeReport(generics.GenericAPIView):
+    permission_classes = [IsLogin, IsOwnerRole]
+
+    # Report type that can be requested, key is used in url params and response
+    report_types = {
+        'sales': Daily_summary.Types.SALES,
+        'restock': Daily_summary.Types.RESTOCK,
+        'service': Daily_summary.Types.SERVICE,
+    }
+
+    def get(self, request, *args, **kwargs):
+        # Getting url params of date range, grouping, and report type,
+        # if doesn't exist use this year until today grouped per month for every report type
+        try:
+            self.start_date = date.fromisoformat(
+                request.query_params.get('start_date', date.today().replace(month=1, day=1).isoformat())
+            )
+            self.end_date = date.fromisoformat(request.query_params.get('end_date', date.today().isoformat()))
+        except ValueError:
+            return Response({'message': 'Format tanggal tidak sesuai, gunakan YYYY-MM-DD'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        self.group = request.query_params.get('group', 'month')
+        self.types = request.query_params.get('type', ','.join(self.report_types)).split(',')
+
+        if self.start_date > self.end_date or self.group not in ('day', 'week', 'month') or \
+                any(report_type not in self.report_types for report_type in self.types):
+            return Response({'message': 'Data laporan tidak sesuai / tidak lengkap'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        data = {'start_date': self.start_date, 'end_date': self.end_date, 'group': self.group}
+
+        # Getting each report type grouped per period by database, one query for each report type
+        for report_type in self.types:
+            data[report_type] = get_range_report(
+                transaction_type=self.report_types[report_type],
+                start_date=self.start_date,
+                end_date=self.end_date,
+                group=self.group
+            )
+
+        return Response(data)
+
+
+class ReportJobAdd(generics.CreateAPIView):
+    queryset = Report_job.objects.defer('file')
+    serializer_class = serializers.ReportJobSerializers
+    permission_classes = [IsLogin, IsOwnerRole]
+
+    def create(self, request, *args, **kwargs):
+        if len(request.data) < 3:
+            return Response({'message': 'Data laporan tidak sesuai / tidak lengkap'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        headers = self.get_success_headers(serializer.data)
+        data = serializer.data
+        data['message'] = 'Laporan sedang dibuat'
+
+        return Response(data, status=status.HTTP_201_CREATED, headers=headers)
+
+    def perform_create(self, serializer):
+        # Save job as pending, then report worker render the pdf in background
+        serializer.save(user_id=self.request.user)
+
+
+class ReportJobDetail(generics.RetrieveAPIView):
+    serializer_class = serializers.ReportJobSerializers
+    permission_classes = [IsLogin, IsOwnerRole]
+
+    lookup_field = 'report_job_id'
+    lookup_url_kwarg = 'report_job_id'
+
+    def get_queryset(self):
+        # Owner can only see their own report job, pdf file is not needed to see job status
+        return Report_job.objects.filter(user_id=self.request.user).defer('file')
+
+    def handle_exception(self, exc):
+        if isinstance(exc, Http404):
+            exc = exceptions.ReportJobNotFound()
+        return super().handle_exception(exc)
+
+
+class ReportJobDownload(generics.RetrieveAPIView):
+    serializer_class = serializers.ReportJobSerializers
+    permission_classes = [IsLogin, IsOwnerRole]
+
+    lookup_field = 'report_job_id'
+    lookup_url_kwarg = 'report_job_id'
+
+    def get_queryset(self):
+        # Owner can only download their own report job
+        return Report_job.objects.filter(user_id=self.request.user)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, Http404):
+            exc = exceptions.ReportJobNotFound()
+        return super().handle_exception(exc)
+
+    def get(self, request, *args, **kwargs):
+        instance = self.get_object()
+        if instance.status != Report_job.Status.DONE:
+            return Response({'message': 'Laporan belum selesai dibuat'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return report_pdf_response(
+            pdf=bytes(instance.file),
+            report_type=REPORT_TITLES[instance.report_type],
+            year=instance.year,
+            month=instance.month
+        )
+
+
+class ReportCacheStats(generics.GenericAPIView):
+    permission_classes = [IsLogin, IsOwnerRole]
+
+    def get(self, request, *args, **kwargs):
+        # Getting hit and miss counter of each report cache, counter is approximate under concurrent request
+        return Response(get_report_cache_stats())
 
 
 class SalesReceipt(generics.RetrieveAPIView):
-    queryset = Sales.objects.select_related('customer_id').prefetch_related('sales_detail_set')
+    queryset = Sales.objects.select_related('customer_id').prefetch_related('sales_detail_set__sparepart_id')
     serializer_class = serializers.SalesReceiptSerializers
     permission_classes = [IsLogin, IsAdminRole]
 
@@ -1567,17 +1997,43 @@ class SalesReceipt(generics.RetrieveAPIView):
         return super().handle_exception(exc)
 
     def get(self, request, *args, **kwargs):
-        # Getting sales data
-        data = self.retrieve(request, *args, **kwargs)
+        # Getting sales last modified time, used as receipt version
+        last_modified = get_receipt_last_modified(
+            queryset=Sales.objects.all(),
+            detail_name='sales_detail',
+            sales_id=kwargs['sales_id']
+        )
+        if last_modified is None:
+            raise Http404
+
+        # Answering revalidation request with 304 when receipt is not changed
+        etag = get_receipt_etag(transaction_type='sales', transaction_id=kwargs['sales_id'],
+                                last_modified=last_modified)
+        response = get_conditional_response(request, etag=etag, last_modified=int(last_modified.timestamp()))
+
+        if response is None:
+            # Getting rendered receipt from cache, only render when this version is not rendered yet
+            pdf = get_cached_receipt(
+                transaction_type='sales',
+                transaction_id=kwargs['sales_id'],
+                last_modified=last_modified,
+                render=lambda: render_receipt(
+                    data=get_sales_receipt(self.get_object()),
+                    transaction_type='Penjualan'
+                )
+            )
+            response = receipt_pdf_response(pdf=pdf, transaction_type='Penjualan', transaction_id=kwargs['sales_id'])
 
-        response = generate_receipt(data=data.data, transaction_type='Penjualan')
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+        patch_cache_control(response, private=True, no_cache=True)
 
         return response
 
 
 class ServiceReceipt(generics.RetrieveAPIView):
     queryset = Service.objects.select_related('customer_id').prefetch_related(
-                'service_action_set', 'service_sparepart_set')
+                'service_action_set', 'service_sparepart_set__sparepart_id')
     serializer_class = serializers.ServiceReceiptSerializers
     permission_classes = [IsLogin, IsAdminRole]
 
@@ -1590,9 +2046,100 @@ class ServiceReceipt(generics.RetrieveAPIView):
         return super().handle_exception(exc)
 
     def get(self, request, *args, **kwargs):
-        # Getting sales data
-        data = self.retrieve(request, *args, **kwargs)
+        # Getting service last modified time, used as receipt version
+        last_modified = get_receipt_last_modified(
+            queryset=Service.objects.all(),
+            detail_name='service_sparepart',
+            service_id=kwargs['service_id']
+        )
+        if last_modified is None:
+            raise Http404
+
+        # Answering revalidation request with 304 when receipt is not changed
+        etag = get_receipt_etag(transaction_type='service', transaction_id=kwargs['service_id'],
+                                last_modified=last_modified)
+        response = get_conditional_response(request, etag=etag, last_modified=int(last_modified.timestamp()))
+
+        if response is None:
+            # Getting rendered receipt from cache, only render when this version is not rendered yet
+            pdf = get_cached_receipt(
+                transaction_type='service',
+                transaction_id=kwargs['service_id'],
+                last_modified=last_modified,
+                render=lambda: render_receipt(
+                    data=get_service_receipt(self.get_object()),
+                    transaction_type='Servis'
+                )
+            )
+            response = receipt_pdf_response(pdf=pdf, transaction_type='Servis', transaction_id=kwargs['service_id'])
 
-        response = generate_receipt(data=data.data, transaction_type='Servis')
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+        patch_cache_control(response, private=True, no_cache=True)
 
         return response
+
+
+class ReceiptBatch(generics.GenericAPIView):
+    permission_classes = [IsLogin, IsAdminRole]
+
+    # Maximum number of receipt in one batch
+    max_receipt = 100
+
+    def get(self, request, *args, **kwargs):
+        sales_queryset = Sales.objects.all()
+        service_queryset = Service.objects.all()
+
+        try:
+            if 'start_date' in request.query_params:
+                # Getting every sales and service created between start_date and end_date (Asia/Jakarta)
+                start_date = date.fromisoformat(request.query_params['start_date'])
+                end_date = date.fromisoformat(request.query_params.get('end_date', start_date.isoformat()))
+                start = get_day_range(day=start_date)[0]
+                end = get_day_range(day=end_date)[1]
+
+                sales_queryset = sales_queryset.filter(created_at__gte=start, created_at__lt=end)
+                service_queryset = service_queryset.filter(created_at__gte=start, created_at__lt=end)
+            elif 'sales_id' in request.query_params or 'service_id' in request.query_params:
+                # Getting sales and service from comma separated list of id
+                sales_id_list = [int(pk) for pk in request.query_params.get('sales_id', '').split(',') if pk]
+                service_id_list = [int(pk) for pk in request.query_params.get('service_id', '').split(',') if pk]
+
+                sales_queryset = sales_queryset.filter(sales_id__in=sales_id_list)
+                service_queryset = service_queryset.filter(service_id__in=service_id_list)
+            else:
+                raise ValueError
+        except ValueError:
+            return Response({'message': 'Data nota tidak sesuai / tidak lengkap'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # Checking number of receipt from transaction id, before detail of every transaction is read
+        receipt_count = (
+            len(sales_queryset.values_list('sales_id', flat=True)[:self.max_receipt + 1]) +
+            len(service_queryset.values_list('service_id', flat=True)[:self.max_receipt + 1])
+        )
+        if receipt_count == 0:
+            return Response({'message': 'Data transaksi tidak ditemukan'}, status=status.HTTP_404_NOT_FOUND)
+        elif receipt_count > self.max_receipt:
+            return Response({'message': f'Maksimal {self.max_receipt} nota dalam sekali cetak'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # Getting receipt data of every transaction ordered by transaction time
+        transactions = [
+            (sales.created_at, get_sales_receipt(sales), 'Penjualan')
+            for sales in sales_queryset.select_related('customer_id').prefetch_related(
+                'sales_detail_set__sparepart_id')
+        ] + [
+            (service.created_at, get_service_receipt(service), 'Servis')
+            for service in service_queryset.select_related('customer_id').prefetch_related(
+                'service_action_set', 'service_sparepart_set__sparepart_id')
+        ]
+        transactions.sort(key=lambda transaction: transaction[0])
+
+        # Rendering every receipt in worker process, then merging them into single pdf, the merged pdf is
+        # built in memory (at most max_receipt receipt) before it's sent
+        pdf = render_receipt_batch(
+            receipts=[(data, transaction_type) for created_at, data, transaction_type in transactions]
+        )
+
+        return FileResponse(BytesIO(pdf), as_attachment=False, filename='Receipt_Batch.pdf')